@@ -1,10 +1,11 @@
+import os
 import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
 from dataclasses import dataclass
-from typing import Dict, Type, Optional
+from typing import Dict, Iterable, Type, Optional
 
-from db_connection import get_connection, close_tunnel
+from db_connection import get_connection, close_pool, close_tunnel
 
 @dataclass
 class Session:
@@ -19,10 +20,25 @@ class App(tk.Tk):
     Main application window. Owns:
       - a shared PostgreSQL connection (self.conn)
       - a Session object (self.session)
+      - the local catalog index (self.catalog)
+      - the per-user recommendation cache (self.rec_cache)
+      - the per-user stats cache behind the Follow page (self.stats_cache)
+      - the in-memory follow graph for follow suggestions (self.follow_graph)
       - a frame router with show_frame()
     """
     TITLE = "Music Information Database — Team 48"
 
+    # "Recommended For You" cache: fresh for REC_CACHE_TTL seconds, served
+    # stale (while recomputing) up to REC_CACHE_MAX_STALE, and marked stale
+    # after REC_INVALIDATE_AFTER new listens by that user
+    REC_CACHE_TTL = 600
+    REC_CACHE_MAX_STALE = 24 * 3600
+    REC_INVALIDATE_AFTER = 5
+
+    # user stats modal: cached per user for USER_STATS_TTL seconds, dropped
+    # early when that user listens or a follow involving them changes
+    USER_STATS_TTL = 60
+
     def _set_style(self):
         """ttk styles and theme."""
         style = ttk.Style(self)
@@ -63,6 +79,26 @@ class App(tk.Tk):
         # track session for currently logged-in user
         self.session = Session()
 
+        # local catalog copy for in-process song search; loads in the background
+        from services.catalog_index import CatalogIndex
+        self.catalog = CatalogIndex()
+        self.catalog.start()
+
+        # set REC_CACHE_PATH in .env to share cached recommendations between app instances
+        from services.cache import TTLCache
+        self.rec_cache = TTLCache(
+            "recs",
+            ttl=self.REC_CACHE_TTL,
+            max_stale=self.REC_CACHE_MAX_STALE,
+            invalidate_after=self.REC_INVALIDATE_AFTER,
+            path=os.getenv("REC_CACHE_PATH") or None,
+        )
+        self.stats_cache = TTLCache("user_stats", ttl=self.USER_STATS_TTL, max_stale=self.USER_STATS_TTL)
+
+        # follow graph for "Suggested Users"; loaded in the background on first use
+        from services.follow_graph import FollowGraphIndex
+        self.follow_graph = FollowGraphIndex()
+
         #  container & router 
         container = ttk.Frame(self)
         container.pack(fill="both", expand=True)
@@ -132,9 +168,10 @@ class App(tk.Tk):
         self.title(f"{self.TITLE} — {name} ({user})")
 
     #db helper
-    def cursor(self):
+    def cursor(self, name: Optional[str] = None):
         """
         Get a fresh cursor. Reconnects if needed.
+        Pass `name` for a server-side cursor that streams its results.
         Usage:
             with app.cursor() as cur:
                 cur.execute("SELECT 1")
@@ -145,7 +182,7 @@ class App(tk.Tk):
                 self.conn = get_connection()
         except Exception:
             self.conn = get_connection()
-        return self.conn.cursor()
+        return self.conn.cursor(name=name)
 
 
     def exec_and_commit(self, sql_query: str, params: tuple = ()):
@@ -154,13 +191,37 @@ class App(tk.Tk):
             cur.execute(sql_query, params)
         self.conn.commit()
 
+    # write hooks
+    def on_listens_recorded(self, username: str, song_ids: Iterable[str]):
+        """Call after committing listens so caches derived from them can expire."""
+        self.rec_cache.note_writes(username, len(list(song_ids)))
+        self.stats_cache.mark_stale(username)
+
+    def on_follows_changed(self, follower: str, followed: str, following: bool):
+        """Call after committing a follow (following=True) or unfollow."""
+        self.stats_cache.mark_stale(follower)
+        self.stats_cache.mark_stale(followed)
+        self.follow_graph.note_follow(follower, followed, following)
+
     # lifecycle
     def on_close(self):
+        # stop frames' background workers before their connections go away
+        for frame in self.frames.values():
+            shutdown = getattr(frame, "shutdown", None)
+            if shutdown is not None:
+                try:
+                    shutdown()
+                except Exception:
+                    pass
         try:
             if hasattr(self, "conn") and self.conn:
                 self.conn.close()
         except Exception:
             pass
+        try:
+            close_pool()
+        except Exception:
+            pass
         try:
             close_tunnel()
         except Exception:
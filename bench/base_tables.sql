@@ -0,0 +1,63 @@
+-- Minimal copies of the course database's base tables (not kept in schema/),
+-- enough for the schema/ migrations and services to run in a scratch schema
+-- (bench.scratch).
+
+CREATE TABLE "USER" (
+  username      VARCHAR(20) PRIMARY KEY,
+  first_name    VARCHAR(40) NOT NULL DEFAULT '',
+  last_name     VARCHAR(40) NOT NULL DEFAULT '',
+  email         VARCHAR(255) UNIQUE NOT NULL,
+  password      VARCHAR(60) NOT NULL DEFAULT '',
+  display_name  VARCHAR(50) NOT NULL DEFAULT '',
+  creation_date TIMESTAMP NOT NULL DEFAULT NOW(),
+  last_accessed TIMESTAMP
+);
+CREATE TABLE "GROUP" (
+  group_id   VARCHAR(20) PRIMARY KEY,
+  group_name VARCHAR(100) NOT NULL
+);
+CREATE TABLE song (
+  song_id      VARCHAR(20) PRIMARY KEY,
+  title        VARCHAR(200) NOT NULL,
+  length_ms    INT,
+  release_date DATE,
+  group_id     VARCHAR(20) REFERENCES "GROUP"(group_id)
+);
+CREATE TABLE album (
+  album_id     VARCHAR(20) PRIMARY KEY,
+  album_name   VARCHAR(200) NOT NULL,
+  release_date DATE
+);
+CREATE TABLE song_within_album (
+  album_id VARCHAR(20) REFERENCES album(album_id),
+  song_id  VARCHAR(20) REFERENCES song(song_id),
+  PRIMARY KEY (album_id, song_id)
+);
+CREATE TABLE song_genre (
+  song_id VARCHAR(20) REFERENCES song(song_id),
+  genre   VARCHAR(40),
+  PRIMARY KEY (song_id, genre)
+);
+CREATE TABLE listen (
+  listener_username VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  song_id           VARCHAR(20) NOT NULL REFERENCES song(song_id),
+  date_of_view      TIMESTAMP NOT NULL,
+  PRIMARY KEY (listener_username, song_id, date_of_view)
+);
+CREATE TABLE user_follow (
+  follower_user_id VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  followed_user_id VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  PRIMARY KEY (follower_user_id, followed_user_id),
+  CHECK (follower_user_id <> followed_user_id)
+);
+CREATE TABLE collection (
+  collection_id    VARCHAR(20) PRIMARY KEY,
+  creator_username VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  collection_name  VARCHAR(100) NOT NULL,
+  creation_date    TIMESTAMP NOT NULL DEFAULT NOW()
+);
+CREATE TABLE song_within_collection (
+  collection_id VARCHAR(20) REFERENCES collection(collection_id),
+  song_id       VARCHAR(20) REFERENCES song(song_id),
+  PRIMARY KEY (collection_id, song_id)
+);
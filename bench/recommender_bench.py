@@ -0,0 +1,588 @@
+"""
+Benchmark "Recommended For You" on seeded synthetic listen data.
+
+    python -m bench.recommender_bench
+    python -m bench.recommender_bench --scales small,medium,large --k 10 --seed 7
+    python -m bench.recommender_bench --python-baseline   # also run the in-process ports
+
+For each scale a catalog (artists with a home genre, Zipf-distributed song
+popularity) and listeners with one to three favourite genres are generated.
+Each user's distinct songs are split: HOLDOUT of them are hidden and the
+recommenders see the rest.
+
+The visible listens are loaded into a scratch schema (bench.scratch) over a
+pooled connection, together with MinHash signatures and the rows
+jobs.recommend stores, and the app's own statements (services.recommendations)
+are timed there:
+
+    sql_live_scan   LIVE_SQL checking every listener
+    sql_live_lsh    LIVE_SQL limited to MinHash/LSH candidates (lookup included)
+    sql_stored      STORED_SQL over user_recommendations (needs numpy/scipy)
+
+Reported per query:
+
+    latency_ms      p50 / p95 / mean wall-clock time of one user's call
+    explain         EXPLAIN (ANALYZE, BUFFERS) of the first --explain users:
+                    execution / planning ms and shared buffers hit / read,
+                    plus the first user's plan
+    precision@k, recall@k against the hidden songs
+    coverage        distinct songs recommended / catalog size
+
+With --python-baseline the in-process ports are measured as well, with
+rows_touched = listen rows (or matrix entries) read per call:
+
+    overlap_scan    port of LIVE_SQL, scanning every listener
+    overlap_lsh     the same, limited to MinHash/LSH candidates (services.minhash)
+    content         genre/artist preferences (services.content_recs)
+    blended         overlap_lsh blended with content, as Recommended For You does
+    item_item       offline item-item cosine neighbors (jobs.recommend; needs numpy/scipy)
+
+Results are written as JSON tagged with the git revision so runs can be
+compared across commits.
+"""
+import argparse
+import csv
+import datetime
+import io
+import json
+import os
+import random
+import subprocess
+import time
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from bench.scratch import create_schema, drop_schema
+from db_connection import close_pool, close_tunnel, pooled_connection
+from services.catalog_index import CatalogSnapshot
+from services.content_recs import blend, features_for, preferences_from_plays
+from services import minhash
+from services.recommendations import LIVE_SQL, STORED_SQL
+
+SCALES = {
+    "small": {"users": 300, "songs": 2000},
+    "medium": {"users": 2000, "songs": 10000},
+    "large": {"users": 8000, "songs": 40000},
+}
+GENRES = [
+    "rock", "pop", "alternative", "breakcore", "blues", "country", "dance",
+    "folk", "ethnic", "lo-fi", "jazz", "rap", "hip hop",
+    "classical", "easy listening", "electronic", "soul", "metal", "punk",
+]
+SONGS_PER_ARTIST = 10
+HOLDOUT = 0.2
+# same threshold as the live query's similar_users CTE
+MIN_OVERLAP = 3
+
+# scratch schema per scale: SCRATCH_PREFIX + scale; dropped after the run
+SCRATCH_PREFIX = "bench_recs_"
+# tables the recommendation queries and jobs.recommend read or write
+MIGRATIONS = ("004_top_50_chart.sql", "007_user_recommendations.sql", "008_user_minhash.sql")
+
+Plays = Dict[str, Dict[str, int]]  # user -> {song_id: plays}
+Recommender = Callable[[str], Tuple[List[str], int]]  # user -> (song ids, rows touched)
+
+
+# ---------- data ----------
+
+class Dataset:
+    def __init__(self, scale: str, seed: int):
+        size = SCALES[scale]
+        rng = random.Random(f"{seed}:{scale}")
+        n_songs = size["songs"]
+        n_artists = max(1, n_songs // SONGS_PER_ARTIST)
+
+        artist_genre = [rng.randrange(len(GENRES)) for _ in range(n_artists)]
+        self.catalog_rows = []
+        songs_by_genre: Dict[int, List[str]] = defaultdict(list)
+        for i in range(n_songs):
+            song_id = f"s{i:06d}"
+            artist = rng.randrange(n_artists)
+            genres = {artist_genre[artist]}
+            if rng.random() < 0.3:
+                genres.add(rng.randrange(len(GENRES)))
+            for g in genres:
+                songs_by_genre[g].append(song_id)
+            self.catalog_rows.append((
+                song_id, f"Song {i}", f"Artist {artist}", f"Album {artist}-{i % 3}",
+                rng.randrange(120_000, 360_000), rng.randrange(1960, 2025),
+                [GENRES[g] for g in sorted(genres)],
+            ))
+        all_songs = [r[0] for r in self.catalog_rows]
+
+        # Zipf-ish popularity: song i drawn with weight 1 / (rank + 1)
+        def zipf_weights(ids):
+            return [1.0 / (rank + 1) for rank in range(len(ids))]
+        global_weights = zipf_weights(all_songs)
+        genre_weights = {g: zipf_weights(ids) for g, ids in songs_by_genre.items()}
+
+        self.train: Plays = {}
+        self.hidden: Dict[str, Set[str]] = {}
+        for u in range(size["users"]):
+            user = f"u{u:05d}"
+            favourites = rng.sample(sorted(songs_by_genre), k=min(len(songs_by_genre), rng.randint(1, 3)))
+            n_distinct = max(5, int(rng.lognormvariate(3.0, 0.7)))
+            plays: Dict[str, int] = {}
+            while len(plays) < min(n_distinct, n_songs):
+                if rng.random() < 0.75:
+                    g = rng.choice(favourites)
+                    song = rng.choices(songs_by_genre[g], weights=genre_weights[g])[0]
+                else:
+                    song = rng.choices(all_songs, weights=global_weights)[0]
+                plays[song] = plays.get(song, 0) + rng.randint(1, 4)
+            songs = sorted(plays)
+            rng.shuffle(songs)
+            n_hidden = max(1, int(len(songs) * HOLDOUT))
+            self.hidden[user] = set(songs[:n_hidden])
+            self.train[user] = {s: plays[s] for s in songs[n_hidden:]}
+
+        self.users = sorted(self.train)
+        self.listeners: Dict[str, List[str]] = defaultdict(list)
+        for user, plays in self.train.items():
+            for song in plays:
+                self.listeners[song].append(user)
+        self.snapshot = CatalogSnapshot(1, self.catalog_rows)
+
+
+# ---------- recommenders ----------
+
+def overlap_recommender(data: Dataset, k: int,
+                        candidates_of: Optional[Callable[[str], Set[str]]] = None) -> Recommender:
+    """Python port of services.recommendations.LIVE_SQL (similar_users -> candidate_plays)."""
+    def run(user: str) -> Tuple[List[str], int]:
+        mine = data.train[user]
+        allowed = candidates_of(user) if candidates_of else None
+        rows = len(mine)
+        overlap: Counter = Counter()
+        for song in mine:
+            for other in data.listeners[song]:
+                if allowed is not None and other not in allowed:
+                    continue
+                rows += data.train[other][song]
+                if other != user:
+                    overlap[other] += 1
+        scores: Counter = Counter()
+        for other, shared in overlap.items():
+            if shared < MIN_OVERLAP:
+                continue
+            for song, n in data.train[other].items():
+                rows += n
+                if song not in mine:
+                    scores[song] += n
+        ranked = sorted(scores.items(), key=lambda t: (-t[1], t[0]))[:k]
+        return [s for s, _ in ranked], rows
+    return run
+
+
+def lsh_candidates(data: Dataset) -> Callable[[str], Set[str]]:
+    """In-memory version of the user_lsh_bucket lookup."""
+    buckets: Dict[Tuple[int, int], List[str]] = defaultdict(list)
+    keys_of: Dict[str, List[int]] = {}
+    for user in data.users:
+        keys = minhash.band_buckets(minhash.signature(data.train[user]))
+        keys_of[user] = keys
+        for band, key in enumerate(keys):
+            buckets[(band, key)].append(user)
+
+    def candidates(user: str) -> Set[str]:
+        shared: Counter = Counter()
+        for band, key in enumerate(keys_of[user]):
+            for other in buckets[(band, key)]:
+                if other != user:
+                    shared[other] += 1
+        best = sorted(shared.items(), key=lambda t: (-t[1], t[0]))[:minhash.MAX_CANDIDATES]
+        return {u for u, _ in best}
+    return candidates
+
+
+def content_recommender(data: Dataset, k: int,
+                        collab: Optional[Recommender] = None) -> Recommender:
+    snap = data.snapshot
+    features_for(snap)
+
+    def run(user: str) -> Tuple[List[str], int]:
+        prefs = preferences_from_plays(data.train[user], snap)
+        rows = len(data.train[user]) + len(snap)
+        scores: Dict[str, float] = {}
+        if collab is not None:
+            songs, collab_rows = collab(user)
+            rows += collab_rows
+            # collab returns a ranking; give it descending scores
+            scores = {s: float(len(songs) - i) for i, s in enumerate(songs)}
+        if prefs is None:
+            return list(scores)[:k], rows
+        return [s for s, _ in blend(snap, prefs, scores, limit=k)], rows
+    return run
+
+
+def item_item_recommender(data: Dataset, k: int) -> Optional[Recommender]:
+    try:
+        import numpy as np
+        import scipy.sparse as sp
+        from jobs.recommend import NEIGHBORS, item_neighbors, recommend
+    except ImportError:
+        return None
+    user_ix = {u: i for i, u in enumerate(data.users)}
+    song_ids = sorted(data.listeners)
+    song_ix = {s: i for i, s in enumerate(song_ids)}
+    rows, cols, vals = [], [], []
+    for user, plays in data.train.items():
+        for song, n in plays.items():
+            rows.append(user_ix[user])
+            cols.append(song_ix[song])
+            vals.append(n)
+    matrix = sp.csr_matrix(
+        (np.log1p(np.asarray(vals, dtype=np.float32)), (rows, cols)),
+        shape=(len(user_ix), len(song_ids)), dtype=np.float32,
+    )
+    matrix.sort_indices()
+    neighbors = item_neighbors(matrix, NEIGHBORS)
+
+    def run(user: str) -> Tuple[List[str], int]:
+        u = user_ix[user]
+        row = matrix[u]
+        touched = row.nnz + int(sum(neighbors.indptr[c + 1] - neighbors.indptr[c] for c in row.indices))
+        recs = recommend(matrix, neighbors, np.asarray([u]), k)
+        songs = [song_ids[s] for s, _ in recs[0][1]] if recs else []
+        return songs, touched
+    return run
+
+
+# ---------- scratch schema ----------
+
+def _copy(cur, table: str, columns: Tuple[str, ...], rows: Iterable[tuple]) -> None:
+    buf = io.StringIO()
+    csv.writer(buf).writerows(rows)
+    buf.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buf)
+
+
+def load_dataset(cur, data: Dataset) -> bool:
+    """
+    Load `data`'s catalog and visible listens into the current search_path,
+    plus MinHash signatures and (with numpy/scipy) the rows jobs.recommend
+    stores. Returns whether user_recommendations was filled.
+    """
+    groups: Dict[str, str] = {}
+    albums: Dict[str, str] = {}
+    songs, song_albums, song_genres = [], [], []
+    for song_id, title, artist, album, length_ms, year, genres in data.catalog_rows:
+        group_id = groups.setdefault(artist, f"g{len(groups)}")
+        album_id = albums.setdefault(album, f"a{len(albums)}")
+        songs.append((song_id, title, length_ms, f"{year}-01-01", group_id))
+        song_albums.append((album_id, song_id))
+        song_genres.extend((song_id, g) for g in genres)
+    _copy(cur, '"USER"', ("username", "email"), ((u, f"{u}@bench") for u in data.users))
+    _copy(cur, '"GROUP"', ("group_id", "group_name"), ((g, a) for a, g in groups.items()))
+    _copy(cur, "album", ("album_id", "album_name"), ((i, a) for a, i in albums.items()))
+    _copy(cur, "song", ("song_id", "title", "length_ms", "release_date", "group_id"), songs)
+    _copy(cur, "song_within_album", ("album_id", "song_id"), song_albums)
+    _copy(cur, "song_genre", ("song_id", "genre"), song_genres)
+
+    # one listen row per play, each a second apart so the primary key holds
+    start = datetime.datetime.now().replace(microsecond=0)
+
+    def listens():
+        n = 0
+        for user in data.users:
+            for song, plays in sorted(data.train[user].items()):
+                for _ in range(plays):
+                    n += 1
+                    yield user, song, start - datetime.timedelta(seconds=n)
+    _copy(cur, "listen", ("listener_username", "song_id", "date_of_view"), listens())
+    cur.execute(
+        """
+        INSERT INTO song_daily_listens (day, song_id, listens)
+        SELECT date_of_view::date, song_id, COUNT(DISTINCT (listener_username, date_of_view))
+        FROM listen
+        GROUP BY 1, 2
+        """
+    )
+
+    signatures, buckets = [], []
+    for user in data.users:
+        sig = minhash.signature(data.train[user])
+        signatures.append((user, "{" + ",".join(map(str, sig)) + "}"))
+        buckets.extend((band, key, user) for band, key in enumerate(minhash.band_buckets(sig)))
+    _copy(cur, "user_minhash", ("username", "signature"), signatures)
+    _copy(cur, "user_lsh_bucket", ("band", "bucket", "username"), set(buckets))
+
+    stored = False
+    try:
+        import numpy as np
+        from jobs.recommend import NEIGHBORS, item_neighbors, load_listens, recommend, write_recommendations
+    except ImportError:
+        pass
+    else:
+        plays, usernames, song_ids = load_listens(cur)
+        recs = recommend(plays, item_neighbors(plays, NEIGHBORS), np.arange(len(usernames)))
+        write_recommendations(cur, recs, usernames, song_ids)
+        stored = True
+    cur.execute("ANALYZE")
+    return stored
+
+
+# (name, statement, params for one user); params may run their own queries
+SqlQuery = Tuple[str, str, Callable[[object, str], dict]]
+
+
+def sql_queries(stored: bool) -> List[SqlQuery]:
+    queries: List[SqlQuery] = [
+        ("sql_live_scan", LIVE_SQL, lambda cur, user: {"u": user, "candidates": None}),
+        ("sql_live_lsh", LIVE_SQL, lambda cur, user: {
+            "u": user, "candidates": minhash.similar_user_candidates(cur, user)}),
+    ]
+    if stored:
+        queries.append(("sql_stored", STORED_SQL, lambda cur, user: {"u": user}))
+    return queries
+
+
+def explain(cur, sql: str, params: dict) -> dict:
+    """EXPLAIN (ANALYZE, BUFFERS) of one execution."""
+    cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+    result = cur.fetchone()[0]
+    if isinstance(result, str):
+        result = json.loads(result)
+    return result[0]
+
+
+# ---------- measurement ----------
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _summary(data: Dataset, users: List[str], latencies: List[float],
+             recommended: List[List[str]], k: int) -> dict:
+    precision, recall = [], []
+    distinct: Set[str] = set()
+    for user, songs in zip(users, recommended):
+        hits = len(set(songs) & data.hidden[user])
+        precision.append(hits / k)
+        recall.append(hits / len(data.hidden[user]))
+        distinct.update(songs)
+    n = max(len(users), 1)
+    return {
+        "users_evaluated": len(users),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 3),
+            "p95": round(_percentile(latencies, 95), 3),
+            "mean": round(sum(latencies) / n, 3),
+        },
+        f"precision@{k}": round(sum(precision) / n, 4),
+        f"recall@{k}": round(sum(recall) / n, 4),
+        "coverage": round(len(distinct) / len(data.snapshot), 4),
+    }
+
+
+def evaluate(data: Dataset, recommender: Recommender, users: List[str], k: int) -> dict:
+    latencies, touched, recommended = [], [], []
+    for user in users:
+        started = time.perf_counter()
+        songs, rows = recommender(user)
+        latencies.append((time.perf_counter() - started) * 1000)
+        touched.append(rows)
+        recommended.append(songs)
+    result = _summary(data, users, latencies, recommended, k)
+    result["rows_touched"] = {
+        "mean": round(sum(touched) / max(len(users), 1), 1),
+        "p95": _percentile(touched, 95),
+    }
+    return result
+
+
+def evaluate_sql(cur, data: Dataset, query: SqlQuery, users: List[str], k: int,
+                 explain_users: int) -> dict:
+    """Time `query` per user (wall clock, round trips included), then EXPLAIN a few."""
+    _name, sql, params = query
+    cur.execute(sql, params(cur, users[0]))  # warm the cache and the plan
+    cur.fetchall()
+    latencies, recommended = [], []
+    for user in users:
+        started = time.perf_counter()
+        cur.execute(sql, params(cur, user))
+        rows = cur.fetchall()
+        latencies.append((time.perf_counter() - started) * 1000)
+        recommended.append([str(r[0]) for r in rows[:k]])
+    result = _summary(data, users, latencies, recommended, k)
+
+    plans = [explain(cur, sql, params(cur, user)) for user in users[:explain_users]]
+    if plans:
+        n = len(plans)
+        result["explain"] = {
+            "users": n,
+            "execution_ms": round(sum(p["Execution Time"] for p in plans) / n, 3),
+            "planning_ms": round(sum(p["Planning Time"] for p in plans) / n, 3),
+            "shared_hit_blocks": round(sum(p["Plan"].get("Shared Hit Blocks", 0) for p in plans) / n, 1),
+            "shared_read_blocks": round(sum(p["Plan"].get("Shared Read Blocks", 0) for p in plans) / n, 1),
+            "plan": plans[0]["Plan"],
+        }
+    return result
+
+
+def git_revision() -> str:
+    try:
+        rev = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                             text=True, check=True).stdout.strip()
+        dirty = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"],
+                               capture_output=True, text=True, check=True).stdout.strip()
+        return f"{rev}-dirty" if dirty else rev
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _print_result(name: str, result: dict, k: int) -> None:
+    line = (f"  {name:13s} p50 {result['latency_ms']['p50']:8.2f} ms  "
+            f"p95 {result['latency_ms']['p95']:8.2f} ms  ")
+    if "explain" in result:
+        plan = result["explain"]
+        line += (f"exec {plan['execution_ms']:8.2f} ms  "
+                 f"bufs {plan['shared_hit_blocks'] + plan['shared_read_blocks']:9.1f}  ")
+    if "rows_touched" in result:
+        line += f"rows {result['rows_touched']['mean']:10.1f}  "
+    line += (f"P@{k} {result[f'precision@{k}']:.3f}  R@{k} {result[f'recall@{k}']:.3f}  "
+             f"cov {result['coverage']:.3f}")
+    print(line)
+
+
+def run_sql(conn, data: Dataset, scale: str, users: List[str], k: int,
+            explain_users: int, keep: bool = False) -> dict:
+    """Load `data` into a scratch schema on `conn` and time the app's queries there."""
+    schema = SCRATCH_PREFIX + scale
+    results = {}
+    try:
+        started = time.perf_counter()
+        with conn.cursor() as cur:
+            drop_schema(cur, schema)
+            create_schema(cur, schema, MIGRATIONS)
+            stored = load_dataset(cur, data)
+        conn.commit()
+        print(f"  loaded into {schema} ({time.perf_counter() - started:.1f}s)")
+        with conn.cursor() as cur:
+            for query in sql_queries(stored):
+                result = evaluate_sql(cur, data, query, users, k, explain_users)
+                results[query[0]] = result
+                _print_result(query[0], result, k)
+            if not stored:
+                print("  sql_stored    skipped (numpy/scipy not installed)")
+                results["sql_stored"] = {"skipped": "numpy/scipy not installed"}
+        conn.rollback()
+    finally:
+        conn.rollback()
+        with conn.cursor() as cur:
+            if keep:
+                cur.execute("RESET search_path")
+            else:
+                drop_schema(cur, schema)
+        conn.commit()
+    return results
+
+
+def run_python(data: Dataset, users: List[str], k: int) -> dict:
+    """The in-process ports: a baseline, not a measurement of the SQL."""
+    builders: List[Tuple[str, Callable[[], Optional[Recommender]]]] = []
+    lsh: Dict[str, Callable[[str], Set[str]]] = {}
+
+    def overlap_lsh():
+        lsh["candidates"] = lsh_candidates(data)
+        return overlap_recommender(data, k, lsh["candidates"])
+
+    builders.append(("overlap_scan", lambda: overlap_recommender(data, k)))
+    builders.append(("overlap_lsh", overlap_lsh))
+    builders.append(("content", lambda: content_recommender(data, k)))
+    builders.append(("blended", lambda: content_recommender(
+        data, k, overlap_recommender(data, 50, lsh["candidates"]))))
+    builders.append(("item_item", lambda: item_item_recommender(data, k)))
+
+    results = {}
+    for name, build in builders:
+        started = time.perf_counter()
+        recommender = build()
+        build_s = time.perf_counter() - started
+        if recommender is None:
+            print(f"  {name:13s} skipped (numpy/scipy not installed)")
+            results[name] = {"skipped": "numpy/scipy not installed"}
+            continue
+        result = evaluate(data, recommender, users, k)
+        result["build_s"] = round(build_s, 3)
+        results[name] = result
+        _print_result(name, result, k)
+    return results
+
+
+def run_scale(scale: str, seed: int, k: int, sample: int, conn=None, explain_users: int = 5,
+              python_baseline: bool = False, keep: bool = False) -> dict:
+    started = time.perf_counter()
+    data = Dataset(scale, seed)
+    generated = time.perf_counter() - started
+    users = random.Random(seed).sample(data.users, min(sample, len(data.users)))
+    print(f"[{scale}] {len(data.users)} users, {len(data.snapshot)} songs, "
+          f"{sum(len(p) for p in data.train.values())} train pairs ({generated:.1f}s)")
+
+    results = {}
+    if conn is not None:
+        results.update(run_sql(conn, data, scale, users, k, explain_users, keep))
+    if python_baseline:
+        results.update(run_python(data, users, k))
+    return {
+        "users": len(data.users),
+        "songs": len(data.snapshot),
+        "users_evaluated": len(users),
+        "recommenders": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scales", default="small,medium",
+                        help=f"comma-separated, from {', '.join(SCALES)}")
+    parser.add_argument("--k", type=int, default=10, help="recommendations per user")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--sample", type=int, default=200,
+                        help="users evaluated per scale")
+    parser.add_argument("--explain", type=int, default=5,
+                        help="users per query run under EXPLAIN (ANALYZE, BUFFERS)")
+    parser.add_argument("--python-baseline", action="store_true",
+                        help="also measure the in-process Python ports")
+    parser.add_argument("--keep-schema", action="store_true",
+                        help=f"leave the {SCRATCH_PREFIX}<scale> schemas in place for inspection")
+    parser.add_argument("--out", default=None,
+                        help="JSON output path (default bench/results/recommenders_<rev>.json)")
+    args = parser.parse_args()
+
+    rev = git_revision()
+    report = {
+        "git_rev": rev,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "k": args.k,
+        "holdout": HOLDOUT,
+        "scales": {},
+    }
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    for scale in scales:
+        if scale not in SCALES:
+            parser.error(f"unknown scale '{scale}'")
+    try:
+        with pooled_connection() as conn:
+            for scale in scales:
+                report["scales"][scale] = run_scale(
+                    scale, args.seed, args.k, args.sample, conn, args.explain,
+                    args.python_baseline, args.keep_schema,
+                )
+    finally:
+        close_pool()
+        close_tunnel()
+
+    out = args.out or os.path.join(os.path.dirname(__file__), "results", f"recommenders_{rev}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Throwaway Postgres schemas holding the app's tables, for benchmarks and tests.
+
+create_schema() makes a schema with the base tables (base_tables.sql) plus the
+given schema/ migrations and points the session's search_path at it, so the
+app's unqualified SQL runs against whatever is loaded there.
+"""
+import os
+import re
+from typing import Iterable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_NAME = re.compile(r"[a-z_][a-z0-9_]*")
+
+
+def _read(*parts: str) -> str:
+    with open(os.path.join(ROOT, *parts)) as f:
+        return f.read()
+
+
+def _checked(name: str) -> str:
+    if not _NAME.fullmatch(name):
+        raise ValueError(f"Bad schema name: {name!r}")
+    return name
+
+
+def create_schema(cur, name: str, migrations: Iterable[str]) -> None:
+    """Create schema `name` with the base tables and `migrations` (file names in schema/)."""
+    name = _checked(name)
+    cur.execute(f"CREATE SCHEMA {name}")
+    cur.execute(f"SET search_path TO {name}, public")
+    cur.execute(_read("bench", "base_tables.sql"))
+    for migration in migrations:
+        cur.execute(_read("schema", migration))
+
+
+def drop_schema(cur, name: str) -> None:
+    cur.execute(f"DROP SCHEMA IF EXISTS {_checked(name)} CASCADE")
+    cur.execute("RESET search_path")
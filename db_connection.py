@@ -1,8 +1,11 @@
 import os
+import threading
+from contextlib import contextmanager
 from typing import Optional
 
 from sshtunnel import SSHTunnelForwarder
 import psycopg2 
+from psycopg2.pool import ThreadedConnectionPool
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -16,6 +19,14 @@ ssh_port = 22
 # keep a single tunnel for the process
 _TUNNEL: Optional[SSHTunnelForwarder] = None
 
+# connections for background work (frame prefetches etc.). The pool's own
+# getconn() raises when all are in use, so pooled_connection() waits on
+# _POOL_SLOTS first: extra background work queues instead of failing.
+POOL_MAXCONN = 6
+_POOL: Optional[ThreadedConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+_POOL_SLOTS = threading.BoundedSemaphore(POOL_MAXCONN)
+
 def _start_tunnel() -> SSHTunnelForwarder:
     """Start (or reuse) an SSH tunnel to the DB host."""
     global _TUNNEL
@@ -55,6 +66,57 @@ def get_connection():
     conn.autocommit = False
     return conn
 
+def _get_pool() -> ThreadedConnectionPool:
+    """create (or reuse) the shared connection pool over the tunnel"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL.closed:
+            t = _start_tunnel()
+            _POOL = ThreadedConnectionPool(
+                0,
+                POOL_MAXCONN,
+                dbname=db_name,
+                user=_DB_USER,
+                password=_DB_PASS,
+                host="127.0.0.1",
+                port=t.local_bind_port,
+                connect_timeout=10,
+            )
+        return _POOL
+
+@contextmanager
+def pooled_connection():
+    """
+    borrow a connection from the shared pool (safe from any thread):
+        with pooled_connection() as conn:
+            ...
+    whatever the block leaves uncommitted is rolled back on return; blocks
+    while all POOL_MAXCONN connections are borrowed
+    """
+    with _POOL_SLOTS:
+        pool = _get_pool()
+        conn = pool.getconn()
+        try:
+            yield conn
+        finally:
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    conn.rollback()
+                except Exception:
+                    broken = True
+            pool.putconn(conn, close=broken)
+
+def close_pool():
+    """close every pooled connection (called on app shutdown)"""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            try:
+                _POOL.closeall()
+            finally:
+                _POOL = None
+
 def close_tunnel():
     """stop the shared SSH tunnel (called on app shutdown)"""
     global _TUNNEL
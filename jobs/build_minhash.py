@@ -0,0 +1,85 @@
+"""
+Rebuild every listener's MinHash signature and LSH buckets from listen.
+
+    python -m jobs.build_minhash                          # full rebuild
+    python -m jobs.build_minhash --pending --interval 60  # fold new listens every minute
+
+Run a full rebuild once after applying schema/008. record_listens only
+queues new plays in user_minhash_pending (schema/018); --pending folds
+them in, so similar-listener lookups lag new listens by one interval.
+"""
+import argparse
+import time
+from itertools import groupby
+
+from db_connection import get_connection, close_tunnel
+from services.minhash import fold_pending_signatures, signature, store_signature
+
+
+def build_minhash(conn) -> int:
+    """Recompute all signatures in one transaction. Returns users indexed."""
+    users = 0
+    with conn.cursor() as read, conn.cursor() as write:
+        # cleared first: anything queued after this is also read below or
+        # stays queued for the next --pending run, and folding is idempotent
+        write.execute("DELETE FROM user_minhash_pending")
+        write.execute("DELETE FROM user_lsh_bucket")
+        write.execute("DELETE FROM user_minhash")
+        read.execute(
+            """
+            SELECT DISTINCT listener_username, song_id
+            FROM listen
+            ORDER BY listener_username
+            """
+        )
+        for username, rows in groupby(read, key=lambda r: r[0]):
+            store_signature(write, username, signature(r[1] for r in rows))
+            users += 1
+    conn.commit()
+    return users
+
+
+def fold_pending(conn) -> int:
+    """Apply queued listens to signatures in one transaction. Returns users updated."""
+    with conn.cursor() as cur:
+        users = fold_pending_signatures(cur)
+    conn.commit()
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pending", action="store_true",
+                        help="only fold listens queued since the last run")
+    parser.add_argument("--interval", type=int, default=0,
+                        help="with --pending: seconds between runs; 0 runs once")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        if not args.pending:
+            started = time.time()
+            users = build_minhash(conn)
+            print(f"indexed {users} listeners in {time.time() - started:.2f}s")
+            return
+        while True:
+            started = time.time()
+            try:
+                users = fold_pending(conn)
+                if users:
+                    print(f"updated {users} signatures in {time.time() - started:.2f}s")
+            except Exception as e:
+                conn.rollback()
+                print(f"minhash update failed: {e}")
+                if args.interval <= 0:
+                    raise
+            if args.interval <= 0:
+                break
+            time.sleep(max(0.0, args.interval - (time.time() - started)))
+    finally:
+        conn.close()
+        close_tunnel()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Check collection.song_count / total_length_ms against song_within_collection.
+
+    python -m jobs.check_collection_counters          # report drift
+    python -m jobs.check_collection_counters --fix    # and repair it
+
+Exits with status 1 if drift was found and not fixed.
+"""
+import argparse
+import sys
+
+from db_connection import get_connection, close_tunnel
+
+_DRIFT_SQL = """
+    SELECT c.collection_id,
+           c.song_count, t.song_count,
+           c.total_length_ms, t.total_length_ms
+    FROM collection c
+    JOIN (
+        SELECT c2.collection_id,
+               COUNT(cs.song_id) AS song_count,
+               COALESCE(SUM(s.length_ms), 0) AS total_length_ms
+        FROM collection c2
+        LEFT JOIN song_within_collection cs ON cs.collection_id = c2.collection_id
+        LEFT JOIN song s ON s.song_id = cs.song_id
+        GROUP BY c2.collection_id
+    ) t ON t.collection_id = c.collection_id
+    WHERE c.song_count <> t.song_count
+       OR c.total_length_ms <> t.total_length_ms
+    ORDER BY c.collection_id
+"""
+
+
+_FIX_SQL = """
+    UPDATE collection c
+    SET song_count = (
+            SELECT COUNT(*) FROM song_within_collection cs
+            WHERE cs.collection_id = c.collection_id
+        ),
+        total_length_ms = (
+            SELECT COALESCE(SUM(s.length_ms), 0)
+            FROM song_within_collection cs
+            JOIN song s ON s.song_id = cs.song_id
+            WHERE cs.collection_id = c.collection_id
+        )
+    WHERE c.collection_id = ANY(%s)
+    RETURNING c.collection_id, c.song_count, c.total_length_ms
+"""
+
+
+def check_counters(conn, fix: bool = False):
+    """Return [(collection_id, stored count, actual count, stored ms, actual ms)]."""
+    with conn.cursor() as cur:
+        cur.execute(_DRIFT_SQL)
+        drift = cur.fetchall()
+        if fix and drift:
+            ids = [cid for cid, *_ in drift]
+            # Lock first, recount in the next statement: under READ COMMITTED
+            # that statement takes a fresh snapshot, so it counts every song
+            # added or removed by a writer that held the row before us
+            # (FOR UPDATE alone would not re-run the aggregate).
+            cur.execute(
+                "SELECT collection_id FROM collection WHERE collection_id = ANY(%s) FOR UPDATE",
+                (ids,),
+            )
+            cur.execute(_FIX_SQL, (ids,))
+            fixed = {cid: (count, ms) for cid, count, ms in cur.fetchall()}
+            drift = [
+                (cid, stored, fixed[cid][0], stored_ms, fixed[cid][1])
+                for cid, stored, _c, stored_ms, _m in drift
+                if cid in fixed
+            ]
+    conn.commit()
+    return drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--fix", action="store_true", help="rewrite drifted counters")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        drift = check_counters(conn, fix=args.fix)
+    finally:
+        conn.close()
+        close_tunnel()
+
+    for cid, stored, actual, stored_ms, actual_ms in drift:
+        print(f"{cid}: song_count {stored} -> {actual}, total_length_ms {stored_ms} -> {actual_ms}")
+    if not drift:
+        print("all collection counters match.")
+    elif args.fix:
+        print(f"fixed {len(drift)} collection(s).")
+    else:
+        print(f"{len(drift)} collection(s) drifted; rerun with --fix.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Rebuild the song co-listen table ("people who played this also played").
+
+    python -m jobs.colisten
+    python -m jobs.colisten --top 20 --min-co-listeners 3
+
+Uses the same sparse matrices as jobs.recommend, with plays reduced to
+listened / not listened, so the neighbor score is the cosine of two songs'
+listener sets. Each song keeps its top-K neighbors (schema/010).
+
+Needs numpy and scipy.
+"""
+import argparse
+import csv
+import io
+import time
+
+import numpy as np
+
+from db_connection import get_connection, close_tunnel
+from jobs.recommend import item_neighbors, load_listens
+
+TOP_K = 20
+# pairs with fewer listeners in common are noise
+MIN_CO_LISTENERS = 2
+
+
+def write_colisten(cur, neighbors, listeners: np.ndarray, song_ids) -> int:
+    """
+    Replace song_colisten from the neighbor matrix, which item_neighbors
+    already limited to pairs with enough co-listeners. The caller commits.
+    """
+    buf = io.StringIO()
+    out = csv.writer(buf)
+    rows = 0
+    for i in range(neighbors.shape[0]):
+        lo, hi = neighbors.indptr[i], neighbors.indptr[i + 1]
+        cols = neighbors.indices[lo:hi]
+        sims = neighbors.data[lo:hi]
+        # binary vectors: cosine * sqrt(n_a * n_b) is the co-listener count
+        co = np.rint(sims * np.sqrt(listeners[i] * listeners[cols])).astype(np.int64)
+        order = np.lexsort((cols, -sims))
+        for rank, k in enumerate(order, start=1):
+            out.writerow((song_ids[i], rank, song_ids[cols[k]], int(co[k]), f"{sims[k]:.6g}"))
+            rows += 1
+    buf.seek(0)
+    cur.execute("DELETE FROM song_colisten")
+    cur.copy_expert(
+        "COPY song_colisten (song_id, rank, similar_song_id, co_listeners, score) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--top", type=int, default=TOP_K,
+                        help="similar songs kept per song")
+    parser.add_argument("--min-co-listeners", type=int, default=MIN_CO_LISTENERS,
+                        help="drop pairs with fewer listeners in common")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        started = time.time()
+        with conn.cursor() as cur:
+            plays, _usernames, song_ids = load_listens(cur)
+            conn.rollback()
+            listened = plays.copy()
+            listened.data[:] = 1.0
+            listeners = np.asarray(listened.sum(axis=0)).ravel()
+            # threshold before the top-K cut so niche songs keep supported neighbors
+            neighbors = item_neighbors(listened, args.top, min_co=args.min_co_listeners)
+            written = write_colisten(cur, neighbors, listeners, song_ids)
+        conn.commit()
+        print(f"wrote {written} co-listen pairs for {len(song_ids)} songs "
+              f"in {time.time() - started:.2f}s")
+    finally:
+        conn.close()
+        close_tunnel()
+
+
+if __name__ == "__main__":
+    main()
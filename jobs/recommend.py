@@ -0,0 +1,333 @@
+"""
+Compute per-user song recommendations with item-item collaborative filtering.
+
+    python -m jobs.recommend
+    python -m jobs.recommend --workers 8
+    python -m jobs.recommend --since-last-run   # only users with new listens
+
+Listens are loaded once into a sparse user x song matrix (play counts,
+log-scaled) and the top-K cosine neighbors of every song are computed. Both
+matrices are saved as .npy files that worker processes memory-map, and users
+are sharded across the pool in contiguous ranges. Each user's unheard songs
+are scored by summed similarity to what they played; the top N per user are
+bulk-loaded with COPY into user_recommendations (schema/007). Every run is
+logged in recommendation_runs (schema/009).
+
+Output is deterministic: ties are broken by song index and shards are
+written in user order.
+
+Needs numpy and scipy (job only; the app does not import them).
+"""
+import argparse
+import csv
+import io
+import os
+import tempfile
+import time
+from multiprocessing import Pool
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from db_connection import get_connection, close_tunnel
+
+NEIGHBORS = 50
+TOP_N = 50
+# songs per block when multiplying the item-item similarity matrix
+BLOCK = 2048
+# users per worker task
+SHARD_SIZE = 1000
+
+Recs = List[Tuple[int, List[Tuple[int, float]]]]
+
+
+def load_listens(cur) -> Tuple[sp.csr_matrix, List[str], List[str]]:
+    """Return (user x song play matrix, usernames, song_ids), both id lists sorted."""
+    cur.execute(
+        """
+        SELECT listener_username, song_id, COUNT(*)
+        FROM listen
+        GROUP BY listener_username, song_id
+        ORDER BY listener_username, song_id
+        """
+    )
+    user_ix: Dict[str, int] = {}
+    song_ix: Dict[str, int] = {}
+    rows: List[int] = []
+    cols: List[str] = []
+    vals: List[float] = []
+    for username, song_id, plays in cur:
+        rows.append(user_ix.setdefault(username, len(user_ix)))
+        cols.append(song_id)
+        vals.append(float(plays))
+    # number songs in sorted order so indices don't depend on listen order
+    for song_id in sorted(set(cols)):
+        song_ix[song_id] = len(song_ix)
+    matrix = sp.csr_matrix(
+        (np.log1p(np.asarray(vals, dtype=np.float32)),
+         (rows, [song_ix[c] for c in cols])),
+        shape=(len(user_ix), len(song_ix)),
+        dtype=np.float32,
+    )
+    matrix.sort_indices()
+    return matrix, list(user_ix), list(song_ix)
+
+
+def _top_k_rows(block: sp.csr_matrix, k: int) -> sp.csr_matrix:
+    """Keep the k largest entries of every row of a CSR matrix."""
+    block = block.tocsr()
+    block.eliminate_zeros()
+    indptr = [0]
+    indices: List[np.ndarray] = []
+    data: List[np.ndarray] = []
+    for i in range(block.shape[0]):
+        lo, hi = block.indptr[i], block.indptr[i + 1]
+        vals = block.data[lo:hi]
+        cols = block.indices[lo:hi]
+        if hi - lo > k:
+            # ties broken by column index so runs are reproducible
+            keep = np.lexsort((cols, -vals))[:k]
+            vals, cols = vals[keep], cols[keep]
+        indices.append(cols)
+        data.append(vals)
+        indptr.append(indptr[-1] + len(cols))
+    return sp.csr_matrix(
+        (np.concatenate(data) if data else np.empty(0, np.float32),
+         np.concatenate(indices) if indices else np.empty(0, np.int32),
+         np.asarray(indptr)),
+        shape=block.shape,
+    )
+
+
+def item_neighbors(plays: sp.csr_matrix, k: int = NEIGHBORS, min_co: int = 0) -> sp.csr_matrix:
+    """
+    Song x song matrix holding each song's top-k cosine neighbors
+    (itself excluded). For a binary (listened / not) matrix, `min_co` drops
+    pairs with fewer listeners in common before the top-k cut, so songs
+    keep their best well-supported neighbors rather than losing them to
+    single-listener pairs.
+    """
+    norms = np.sqrt(np.asarray(plays.multiply(plays).sum(axis=0))).ravel()
+    norms[norms == 0] = 1.0
+    cols = (plays @ sp.diags(1.0 / norms)).tocsc()
+    cols_t = cols.T.tocsr()
+    n_songs = plays.shape[1]
+    blocks = []
+    for start in range(0, n_songs, BLOCK):
+        stop = min(start + BLOCK, n_songs)
+        sims = (cols_t[start:stop] @ cols).tocoo()
+        keep = sims.row + start != sims.col
+        if min_co:
+            # binary vectors: cosine * |a| * |b| is the co-listener count
+            co = np.rint(sims.data * norms[sims.row + start] * norms[sims.col])
+            keep &= co >= min_co
+        sims = sp.csr_matrix(
+            (sims.data[keep], (sims.row[keep], sims.col[keep])),
+            shape=sims.shape,
+        )
+        blocks.append(_top_k_rows(sims, k))
+    return sp.vstack(blocks).tocsr() if blocks else sp.csr_matrix((0, 0))
+
+
+def recommend(plays: sp.csr_matrix, neighbors: sp.csr_matrix,
+              users: np.ndarray, top_n: int = TOP_N) -> Recs:
+    """[(user index, [(song index, score), ...best first]), ...] for `users`."""
+    out = []
+    for start in range(0, len(users), BLOCK):
+        batch = users[start:start + BLOCK]
+        user_rows = plays[batch]
+        scores = (user_rows @ neighbors).tocsr()
+        for i, user in enumerate(batch):
+            lo, hi = scores.indptr[i], scores.indptr[i + 1]
+            cols = scores.indices[lo:hi]
+            vals = scores.data[lo:hi]
+            seen = user_rows.indices[user_rows.indptr[i]:user_rows.indptr[i + 1]]
+            mask = (vals > 0) & ~np.isin(cols, seen)
+            cols, vals = cols[mask], vals[mask]
+            order = np.lexsort((cols, -vals))[:top_n]
+            if len(order):
+                out.append((int(user), list(zip(cols[order].tolist(), vals[order].tolist()))))
+    return out
+
+
+# ---- shared memory for the worker pool ----
+
+def _save_csr(directory: str, name: str, matrix: sp.csr_matrix) -> None:
+    for part in ("data", "indices", "indptr"):
+        np.save(os.path.join(directory, f"{name}.{part}.npy"), getattr(matrix, part))
+    np.save(os.path.join(directory, f"{name}.shape.npy"), np.asarray(matrix.shape))
+
+
+def _load_csr(directory: str, name: str) -> sp.csr_matrix:
+    parts = [np.load(os.path.join(directory, f"{name}.{part}.npy"), mmap_mode="r")
+             for part in ("data", "indices", "indptr")]
+    shape = tuple(np.load(os.path.join(directory, f"{name}.shape.npy")))
+    return sp.csr_matrix(tuple(parts), shape=shape, copy=False)
+
+
+_shared: Dict[str, object] = {}
+
+
+def _init_worker(directory: str, top_n: int) -> None:
+    _shared["plays"] = _load_csr(directory, "plays")
+    _shared["neighbors"] = _load_csr(directory, "neighbors")
+    _shared["top_n"] = top_n
+
+
+def _recommend_shard(users: np.ndarray) -> Recs:
+    return recommend(_shared["plays"], _shared["neighbors"], users, _shared["top_n"])
+
+
+def recommend_all(plays: sp.csr_matrix, neighbors: sp.csr_matrix, users: np.ndarray,
+                  top_n: int = TOP_N, workers: int = 1) -> Recs:
+    """Run `recommend` over `users`, sharded across `workers` processes."""
+    shards = [users[i:i + SHARD_SIZE] for i in range(0, len(users), SHARD_SIZE)]
+    out: Recs = []
+    done = 0
+
+    def progress(shard):
+        nonlocal done
+        done += len(shard)
+        print(f"  users {done}/{len(users)} ({100 * done // max(len(users), 1)}%)")
+
+    if workers <= 1:
+        for shard in shards:
+            out.extend(recommend(plays, neighbors, shard, top_n))
+            progress(shard)
+        return out
+
+    with tempfile.TemporaryDirectory(prefix="recommend-") as directory:
+        _save_csr(directory, "plays", plays)
+        _save_csr(directory, "neighbors", neighbors)
+        with Pool(workers, initializer=_init_worker, initargs=(directory, top_n)) as pool:
+            # imap keeps shard order, so output order matches a serial run
+            for shard, recs in zip(shards, pool.imap(_recommend_shard, shards)):
+                out.extend(recs)
+                progress(shard)
+    return out
+
+
+# ---- database ----
+
+def last_run_started(cur) -> Optional[object]:
+    cur.execute("SELECT MAX(started_at) FROM recommendation_runs")
+    return cur.fetchone()[0]
+
+
+def users_with_listens_since(cur, since) -> List[str]:
+    cur.execute(
+        "SELECT DISTINCT listener_username FROM listen WHERE date_of_view >= %s",
+        (since,),
+    )
+    return [r[0] for r in cur.fetchall()]
+
+
+def write_recommendations(cur, recs: Recs, usernames: List[str], song_ids: List[str],
+                          only_users: Optional[List[str]] = None) -> int:
+    """
+    COPY `recs` into a staging table, then replace user_recommendations
+    (or only the rows of `only_users`) from it. The caller commits.
+    """
+    buf = io.StringIO()
+    out = csv.writer(buf)
+    rows = 0
+    for u, songs in recs:
+        for rank, (s, score) in enumerate(songs, start=1):
+            out.writerow((usernames[u], rank, song_ids[s], f"{score:.6g}"))
+            rows += 1
+    buf.seek(0)
+
+    cur.execute(
+        """
+        CREATE TEMP TABLE user_recommendations_staging
+            (LIKE user_recommendations INCLUDING DEFAULTS) ON COMMIT DROP
+        """
+    )
+    cur.copy_expert(
+        "COPY user_recommendations_staging (username, rank, song_id, score) "
+        "FROM STDIN WITH (FORMAT csv)",
+        buf,
+    )
+    if only_users is None:
+        cur.execute("DELETE FROM user_recommendations")
+    else:
+        cur.execute(
+            "DELETE FROM user_recommendations WHERE username = ANY(%s)",
+            (only_users,),
+        )
+    cur.execute(
+        """
+        INSERT INTO user_recommendations (username, rank, song_id, score, computed_at)
+        SELECT username, rank, song_id, score, computed_at
+        FROM user_recommendations_staging
+        """
+    )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--neighbors", type=int, default=NEIGHBORS,
+                        help="neighbors kept per song")
+    parser.add_argument("--top", type=int, default=TOP_N,
+                        help="recommendations stored per user")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes (1 = no pool)")
+    parser.add_argument("--since-last-run", action="store_true",
+                        help="only recompute users with listens since the last run")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        started = time.time()
+        with conn.cursor() as cur:
+            cur.execute("SELECT NOW()")
+            (run_started,) = cur.fetchone()
+
+            only_users = None
+            if args.since_last_run:
+                since = last_run_started(cur)
+                if since is not None:
+                    only_users = users_with_listens_since(cur, since)
+                    print(f"{len(only_users)} users with listens since {since}")
+                    if not only_users:
+                        conn.rollback()
+                        return
+
+            plays, usernames, song_ids = load_listens(cur)
+            print(f"loaded {plays.nnz} user/song pairs "
+                  f"({len(usernames)} users, {len(song_ids)} songs) "
+                  f"in {time.time() - started:.2f}s")
+            conn.rollback()  # don't hold the read transaction open while computing
+
+            neighbors = item_neighbors(plays, args.neighbors)
+            print(f"computed song neighbors in {time.time() - started:.2f}s")
+
+            if only_users is None:
+                users = np.arange(len(usernames))
+            else:
+                index = {name: i for i, name in enumerate(usernames)}
+                users = np.asarray(sorted(index[u] for u in only_users if u in index),
+                                   dtype=np.int64)
+            recs = recommend_all(plays, neighbors, users, args.top, args.workers)
+
+            written = write_recommendations(cur, recs, usernames, song_ids, only_users)
+            cur.execute(
+                """
+                INSERT INTO recommendation_runs
+                    (started_at, users_written, rows_written, incremental)
+                VALUES (%s, %s, %s, %s)
+                """,
+                (run_started, len(recs), written, only_users is not None),
+            )
+        conn.commit()
+        print(f"wrote {written} recommendations for {len(recs)} users "
+              f"in {time.time() - started:.2f}s")
+    finally:
+        conn.close()
+        close_tunnel()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Rebuild the precomputed popularity charts.
+
+    python -m jobs.refresh_charts                # once
+    python -m jobs.refresh_charts --interval 60  # every minute
+"""
+import argparse
+import time
+
+from db_connection import get_connection, close_tunnel
+
+# SQL functions (see schema/) that rebuild or checkpoint one chart each
+CHART_FUNCTIONS = [
+    "refresh_chart_top_50_30d",
+    "checkpoint_song_trend",
+]
+
+
+def refresh_charts(conn):
+    """Run every chart refresh function in one transaction."""
+    with conn.cursor() as cur:
+        for fn in CHART_FUNCTIONS:
+            cur.execute(f"SELECT {fn}()")
+    conn.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interval", type=int, default=0,
+                        help="seconds between refreshes; 0 runs once")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        while True:
+            started = time.time()
+            try:
+                refresh_charts(conn)
+                print(f"charts refreshed in {time.time() - started:.2f}s")
+            except Exception as e:
+                conn.rollback()
+                print(f"chart refresh failed: {e}")
+                if args.interval <= 0:
+                    raise
+            if args.interval <= 0:
+                break
+            time.sleep(max(0.0, args.interval - (time.time() - started)))
+    finally:
+        conn.close()
+        close_tunnel()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Rebuild the song_search materialized view when the catalog changed.
+
+    python -m jobs.refresh_search               # one check
+    python -m jobs.refresh_search --interval 300
+"""
+import argparse
+import time
+
+from db_connection import get_connection, close_tunnel
+
+
+def refresh_song_search(conn) -> bool:
+    """Refresh song_search if catalog_version moved. Returns True if it was rebuilt."""
+    with conn.cursor() as cur:
+        cur.execute(
+            """
+            SELECT cv.version, ss.version
+            FROM catalog_version cv, song_search_state ss
+            """
+        )
+        catalog_version, built_version = cur.fetchone()
+        if catalog_version == built_version:
+            conn.rollback()
+            return False
+        cur.execute("REFRESH MATERIALIZED VIEW CONCURRENTLY song_search")
+        cur.execute(
+            "UPDATE song_search_state SET version = %s, refreshed_at = NOW()",
+            (catalog_version,),
+        )
+    conn.commit()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--interval", type=int, default=0,
+                        help="seconds between checks; 0 runs once")
+    args = parser.parse_args()
+
+    conn = get_connection()
+    try:
+        while True:
+            if refresh_song_search(conn):
+                print("song_search rebuilt.")
+            if args.interval <= 0:
+                break
+            time.sleep(args.interval)
+    finally:
+        conn.close()
+        close_tunnel()
+
+
+if __name__ == "__main__":
+    main()
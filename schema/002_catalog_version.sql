@@ -0,0 +1,46 @@
+-- Catalog version counter.
+--
+-- The app keeps an in-memory copy of the catalog (song, "GROUP", album,
+-- song_within_album, song_genre) and only reloads it when this number changes.
+-- Any write to a catalog table bumps the version once per statement.
+
+CREATE TABLE IF NOT EXISTS catalog_version (
+  id          BOOLEAN     PRIMARY KEY DEFAULT TRUE CHECK (id),
+  version     BIGINT      NOT NULL DEFAULT 1,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO catalog_version (id) VALUES (TRUE)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION bump_catalog_version() RETURNS trigger AS $$
+BEGIN
+  UPDATE catalog_version SET version = version + 1, updated_at = NOW();
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS song_catalog_version ON song;
+CREATE TRIGGER song_catalog_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON song
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+DROP TRIGGER IF EXISTS group_catalog_version ON "GROUP";
+CREATE TRIGGER group_catalog_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON "GROUP"
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+DROP TRIGGER IF EXISTS album_catalog_version ON album;
+CREATE TRIGGER album_catalog_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON album
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+DROP TRIGGER IF EXISTS song_within_album_catalog_version ON song_within_album;
+CREATE TRIGGER song_within_album_catalog_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON song_within_album
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
+
+DROP TRIGGER IF EXISTS song_genre_catalog_version ON song_genre;
+CREATE TRIGGER song_genre_catalog_version
+  AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON song_genre
+  FOR EACH STATEMENT EXECUTE FUNCTION bump_catalog_version();
@@ -0,0 +1,42 @@
+-- One lower-cased search document per song for the "all fields" search.
+--
+-- Rebuilt by `python -m jobs.refresh_search` whenever catalog_version
+-- (schema/002) moves past the version recorded in song_search_state.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE MATERIALIZED VIEW IF NOT EXISTS song_search AS
+SELECT
+    s.song_id,
+    LOWER(s.title) AS title_lc,
+    LOWER(COALESCE(g.group_name, '')) AS artist_lc,
+    LOWER(COALESCE(string_agg(DISTINCT al.album_name, ', '), '')) AS album_lc,
+    LOWER(COALESCE(string_agg(DISTINCT sg.genre::text, ', '), '')) AS genre_lc,
+    -- newline separated so a term can never match across two fields
+    LOWER(concat_ws(E'\n',
+        s.title,
+        g.group_name,
+        string_agg(DISTINCT al.album_name, ', '),
+        string_agg(DISTINCT sg.genre::text, ', ')
+    )) AS document
+FROM song s
+LEFT JOIN "GROUP" g             ON g.group_id = s.group_id
+LEFT JOIN song_within_album swa ON swa.song_id = s.song_id
+LEFT JOIN album al              ON al.album_id = swa.album_id
+LEFT JOIN song_genre sg         ON sg.song_id = s.song_id
+GROUP BY s.song_id, s.title, g.group_name;
+
+CREATE UNIQUE INDEX IF NOT EXISTS song_search_song_id_idx ON song_search (song_id);
+CREATE INDEX IF NOT EXISTS song_search_document_trgm_idx
+    ON song_search USING gin (document gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS song_search_title_prefix_idx
+    ON song_search (title_lc text_pattern_ops);
+
+CREATE TABLE IF NOT EXISTS song_search_state (
+  id            BOOLEAN     PRIMARY KEY DEFAULT TRUE CHECK (id),
+  version       BIGINT      NOT NULL DEFAULT 0,
+  refreshed_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+INSERT INTO song_search_state (id) VALUES (TRUE)
+ON CONFLICT (id) DO NOTHING;
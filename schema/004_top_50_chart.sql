@@ -0,0 +1,85 @@
+-- Per-song daily listen counters and the precomputed "Top 50 – Last 30 Days" chart.
+--
+-- song_daily_listens is bumped by services.listens.record_listens in the same
+-- statement as the listen insert. chart_top_50_30d is rebuilt from it by
+-- refresh_chart_top_50_30d(), run every minute by `python -m jobs.refresh_charts`.
+
+CREATE TABLE IF NOT EXISTS song_daily_listens (
+  day      DATE        NOT NULL,
+  song_id  VARCHAR(20) NOT NULL REFERENCES song(song_id),
+  listens  INT         NOT NULL,
+  CONSTRAINT song_daily_listens_pk PRIMARY KEY (day, song_id)
+);
+
+CREATE INDEX IF NOT EXISTS song_daily_listens_song_idx ON song_daily_listens (song_id, day);
+
+-- backfill from existing history
+INSERT INTO song_daily_listens (day, song_id, listens)
+SELECT date_of_view::date, song_id, COUNT(DISTINCT (listener_username, date_of_view))
+FROM listen
+GROUP BY 1, 2
+ON CONFLICT (day, song_id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS chart_top_50_30d (
+  rank          SMALLINT    PRIMARY KEY,
+  song_id       VARCHAR(20) NOT NULL,
+  song          TEXT        NOT NULL,
+  artist        TEXT        NOT NULL,
+  album         TEXT        NOT NULL,
+  length_ms     INT,
+  listen_count  INT         NOT NULL,
+  release_date  DATE,
+  release_year  INT
+);
+
+CREATE TABLE IF NOT EXISTS chart_refresh (
+  chart         TEXT        PRIMARY KEY,
+  refreshed_at  TIMESTAMPTZ NOT NULL
+);
+
+-- "last 30 days" = today and the 29 days before it (whole-day buckets)
+CREATE OR REPLACE FUNCTION refresh_chart_top_50_30d() RETURNS void AS $$
+  DELETE FROM chart_top_50_30d;
+
+  WITH counts AS (
+      SELECT song_id, SUM(listens)::int AS listen_count
+      FROM song_daily_listens
+      WHERE day > CURRENT_DATE - 30
+      GROUP BY song_id
+  ),
+  top AS (
+      SELECT
+          c.song_id,
+          c.listen_count,
+          s.title AS song,
+          COALESCE(g.group_name, '') AS artist,
+          s.length_ms,
+          s.release_date
+      FROM counts c
+      JOIN song s         ON s.song_id = c.song_id
+      LEFT JOIN "GROUP" g ON g.group_id = s.group_id
+      ORDER BY c.listen_count DESC, LOWER(s.title) ASC, LOWER(COALESCE(g.group_name, '')) ASC
+      LIMIT 50
+  )
+  INSERT INTO chart_top_50_30d
+      (rank, song_id, song, artist, album, length_ms, listen_count, release_date, release_year)
+  SELECT
+      ROW_NUMBER() OVER (ORDER BY t.listen_count DESC, LOWER(t.song) ASC, LOWER(t.artist) ASC),
+      t.song_id,
+      t.song,
+      t.artist,
+      COALESCE(string_agg(DISTINCT al.album_name, ', '), ''),
+      t.length_ms,
+      t.listen_count,
+      COALESCE(MIN(t.release_date), MIN(al.release_date)),
+      EXTRACT(YEAR FROM COALESCE(MIN(t.release_date), MIN(al.release_date)))
+  FROM top t
+  LEFT JOIN song_within_album swa ON swa.song_id = t.song_id
+  LEFT JOIN album al              ON al.album_id = swa.album_id
+  GROUP BY t.song_id, t.song, t.artist, t.length_ms, t.listen_count;
+
+  INSERT INTO chart_refresh (chart, refreshed_at) VALUES ('top_50_30_days', NOW())
+  ON CONFLICT (chart) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at;
+$$ LANGUAGE sql;
+
+SELECT refresh_chart_top_50_30d();
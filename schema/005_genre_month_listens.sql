@@ -0,0 +1,20 @@
+-- Listens per genre per calendar month.
+--
+-- Maintained by services.listens.record_listens (one row per genre of each
+-- played song, same as joining listen to song_genre). Backs the
+-- "Top 5 Genres – This Month" and "Genre Trends" views.
+
+CREATE TABLE IF NOT EXISTS genre_month_listens (
+  month    DATE   NOT NULL,  -- first day of the month
+  genre    TEXT   NOT NULL,
+  listens  BIGINT NOT NULL,
+  CONSTRAINT genre_month_listens_pk PRIMARY KEY (month, genre)
+);
+
+-- backfill from existing history
+INSERT INTO genre_month_listens (month, genre, listens)
+SELECT date_trunc('month', li.date_of_view)::date, sg.genre::text, COUNT(*)
+FROM listen li
+JOIN song_genre sg ON sg.song_id = li.song_id
+GROUP BY 1, 2
+ON CONFLICT (month, genre) DO NOTHING;
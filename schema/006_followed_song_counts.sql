@@ -0,0 +1,29 @@
+-- Per-user "Top 50 – Followed Users" feed.
+--
+-- followed_song_counts(username, song_id, plays) holds, for each user whose
+-- feed is built (followed_feed_state), the plays of that user plus everyone
+-- they follow. Feeds are built on first view (services.follows.ensure_followed_feed)
+-- and then kept current:
+--   * listens fan out to the listener's own feed and their followers' feeds
+--     (services.listens.record_listens); listeners with very many followers
+--     invalidate those feeds instead, so they are rebuilt on next view
+--   * follow / unfollow add / subtract the followed user's plays
+--     (services.follows)
+
+CREATE TABLE IF NOT EXISTS followed_song_counts (
+  username  VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  song_id   VARCHAR(20) NOT NULL REFERENCES song(song_id),
+  plays     INT         NOT NULL,
+  CONSTRAINT followed_song_counts_pk PRIMARY KEY (username, song_id)
+);
+
+CREATE INDEX IF NOT EXISTS followed_song_counts_top_idx
+    ON followed_song_counts (username, plays DESC);
+
+CREATE TABLE IF NOT EXISTS followed_feed_state (
+  username  VARCHAR(20) PRIMARY KEY REFERENCES "USER"(username),
+  built_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- reverse lookup used by the fan-out (followers of a listener)
+CREATE INDEX IF NOT EXISTS user_follow_followed_idx ON user_follow (followed_user_id);
@@ -0,0 +1,13 @@
+-- Per-user "Recommended For You" lists computed offline by
+-- `python -m jobs.recommend` (item-item collaborative filtering).
+-- The Recommendations page reads a user's rows directly and falls back to
+-- the live SQL for users without any (new users, or not yet computed).
+
+CREATE TABLE IF NOT EXISTS user_recommendations (
+  username     VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  rank         SMALLINT    NOT NULL,
+  song_id      VARCHAR(20) NOT NULL REFERENCES song(song_id),
+  score        REAL        NOT NULL,
+  computed_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  CONSTRAINT user_recommendations_pk PRIMARY KEY (username, rank)
+);
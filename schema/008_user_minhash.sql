@@ -0,0 +1,21 @@
+-- MinHash signatures of each listener's distinct song set plus an LSH band
+-- index over them (services.minhash), used to find candidate similar users
+-- for recommendations without scanning every listener.
+--
+-- Build or rebuild with `python -m jobs.build_minhash`; new listens are
+-- queued by record_listens and folded in by `--pending` (schema/018).
+
+CREATE TABLE IF NOT EXISTS user_minhash (
+  username    VARCHAR(20) PRIMARY KEY REFERENCES "USER"(username),
+  signature   BIGINT[]    NOT NULL,
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE TABLE IF NOT EXISTS user_lsh_bucket (
+  band      SMALLINT    NOT NULL,
+  bucket    BIGINT      NOT NULL,
+  username  VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  CONSTRAINT user_lsh_bucket_pk PRIMARY KEY (band, bucket, username)
+);
+
+CREATE INDEX IF NOT EXISTS user_lsh_bucket_user_idx ON user_lsh_bucket (username, band);
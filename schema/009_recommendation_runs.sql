@@ -0,0 +1,11 @@
+-- One row per completed `python -m jobs.recommend` run. --since-last-run
+-- recomputes only users with listens at or after the last run's start.
+
+CREATE TABLE IF NOT EXISTS recommendation_runs (
+  run_id         SERIAL      PRIMARY KEY,
+  started_at     TIMESTAMPTZ NOT NULL,
+  finished_at    TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  users_written  INT         NOT NULL,
+  rows_written   INT         NOT NULL,
+  incremental    BOOLEAN     NOT NULL
+);
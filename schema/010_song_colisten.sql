@@ -0,0 +1,13 @@
+-- "People who played this also played": for each song, its top co-listened
+-- songs by cosine similarity of their listener sets (co-listeners divided by
+-- sqrt(listeners of a * listeners of b), so hits don't pair with everything).
+-- Rebuilt by `python -m jobs.colisten`; read with one primary-key range scan.
+
+CREATE TABLE IF NOT EXISTS song_colisten (
+  song_id          VARCHAR(20) NOT NULL REFERENCES song(song_id),
+  rank             SMALLINT    NOT NULL,
+  similar_song_id  VARCHAR(20) NOT NULL REFERENCES song(song_id),
+  co_listeners     INT         NOT NULL,
+  score            REAL        NOT NULL,
+  CONSTRAINT song_colisten_pk PRIMARY KEY (song_id, rank)
+);
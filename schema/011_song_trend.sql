@@ -0,0 +1,69 @@
+-- "Trending Now": exponentially decayed per-song play scores.
+--
+-- Forward decay: a listen at time t adds exp(decay * (t - landmark)) to its
+-- song's score, so scores never need to be decayed on write and ordering by
+-- the raw score is ordering by decayed plays. The current decayed value is
+-- score * exp(-decay * (NOW() - landmark)).
+--
+-- services.listens.record_listens bumps song_trend in the same statement as
+-- the listen insert. checkpoint_song_trend(), run by `python -m jobs.refresh_charts`,
+-- moves the landmark forward (rescaling scores before they can overflow) and
+-- keeps only the top trend_capacity songs, which bounds the table's size.
+-- (schema/019 replaces checkpoint_song_trend and clamps the exponents.)
+
+CREATE TABLE IF NOT EXISTS trend_epoch (
+  id        BOOLEAN          PRIMARY KEY DEFAULT TRUE CHECK (id),
+  landmark  TIMESTAMPTZ      NOT NULL,
+  decay     DOUBLE PRECISION NOT NULL,   -- per second; ln 2 / half-life
+  capacity  INT              NOT NULL
+);
+
+-- half-life of 6 hours, at most 5000 tracked songs
+INSERT INTO trend_epoch (landmark, decay, capacity)
+VALUES (NOW(), ln(2) / (6 * 3600), 5000)
+ON CONFLICT (id) DO NOTHING;
+
+CREATE TABLE IF NOT EXISTS song_trend (
+  song_id  VARCHAR(20)      PRIMARY KEY REFERENCES song(song_id),
+  score    DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS song_trend_score_idx ON song_trend (score DESC);
+
+CREATE OR REPLACE FUNCTION checkpoint_song_trend() RETURNS void AS $$
+  -- rebase once a day; the row lock makes concurrent listen inserts wait
+  WITH old AS (
+      SELECT landmark, decay FROM trend_epoch
+      WHERE landmark < NOW() - INTERVAL '1 day'
+      FOR UPDATE
+  ),
+  rescaled AS (
+      UPDATE song_trend t
+      SET score = t.score * exp(-old.decay * EXTRACT(EPOCH FROM NOW() - old.landmark))
+      FROM old
+  )
+  UPDATE trend_epoch SET landmark = NOW() FROM old;
+
+  -- forget songs outside the top `capacity` or decayed below 0.01 plays
+  DELETE FROM song_trend
+  WHERE song_id IN (
+      SELECT r.song_id
+      FROM (
+          SELECT song_id, score, row_number() OVER (ORDER BY score DESC) AS rn
+          FROM song_trend
+      ) r
+      CROSS JOIN trend_epoch te
+      WHERE r.rn > te.capacity
+         OR r.score * exp(-te.decay * EXTRACT(EPOCH FROM NOW() - te.landmark)) < 0.01
+  );
+$$ LANGUAGE sql;
+
+-- seed from the last three days of history
+INSERT INTO song_trend (song_id, score)
+SELECT li.song_id,
+       SUM(exp(te.decay * EXTRACT(EPOCH FROM li.date_of_view::timestamptz - te.landmark)))
+FROM listen li
+CROSS JOIN trend_epoch te
+WHERE li.date_of_view >= NOW() - INTERVAL '3 days'
+GROUP BY li.song_id
+ON CONFLICT (song_id) DO NOTHING;
@@ -0,0 +1,24 @@
+-- Per-collection song count and total length, kept on collection itself by
+-- services.collections in the same statement as every add / remove, so the
+-- Collections page lists a user's collections with one indexed read.
+-- `python -m jobs.check_collection_counters [--fix]` verifies them.
+
+ALTER TABLE collection ADD COLUMN IF NOT EXISTS song_count      INT    NOT NULL DEFAULT 0;
+ALTER TABLE collection ADD COLUMN IF NOT EXISTS total_length_ms BIGINT NOT NULL DEFAULT 0;
+
+UPDATE collection c
+SET song_count = t.song_count,
+    total_length_ms = t.total_length_ms
+FROM (
+    SELECT c2.collection_id,
+           COUNT(cs.song_id) AS song_count,
+           COALESCE(SUM(s.length_ms), 0) AS total_length_ms
+    FROM collection c2
+    LEFT JOIN song_within_collection cs ON cs.collection_id = c2.collection_id
+    LEFT JOIN song s ON s.song_id = cs.song_id
+    GROUP BY c2.collection_id
+) t
+WHERE t.collection_id = c.collection_id;
+
+CREATE INDEX IF NOT EXISTS collection_creator_name_idx
+    ON collection (creator_username, collection_name);
@@ -0,0 +1,13 @@
+-- Server-side collection ids: '#' followed by 12 random letters/digits
+-- (matches '^#[A-Za-z0-9]{1,19}$'). With 62^12 possible ids a collision is
+-- practically impossible; services.collections still retries on one.
+
+CREATE OR REPLACE FUNCTION new_collection_id() RETURNS VARCHAR AS $$
+  SELECT '#' || string_agg(
+      substr('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789',
+             1 + floor(random() * 62)::int, 1),
+      '')
+  FROM generate_series(1, 12)
+$$ LANGUAGE sql VOLATILE;
+
+ALTER TABLE collection ALTER COLUMN collection_id SET DEFAULT new_collection_id();
@@ -0,0 +1,14 @@
+-- Where a user's simulated playback of a queue (currently: a collection,
+-- keyed by collection_id) stopped, so Play All can offer to resume there.
+-- `position` is the 0-based index of the next song in the queue's order
+-- (title, song_id). Written by services.playback; the row is removed once
+-- the queue has been played to the end, and by CollectionsFrame when the
+-- collection is deleted (queue_key has no FK so other queues can reuse it).
+
+CREATE TABLE IF NOT EXISTS playback_position (
+  username    VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  queue_key   VARCHAR(20) NOT NULL,
+  position    INT         NOT NULL CHECK (position > 0),
+  updated_at  TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  CONSTRAINT playback_position_pk PRIMARY KEY (username, queue_key)
+);
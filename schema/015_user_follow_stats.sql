@@ -0,0 +1,28 @@
+-- Follower / following counts per user, kept in step with user_follow by
+-- services.follows.follow / unfollow (same statement as the follow row), so
+-- the Follow page reads counts instead of counting user_follow per row.
+-- Users without a row have no followers and follow nobody.
+-- Bulk loads that write user_follow directly (userGeneration/) should run
+-- SELECT rebuild_user_follow_stats() afterwards.
+
+CREATE TABLE IF NOT EXISTS user_follow_stats (
+  username         VARCHAR(20) PRIMARY KEY REFERENCES "USER"(username),
+  follower_count   INT         NOT NULL DEFAULT 0 CHECK (follower_count >= 0),
+  following_count  INT         NOT NULL DEFAULT 0 CHECK (following_count >= 0)
+);
+
+CREATE OR REPLACE FUNCTION rebuild_user_follow_stats() RETURNS void AS $$
+  DELETE FROM user_follow_stats;
+  INSERT INTO user_follow_stats (username, follower_count, following_count)
+  SELECT username, SUM(followers), SUM(following)
+  FROM (
+      SELECT followed_user_id AS username, COUNT(*) AS followers, 0 AS following
+      FROM user_follow GROUP BY followed_user_id
+      UNION ALL
+      SELECT follower_user_id, 0, COUNT(*)
+      FROM user_follow GROUP BY follower_user_id
+  ) t
+  GROUP BY username;
+$$ LANGUAGE sql;
+
+SELECT rebuild_user_follow_stats();
@@ -0,0 +1,32 @@
+-- Listens per (user, artist), for the Follow page's "Top 10 Artists".
+-- Bumped by every listen insert (services.listens._ROLLUPS), so reading a
+-- user's top artists no longer aggregates their whole listen history.
+-- Songs without a group count under their own 'song:<id>' key, labelled
+-- 'Unknown Artist: <title>', as the old on-the-fly query did.
+
+CREATE TABLE IF NOT EXISTS user_artist_listens (
+  username      VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  artist_key    TEXT        NOT NULL,
+  artist_label  TEXT        NOT NULL,
+  listens       INT         NOT NULL,
+  CONSTRAINT user_artist_listens_pk PRIMARY KEY (username, artist_key)
+);
+
+CREATE INDEX IF NOT EXISTS user_artist_listens_top_idx
+  ON user_artist_listens (username, listens DESC);
+
+INSERT INTO user_artist_listens (username, artist_key, artist_label, listens)
+SELECT
+  li.listener_username,
+  CASE WHEN g.group_id IS NOT NULL THEN g.group_id::text ELSE 'song:' || s.song_id::text END,
+  CASE
+    WHEN g.group_id IS NOT NULL AND g.group_name IS NOT NULL THEN g.group_name
+    WHEN g.group_id IS NOT NULL THEN 'Unknown (group ' || g.group_id::text || ')'
+    ELSE 'Unknown Artist: ' || COALESCE(s.title, s.song_id::text)
+  END,
+  COUNT(*)
+FROM listen li
+JOIN song s ON s.song_id = li.song_id
+LEFT JOIN "GROUP" g ON g.group_id = s.group_id
+GROUP BY 1, 2, 3
+ON CONFLICT (username, artist_key) DO NOTHING;
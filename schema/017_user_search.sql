@@ -0,0 +1,19 @@
+-- Indexes for the Follow page's user search (services.user_search).
+-- Substring matches (3+ characters) use the trigram indexes; shorter terms
+-- only match as prefixes, which the text_pattern_ops indexes serve.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS user_username_trgm_idx
+    ON "USER" USING gin (LOWER(username) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS user_display_name_trgm_idx
+    ON "USER" USING gin (LOWER(display_name) gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS user_email_trgm_idx
+    ON "USER" USING gin (LOWER(email) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS user_username_prefix_idx
+    ON "USER" (LOWER(username) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS user_display_name_prefix_idx
+    ON "USER" (LOWER(display_name) text_pattern_ops);
+CREATE INDEX IF NOT EXISTS user_email_prefix_idx
+    ON "USER" (LOWER(email) text_pattern_ops);
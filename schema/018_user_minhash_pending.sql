@@ -0,0 +1,11 @@
+-- Songs played since their listener's MinHash signature (schema/008) was
+-- last updated. record_listens only appends here, inside its single insert
+-- statement; `python -m jobs.build_minhash --pending --interval 60` folds
+-- them into user_minhash / user_lsh_bucket and clears them. Similar-listener
+-- candidates therefore lag new listens by up to one job interval.
+
+CREATE TABLE IF NOT EXISTS user_minhash_pending (
+  username  VARCHAR(20) NOT NULL REFERENCES "USER"(username),
+  song_id   VARCHAR(20) NOT NULL REFERENCES song(song_id),
+  CONSTRAINT user_minhash_pending_pk PRIMARY KEY (username, song_id)
+);
@@ -0,0 +1,50 @@
+-- Keep the "Trending Now" scores (schema/011) writable however long the
+-- landmark goes without a rebase, and make the rebase see every listen.
+--
+-- trend_exp(x) is exp(x) with x clamped to +-600. Postgres raises on float8
+-- overflow and underflow, and with a 6 hour half-life exp(decay * age)
+-- overflows once the landmark is ~256 days old, after which every listen
+-- insert would fail. Past the clamp, new listens all weigh the same until
+-- jobs.refresh_charts rebases again; writes and reads keep working.
+--
+-- checkpoint_song_trend() becomes plpgsql so the rescale runs as its own
+-- statement after the trend_epoch row lock is granted: its snapshot then
+-- includes song_trend rows inserted by listens that committed while the lock
+-- was waited for (a single SQL statement would rescale from the snapshot
+-- taken before the wait and miss them while still moving the landmark).
+
+CREATE OR REPLACE FUNCTION trend_exp(x DOUBLE PRECISION) RETURNS DOUBLE PRECISION AS $$
+  SELECT exp(LEAST(GREATEST(x, -600), 600))
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION checkpoint_song_trend() RETURNS void AS $$
+DECLARE
+  old_landmark TIMESTAMPTZ;
+  old_decay    DOUBLE PRECISION;
+BEGIN
+  -- rebase once a day; the row lock makes concurrent listen inserts wait
+  SELECT landmark, decay INTO old_landmark, old_decay
+  FROM trend_epoch
+  WHERE landmark < NOW() - INTERVAL '1 day'
+  FOR UPDATE;
+
+  IF FOUND THEN
+    UPDATE song_trend
+    SET score = score * trend_exp(-old_decay * EXTRACT(EPOCH FROM NOW() - old_landmark));
+    UPDATE trend_epoch SET landmark = NOW();
+  END IF;
+
+  -- forget songs outside the top `capacity` or decayed below 0.01 plays
+  DELETE FROM song_trend
+  WHERE song_id IN (
+      SELECT r.song_id
+      FROM (
+          SELECT song_id, score, row_number() OVER (ORDER BY score DESC) AS rn
+          FROM song_trend
+      ) r
+      CROSS JOIN trend_epoch te
+      WHERE r.rn > te.capacity
+         OR r.score * trend_exp(-te.decay * EXTRACT(EPOCH FROM NOW() - te.landmark)) < 0.01
+  );
+END;
+$$ LANGUAGE plpgsql;
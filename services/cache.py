@@ -0,0 +1,119 @@
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import Any, Dict, Hashable, Iterator, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Small key -> value cache with a freshness TTL, for stale-while-revalidate.
+
+    get() returns (value, fresh): entries younger than `ttl` are fresh, older
+    ones are still returned (fresh=False) until `max_stale`, so callers can
+    paint them and recompute in the background. note_writes() counts changes
+    behind an entry's back and marks it stale once `invalidate_after` pile up.
+
+    With `path`, entries are also kept in a local sqlite file shared by every
+    app instance on the machine (values are pickled). The file is the source
+    of truth: get() checks it every time, so puts and mark_stale() calls made
+    by other instances are seen at once; the in-memory copy only saves
+    unpickling an unchanged value.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_stale: float,
+                 invalidate_after: int = 1, path: Optional[str] = None):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self.invalidate_after = invalidate_after
+        self.path = path
+        self._lock = threading.Lock()
+        self._entries: Dict[Hashable, Tuple[Any, float]] = {}
+        self._writes: Dict[Hashable, int] = {}
+        if path:
+            with self._store() as db:
+                db.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS cache (
+                        namespace TEXT, key TEXT, stored_at REAL, value BLOB,
+                        PRIMARY KEY (namespace, key)
+                    )
+                    """
+                )
+
+    @contextmanager
+    def _store(self) -> Iterator[sqlite3.Connection]:
+        # one short-lived connection per call keeps this usable from any thread;
+        # `with db` commits, closing() releases the file handle
+        with closing(sqlite3.connect(self.path, timeout=5)) as db, db:
+            yield db
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, bool]]:
+        """(value, fresh) or None if missing or older than max_stale."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if self.path:
+            with self._store() as db:
+                # the value only comes back when it differs from our copy
+                row = db.execute(
+                    "SELECT stored_at, CASE WHEN stored_at = ? THEN NULL ELSE value END "
+                    "FROM cache WHERE namespace = ? AND key = ?",
+                    (entry[1] if entry else None, self.namespace, repr(key)),
+                ).fetchone()
+            if row is None:
+                entry = None
+            elif row[1] is not None:
+                entry = (pickle.loads(row[1]), row[0])
+            with self._lock:
+                if entry is None:
+                    self._entries.pop(key, None)
+                else:
+                    self._entries[key] = entry
+        if entry is None:
+            return None
+        value, stored_at = entry
+        age = time.time() - stored_at
+        if age >= self.max_stale:
+            return None
+        return value, age < self.ttl
+
+    def put(self, key: Hashable, value: Any) -> None:
+        now = time.time()
+        with self._lock:
+            self._entries[key] = (value, now)
+            self._writes.pop(key, None)
+        if self.path:
+            with self._store() as db:
+                db.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, stored_at, value) "
+                    "VALUES (?, ?, ?, ?)",
+                    (self.namespace, repr(key), now, pickle.dumps(value)),
+                )
+
+    def mark_stale(self, key: Hashable) -> None:
+        """Keep the value for stale reads but force the next get() to report it stale."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                # just past the TTL, so it remains servable until max_stale
+                self._entries[key] = (entry[0], min(entry[1], time.time() - self.ttl))
+            self._writes.pop(key, None)
+        if self.path:
+            with self._store() as db:
+                db.execute(
+                    "UPDATE cache SET stored_at = MIN(stored_at, ?) "
+                    "WHERE namespace = ? AND key = ?",
+                    (time.time() - self.ttl, self.namespace, repr(key)),
+                )
+
+    def note_writes(self, key: Hashable, n: int = 1) -> bool:
+        """Count `n` changes under `key`; marks it stale at the threshold. True if it did."""
+        with self._lock:
+            count = self._writes.get(key, 0) + n
+            self._writes[key] = count
+        if count >= self.invalidate_after:
+            self.mark_stale(key)
+            return True
+        return False
@@ -0,0 +1,384 @@
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from typing import Dict, List, Optional, Set, Tuple
+
+from db_connection import get_connection
+
+# set LOCAL_CATALOG=0 in .env to always search on the server
+ENABLED = os.getenv("LOCAL_CATALOG", "1") != "0"
+
+# how often (seconds) to ask the server whether the catalog changed
+VERSION_CHECK_INTERVAL = 300
+
+_CATALOG_SQL = """
+    SELECT
+        s.song_id,
+        s.title,
+        COALESCE(g.group_name, '') AS artist,
+        COALESCE(string_agg(DISTINCT al.album_name, ', '), '') AS album,
+        s.length_ms,
+        EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) AS release_year,
+        COALESCE(
+            array_agg(DISTINCT sg.genre::text) FILTER (WHERE sg.genre IS NOT NULL),
+            '{}'
+        ) AS genres
+    FROM song s
+    LEFT JOIN "GROUP" g             ON g.group_id = s.group_id
+    LEFT JOIN song_within_album swa ON swa.song_id = s.song_id
+    LEFT JOIN album al              ON al.album_id = swa.album_id
+    LEFT JOIN song_genre sg         ON sg.song_id = s.song_id
+    GROUP BY s.song_id, s.title, s.length_ms, g.group_name
+"""
+
+
+# "all fields" search: earlier fields outrank later ones at equal match quality
+MATCH_FIELDS = ("song", "artist", "album", "genre")
+MATCH_QUALITY = {3: "exact", 2: "prefix", 1: "substring"}
+
+
+def match_rank(field: str, quality: int) -> int:
+    """exact > prefix > substring first, then song > artist > album > genre."""
+    return quality * len(MATCH_FIELDS) + (len(MATCH_FIELDS) - 1 - MATCH_FIELDS.index(field))
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class _TextIndex:
+    """Trigram + sorted-prefix index over a list of lower-cased strings."""
+
+    def __init__(self, texts: List[str]):
+        self.texts = texts
+        grams: Dict[str, array] = {}
+        for i, text in enumerate(texts):
+            for gram in _trigrams(text):
+                postings = grams.get(gram)
+                if postings is None:
+                    postings = grams[gram] = array("i")
+                postings.append(i)
+        self._grams = grams
+        self._by_text = array("i", sorted(range(len(texts)), key=texts.__getitem__))
+        self._sorted_texts = [texts[i] for i in self._by_text]
+
+    def contains(self, term: str) -> List[int]:
+        """Positions whose text contains `term` (already lower-cased), ascending."""
+        if len(term) < 3:
+            return [i for i, text in enumerate(self.texts) if term in text]
+        postings = []
+        for gram in _trigrams(term):
+            p = self._grams.get(gram)
+            if p is None:
+                return []
+            postings.append(p)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for p in postings[1:]:
+            candidates.intersection_update(p)
+            if not candidates:
+                return []
+        return sorted(i for i in candidates if term in self.texts[i])
+
+    def prefix(self, term: str) -> List[int]:
+        """Positions whose text starts with `term`, in text order."""
+        out = []
+        k = bisect_left(self._sorted_texts, term)
+        while k < len(self._sorted_texts) and self._sorted_texts[k].startswith(term):
+            out.append(self._by_text[k])
+            k += 1
+        return out
+
+
+class CatalogSnapshot:
+    """
+    Read-only, column-oriented copy of the song catalog.
+
+    Row i of every column describes the same song. Artist and album names are
+    interned (artist_idx / album_idx point into `artists` / `albums`), genres
+    are a bitset over `genres`, and a missing year / length is stored as 0 / -1.
+    """
+
+    def __init__(self, version: Optional[int], rows):
+        self.version = version
+        self.loaded_at = time.time()
+
+        genre_names = sorted({g for row in rows for g in (row[6] or [])})
+        genre_bit = {g: 1 << i for i, g in enumerate(genre_names)}
+
+        artist_pos: Dict[str, int] = {}
+        album_pos: Dict[str, int] = {}
+
+        self.song_ids: List[str] = []
+        self.titles: List[str] = []
+        self.artist_idx = array("i")
+        self.album_idx = array("i")
+        self.genre_bits = array("Q")
+        self.years = array("H")
+        self.lengths = array("q")
+        self.artists: List[str] = []
+        self.albums: List[str] = []
+        self.genres: List[str] = genre_names
+
+        for song_id, title, artist, album, length_ms, release_year, genres in rows:
+            self.song_ids.append(str(song_id))
+            self.titles.append(title or "")
+            if artist not in artist_pos:
+                artist_pos[artist] = len(self.artists)
+                self.artists.append(artist)
+            self.artist_idx.append(artist_pos[artist])
+            if album not in album_pos:
+                album_pos[album] = len(self.albums)
+                self.albums.append(album)
+            self.album_idx.append(album_pos[album])
+            bits = 0
+            for g in genres or []:
+                bits |= genre_bit[g]
+            self.genre_bits.append(bits)
+            self.years.append(int(release_year) if release_year else 0)
+            self.lengths.append(int(length_ms) if length_ms is not None else -1)
+
+        self.row_of = {sid: i for i, sid in enumerate(self.song_ids)}
+        self._genre_labels: Dict[int, str] = {}
+
+        self.title_index = _TextIndex([t.lower() for t in self.titles])
+        self.artist_index = _TextIndex([a.lower() for a in self.artists])
+        self.album_index = _TextIndex([a.lower() for a in self.albums])
+
+    def __len__(self):
+        return len(self.song_ids)
+
+    # ----- column helpers -----
+    def genre_label(self, bits: int) -> str:
+        """Comma-joined genre names, same as string_agg(DISTINCT genre, ', ')."""
+        label = self._genre_labels.get(bits)
+        if label is None:
+            label = ", ".join(g for i, g in enumerate(self.genres) if bits >> i & 1)
+            self._genre_labels[bits] = label
+        return label
+
+    def row(self, i: int) -> Tuple[str, str, str, str, Optional[int], str, Optional[int]]:
+        """(song_id, song, artist, album, length_ms, genre, release_year) for row i."""
+        length = self.lengths[i]
+        year = self.years[i]
+        return (
+            self.song_ids[i],
+            self.titles[i],
+            self.artists[self.artist_idx[i]],
+            self.albums[self.album_idx[i]],
+            length if length >= 0 else None,
+            self.genre_label(self.genre_bits[i]),
+            year or None,
+        )
+
+    # ----- search -----
+    def _rows_with(self, column: array, positions: List[int]) -> List[int]:
+        wanted = set(positions)
+        if not wanted:
+            return []
+        return [i for i, v in enumerate(column) if v in wanted]
+
+    def search(self, term: str, field: str) -> List[int]:
+        """Rows matching `term` as a case-insensitive substring of `field`."""
+        term = term.lower()
+        if not term:
+            return list(range(len(self)))
+        if field == "artist":
+            return self._rows_with(self.artist_idx, self.artist_index.contains(term))
+        if field == "album":
+            return self._rows_with(self.album_idx, self.album_index.contains(term))
+        if field == "genre":
+            mask = 0
+            for i, g in enumerate(self.genres):
+                if term in g.lower():
+                    mask |= 1 << i
+            if not mask:
+                return []
+            return [i for i, bits in enumerate(self.genre_bits) if bits & mask]
+        return self.title_index.contains(term)
+
+    def _field_text(self, field: str, i: int) -> str:
+        if field == "artist":
+            return self.artist_index.texts[self.artist_idx[i]]
+        if field == "album":
+            return self.album_index.texts[self.album_idx[i]]
+        if field == "genre":
+            return self.genre_label(self.genre_bits[i]).lower()
+        return self.title_index.texts[i]
+
+    def search_ranked(self, term: str) -> Dict[int, Tuple[int, Dict[str, Tuple[int, int]]]]:
+        """
+        "All fields" search. Returns {row: (rank, matches)} where matches maps
+        field -> (quality, position) with quality 3=exact, 2=prefix, 1=substring
+        and position the 0-based offset of `term` in that field. Rank orders by
+        quality first, then field (see match_rank).
+        """
+        term = term.lower()
+        out: Dict[int, Tuple[int, Dict[str, Tuple[int, int]]]] = {}
+        if not term:
+            return out
+        for field in MATCH_FIELDS:
+            for i in self.search(term, field):
+                text = self._field_text(field, i)
+                pos = text.find(term)
+                quality = 3 if text == term else (2 if pos == 0 else 1)
+                rank, matches = out.get(i, (0, {}))
+                matches[field] = (quality, pos)
+                out[i] = (max(rank, match_rank(field, quality)), matches)
+        return out
+
+    # ----- facets -----
+    def decade(self, i: int) -> Optional[int]:
+        year = self.years[i]
+        return year // 10 * 10 if year else None
+
+    def filter_rows(self, rows: List[int], filters: Dict[str, Set[str]]) -> List[int]:
+        """
+        Keep rows matching every non-empty facet filter (values within one
+        facet are OR-ed). Keys: "genre", "decade" (e.g. "1990"), "artist".
+        """
+        out = rows
+        if filters.get("genre"):
+            mask = 0
+            for i, g in enumerate(self.genres):
+                if g in filters["genre"]:
+                    mask |= 1 << i
+            out = [i for i in out if self.genre_bits[i] & mask]
+        if filters.get("decade"):
+            decades = {int(d) for d in filters["decade"]}
+            out = [i for i in out if self.decade(i) in decades]
+        if filters.get("artist"):
+            wanted = {k for k, a in enumerate(self.artists) if a in filters["artist"]}
+            out = [i for i in out if self.artist_idx[i] in wanted]
+        return out
+
+    def facet_counts(self, rows: List[int]) -> Dict[str, Dict[str, int]]:
+        """Songs per genre / decade / artist among `rows`."""
+        genre_n = [0] * len(self.genres)
+        decade_n: Dict[int, int] = {}
+        artist_n: Dict[int, int] = {}
+        for i in rows:
+            bits = self.genre_bits[i]
+            k = 0
+            while bits:
+                if bits & 1:
+                    genre_n[k] += 1
+                bits >>= 1
+                k += 1
+            d = self.decade(i)
+            if d is not None:
+                decade_n[d] = decade_n.get(d, 0) + 1
+            a = self.artist_idx[i]
+            artist_n[a] = artist_n.get(a, 0) + 1
+        return {
+            "genre": {g: n for g, n in zip(self.genres, genre_n) if n},
+            "decade": {str(d): n for d, n in decade_n.items()},
+            "artist": {self.artists[a]: n for a, n in artist_n.items() if self.artists[a]},
+        }
+
+    def sort(self, rows: List[int], key: str, direction: str) -> List[int]:
+        """
+        Order rows like SongsFrame._order_sql: primary key in `direction`, then
+        song and artist ascending. Unknown years sort last ascending, first descending.
+        """
+        titles = self.title_index.texts
+        artists = self.artist_index.texts
+        out = sorted(rows, key=lambda i: (titles[i], artists[self.artist_idx[i]]))
+        if key == "artist":
+            primary = lambda i: artists[self.artist_idx[i]]
+        elif key == "genre":
+            primary = lambda i: self.genre_label(self.genre_bits[i]).lower()
+        elif key == "release_year":
+            primary = lambda i: (self.years[i] == 0, self.years[i])
+        else:
+            primary = titles.__getitem__
+        out.sort(key=primary, reverse=(direction == "DESC"))
+        return out
+
+
+def fetch_catalog_version(cur) -> Optional[int]:
+    """
+    Current catalog version, or None if schema/002 has not been applied.
+    A failed lookup only rolls back to its own savepoint, so it is safe on a
+    connection with other work in flight.
+    """
+    cur.execute("SAVEPOINT catalog_version")
+    try:
+        cur.execute("SELECT version FROM catalog_version")
+        row = cur.fetchone()
+    except Exception:
+        cur.execute("ROLLBACK TO SAVEPOINT catalog_version")
+        return None
+    cur.execute("RELEASE SAVEPOINT catalog_version")
+    return int(row[0]) if row else None
+
+
+def load_snapshot(cur) -> CatalogSnapshot:
+    version = fetch_catalog_version(cur)
+    cur.execute(_CATALOG_SQL)
+    return CatalogSnapshot(version, cur.fetchall() or [])
+
+
+class CatalogIndex:
+    """
+    Owns the current CatalogSnapshot and keeps it fresh.
+
+    Loading and version checks run on a daemon thread with their own
+    connection, so the Tk thread never waits on them; callers just read
+    `snapshot` and fall back to SQL while it is None.
+    """
+
+    def __init__(self):
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._busy = False
+        self._checked_at = 0.0
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        return self._snapshot
+
+    def start(self):
+        """Begin the initial background load (no-op when LOCAL_CATALOG=0)."""
+        self._spawn()
+
+    def maybe_refresh(self):
+        """Check the server version in the background if the last check is old."""
+        if time.time() - self._checked_at >= VERSION_CHECK_INTERVAL:
+            self._spawn()
+
+    def _spawn(self):
+        if not ENABLED:
+            return
+        with self._lock:
+            if self._busy:
+                return
+            self._busy = True
+        threading.Thread(target=self._worker, name="catalog-index", daemon=True).start()
+
+    def _worker(self):
+        conn = None
+        try:
+            conn = get_connection()
+            with conn.cursor() as cur:
+                current = self._snapshot
+                if current is not None:
+                    version = fetch_catalog_version(cur)
+                    if version is None or version == current.version:
+                        return
+                self._snapshot = load_snapshot(cur)
+            conn.rollback()
+        except Exception:
+            # keep whatever snapshot we had; frames fall back to SQL
+            pass
+        finally:
+            self._checked_at = time.time()
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            with self._lock:
+                self._busy = False
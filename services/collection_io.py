@@ -0,0 +1,159 @@
+import csv
+import itertools
+import json
+import re
+from typing import IO, Iterator, List, Tuple
+
+from services.collections import add_staged_songs
+
+# Collection files are CSV (header row) or JSON Lines, picked by extension.
+FORMATS = ("csv", "jsonl")
+EXPORT_FIELDS = ("song_id", "title", "artist", "length_ms")
+
+# rows pulled per round trip by the export's server-side cursor
+EXPORT_BATCH = 2000
+
+STAGING_TABLE = "collection_import_staging"
+
+# what a song id can look like (song.song_id is VARCHAR(20)); a CSV whose
+# first cell doesn't is taken to start with a header row
+_SONG_ID_RE = re.compile(r"[A-Za-z0-9_-]{1,20}")
+
+
+def format_for(path: str) -> str:
+    """'csv' or 'jsonl' from a file name; anything else is an error."""
+    ext = path.rsplit(".", 1)[-1].lower() if "." in path else ""
+    if ext in ("jsonl", "ndjson"):
+        return "jsonl"
+    if ext == "csv":
+        return "csv"
+    raise ValueError(f"Unsupported file type '.{ext}' (use .csv or .jsonl)")
+
+
+def export_collection(cur, collection_id: str, fp: IO[str], fmt: str) -> int:
+    """
+    Write a collection's songs to `fp`. Pass a named (server-side) cursor so
+    large collections stream through in EXPORT_BATCH rows instead of sitting
+    in memory. The caller ends the transaction.
+    Returns the number of songs written.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown format: {fmt}")
+    written = 0
+    out = csv.writer(fp) if fmt == "csv" else None
+    if out is not None:
+        out.writerow(EXPORT_FIELDS)
+    cur.itersize = EXPORT_BATCH
+    cur.execute(
+        """
+        SELECT s.song_id, s.title, COALESCE(g.group_name, ''), s.length_ms
+        FROM song_within_collection sc
+        JOIN song s          ON s.song_id = sc.song_id
+        LEFT JOIN "GROUP" g  ON g.group_id = s.group_id
+        WHERE sc.collection_id = %s
+        ORDER BY s.song_id
+        """,
+        (collection_id,),
+    )
+    for row in cur:
+        if out is not None:
+            out.writerow(row)
+        else:
+            fp.write(json.dumps(dict(zip(EXPORT_FIELDS, row))) + "\n")
+        written += 1
+    return written
+
+
+def _jsonl_ids(fp: IO[str]) -> Iterator[str]:
+    for n, line in enumerate(fp, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            sid = json.loads(line).get("song_id")
+        except (ValueError, AttributeError):
+            raise ValueError(f"Line {n} is not a JSON object")
+        if sid not in (None, ""):
+            yield str(sid)
+
+
+def _csv_ids(rows: Iterator[List[str]], col: int) -> Iterator[str]:
+    for row in rows:
+        if len(row) > col and row[col].strip():
+            yield row[col].strip()
+
+
+def _song_ids(fp: IO[str], fmt: str) -> Iterator[str]:
+    """
+    song_id of every row: the 'song_id' key, or for CSV the 'song_id'
+    column of the header row. A CSV without a header (its first cell looks
+    like a song id) lists ids in its first column; a header row without a
+    song_id column is an error. The CSV header is checked here, before any
+    id is read.
+    """
+    if fmt == "jsonl":
+        return _jsonl_ids(fp)
+    if fmt != "csv":
+        raise ValueError(f"Unknown format: {fmt}")
+    rows = csv.reader(fp)
+    first = next(rows, None)
+    if first is None:
+        return iter(())
+    names = [h.lstrip("\ufeff").strip().lower() for h in first]
+    if "song_id" in names:
+        return _csv_ids(rows, names.index("song_id"))
+    if names and _SONG_ID_RE.fullmatch(names[0]) and names[0] not in EXPORT_FIELDS:
+        # no header row: the first line is data
+        first[0] = first[0].lstrip("\ufeff")
+        return _csv_ids(itertools.chain([first], rows), 0)
+    raise ValueError("The CSV header must include a song_id column")
+
+
+class _CsvLines:
+    """File-like view over song ids for COPY ... FROM STDIN, one CSV line each."""
+
+    def __init__(self, ids: Iterator[str]):
+        self._ids = ids
+        self._buf = ""
+
+    def read(self, size: int = -1) -> str:
+        parts = [self._buf]
+        have = len(self._buf)
+        while size < 0 or have < size:
+            sid = next(self._ids, None)
+            if sid is None:
+                break
+            line = '"' + sid.replace('"', '""') + '"\n'
+            parts.append(line)
+            have += len(line)
+        buf = "".join(parts)
+        if size < 0:
+            size = len(buf)
+        chunk, self._buf = buf[:size], buf[size:]
+        return chunk
+
+
+def import_songs(cur, collection_id: str, fp: IO[str], fmt: str) -> Tuple[int, int, List[str]]:
+    """
+    Bulk-add the songs listed in `fp` to a collection: the ids are COPYed
+    into a temp staging table while the file is read, unknown ids are found
+    with one anti-join against song, and the rest are added in one
+    statement. The caller commits.
+    Returns (added, already in the collection, unknown song ids).
+    """
+    cur.execute(f"CREATE TEMP TABLE {STAGING_TABLE} (song_id TEXT NOT NULL) ON COMMIT DROP")
+    cur.copy_expert(
+        f"COPY {STAGING_TABLE} (song_id) FROM STDIN WITH (FORMAT csv)",
+        _CsvLines(_song_ids(fp, fmt)),
+    )
+    cur.execute(
+        f"""
+        SELECT DISTINCT st.song_id
+        FROM {STAGING_TABLE} st
+        WHERE NOT EXISTS (SELECT 1 FROM song s WHERE s.song_id = st.song_id)
+        ORDER BY st.song_id
+        """
+    )
+    unknown = [str(r[0]) for r in cur.fetchall()]
+    added, valid = add_staged_songs(cur, collection_id, STAGING_TABLE)
+    return added, valid - added, unknown
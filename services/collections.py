@@ -0,0 +1,210 @@
+from collections import Counter
+from typing import Dict, Iterable, List, Tuple
+
+# a generated id colliding even once is ~impossible; this just bounds the loop
+CREATE_RETRIES = 5
+
+# Every write to song_within_collection goes through here so collection's
+# song_count / total_length_ms (schema/012) change in the same statement.
+# The caller commits.
+
+_BUMP = """
+    bump AS (
+        UPDATE collection c
+        SET song_count = c.song_count {op} (SELECT COUNT(*) FROM changed),
+            total_length_ms = c.total_length_ms {op} COALESCE((
+                SELECT SUM(s.length_ms) FROM changed JOIN song s ON s.song_id = changed.song_id
+            ), 0)
+        WHERE c.collection_id = %(cid)s
+    )
+"""
+
+
+def add_songs(cur, collection_id: str, song_ids: Iterable[str]) -> int:
+    """Add songs (duplicates skipped). Returns the number actually added."""
+    ids = list(song_ids)
+    if not ids:
+        return 0
+    cur.execute(
+        f"""
+        WITH changed AS (
+            INSERT INTO song_within_collection (collection_id, song_id)
+            SELECT DISTINCT %(cid)s, p.song_id
+            FROM unnest(%(ids)s::text[]) AS p(song_id)
+            ON CONFLICT (collection_id, song_id) DO NOTHING
+            RETURNING song_id
+        ),
+        {_BUMP.format(op="+")}
+        SELECT COUNT(*) FROM changed
+        """,
+        {"cid": collection_id, "ids": ids},
+    )
+    return int(cur.fetchone()[0])
+
+
+def add_songs_to_collections(cur, collection_ids: Iterable[str], song_ids: Iterable[str]) -> Dict[str, int]:
+    """
+    Add every song to every collection in one statement (duplicates skipped),
+    bumping each collection's counters by what it actually gained.
+    Returns {collection_id: songs added}; collections that gained nothing
+    are left out.
+    """
+    cids = list(dict.fromkeys(collection_ids))
+    ids = list(song_ids)
+    if not cids or not ids:
+        return {}
+    cur.execute(
+        """
+        WITH changed AS (
+            INSERT INTO song_within_collection (collection_id, song_id)
+            SELECT c.collection_id, p.song_id
+            FROM unnest(%(cids)s::text[]) AS c(collection_id)
+            CROSS JOIN (SELECT DISTINCT song_id FROM unnest(%(ids)s::text[]) AS u(song_id)) AS p
+            ON CONFLICT (collection_id, song_id) DO NOTHING
+            RETURNING collection_id, song_id
+        ),
+        per AS (
+            SELECT ch.collection_id, COUNT(*) AS added, COALESCE(SUM(s.length_ms), 0) AS length_ms
+            FROM changed ch
+            LEFT JOIN song s ON s.song_id = ch.song_id
+            GROUP BY ch.collection_id
+        ),
+        bump AS (
+            UPDATE collection c
+            SET song_count = c.song_count + per.added,
+                total_length_ms = c.total_length_ms + per.length_ms
+            FROM per
+            WHERE c.collection_id = per.collection_id
+        )
+        SELECT collection_id, added FROM per
+        """,
+        {"cids": cids, "ids": ids},
+    )
+    return {str(cid): int(added) for cid, added in cur.fetchall()}
+
+
+def add_staged_songs(cur, collection_id: str, table: str) -> Tuple[int, int]:
+    """
+    Add the songs listed in `table` (a staging table with a song_id column)
+    that exist in song; duplicates are skipped.
+    Returns (added, distinct known songs in the table).
+    """
+    cur.execute(
+        f"""
+        WITH valid AS (
+            SELECT DISTINCT st.song_id
+            FROM {table} st
+            JOIN song s ON s.song_id = st.song_id
+        ),
+        changed AS (
+            INSERT INTO song_within_collection (collection_id, song_id)
+            SELECT %(cid)s, song_id FROM valid
+            ON CONFLICT (collection_id, song_id) DO NOTHING
+            RETURNING song_id
+        ),
+        {_BUMP.format(op="+")}
+        SELECT (SELECT COUNT(*) FROM changed), (SELECT COUNT(*) FROM valid)
+        """,
+        {"cid": collection_id},
+    )
+    added, valid = cur.fetchone()
+    return int(added), int(valid)
+
+
+def remove_songs(cur, collection_id: str, song_ids: Iterable[str]) -> int:
+    """Remove songs. Returns the number actually removed."""
+    ids = list(song_ids)
+    if not ids:
+        return 0
+    cur.execute(
+        f"""
+        WITH changed AS (
+            DELETE FROM song_within_collection
+            WHERE collection_id = %(cid)s AND song_id = ANY(%(ids)s::text[])
+            RETURNING song_id
+        ),
+        {_BUMP.format(op="-")}
+        SELECT COUNT(*) FROM changed
+        """,
+        {"cid": collection_id, "ids": ids},
+    )
+    return int(cur.fetchone()[0])
+
+
+def add_album(cur, collection_id: str, album_id: str) -> Tuple[int, int]:
+    """Add every track of an album. Returns (added, tracks on the album)."""
+    cur.execute(
+        f"""
+        WITH tracks AS (
+            SELECT song_id FROM song_within_album WHERE album_id = %(aid)s
+        ),
+        changed AS (
+            INSERT INTO song_within_collection (collection_id, song_id)
+            SELECT DISTINCT %(cid)s, song_id FROM tracks
+            ON CONFLICT (collection_id, song_id) DO NOTHING
+            RETURNING song_id
+        ),
+        {_BUMP.format(op="+")}
+        SELECT (SELECT COUNT(*) FROM changed), (SELECT COUNT(*) FROM tracks)
+        """,
+        {"cid": collection_id, "aid": album_id},
+    )
+    added, tracks = cur.fetchone()
+    return int(added), int(tracks)
+
+
+def remove_album(cur, collection_id: str, album_id: str) -> int:
+    """Remove every track of an album. Returns the number removed."""
+    cur.execute(
+        f"""
+        WITH changed AS (
+            DELETE FROM song_within_collection
+            WHERE collection_id = %(cid)s
+              AND song_id IN (
+                    SELECT song_id FROM song_within_album WHERE album_id = %(aid)s
+              )
+            RETURNING song_id
+        ),
+        {_BUMP.format(op="-")}
+        SELECT COUNT(*) FROM changed
+        """,
+        {"cid": collection_id, "aid": album_id},
+    )
+    return int(cur.fetchone()[0])
+
+
+def create_collections(cur, username: str, names: Iterable[str]) -> List[Tuple[str, str]]:
+    """
+    Create one collection per name in a single INSERT; ids come from the
+    new_collection_id() column default (schema/013). Rows whose generated id
+    collided are skipped by ON CONFLICT and retried. The caller commits.
+    Returns [(collection_id, name)] in no particular order.
+    """
+    pending = Counter(n for n in names)
+    created: List[Tuple[str, str]] = []
+    for _ in range(CREATE_RETRIES):
+        if not pending:
+            return created
+        cur.execute(
+            """
+            INSERT INTO collection (creator_username, collection_name, creation_date)
+            SELECT %s, p.name, NOW()
+            FROM unnest(%s::text[]) AS p(name)
+            ON CONFLICT (collection_id) DO NOTHING
+            RETURNING collection_id, collection_name
+            """,
+            (username, list(pending.elements())),
+        )
+        for cid, name in cur.fetchall():
+            created.append((str(cid), str(name)))
+            pending[name] -= 1
+        pending = +pending
+    if pending:
+        raise RuntimeError("Failed to generate unique collection ids")
+    return created
+
+
+def create_collection(cur, username: str, name: str) -> str:
+    """Create one collection. Returns its new id. The caller commits."""
+    ((cid, _name),) = create_collections(cur, username, [name])
+    return cid
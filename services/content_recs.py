@@ -0,0 +1,158 @@
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # scoring falls back to plain Python loops
+    np = None
+
+from services.catalog_index import CatalogSnapshot
+
+# content score = GENRE_WEIGHT * genre match + ARTIST_WEIGHT * artist match,
+# both in [0, 1]
+GENRE_WEIGHT = 0.6
+ARTIST_WEIGHT = 0.4
+
+# share of the blended score taken from the (max-normalised) collaborative score
+COLLAB_WEIGHT = 0.6
+
+# best content-only songs considered alongside the collaborative ones
+CONTENT_CANDIDATES = 200
+
+
+class SongFeatures:
+    """
+    Song feature matrix for one CatalogSnapshot: a song x genre matrix whose
+    rows sum to 1 (so multi-genre songs aren't favoured) plus each song's
+    artist index, i.e. a one-hot artist block stored as a column of indices.
+    """
+
+    def __init__(self, snap: CatalogSnapshot):
+        self.snap = snap
+        n_genres = len(snap.genres)
+        if np is not None:
+            bits = np.frombuffer(snap.genre_bits, dtype=np.uint64)
+            shifts = np.arange(n_genres, dtype=np.uint64)
+            genre = ((bits[:, None] >> shifts) & np.uint64(1)).astype(np.float32)
+            per_song = genre.sum(axis=1, keepdims=True)
+            per_song[per_song == 0] = 1.0
+            self.genre = genre / per_song
+            self.artist = np.frombuffer(snap.artist_idx, dtype=np.intc)
+        else:
+            self.genre = [
+                [k for k in range(n_genres) if bits >> k & 1] for bits in snap.genre_bits
+            ]
+            self.artist = snap.artist_idx
+
+
+_features: Optional[SongFeatures] = None
+
+
+def features_for(snap: CatalogSnapshot) -> SongFeatures:
+    """SongFeatures for `snap`, built once per snapshot."""
+    global _features
+    current = _features
+    if current is None or current.snap is not snap:
+        current = _features = SongFeatures(snap)
+    return current
+
+
+class UserPreferences:
+    """Share of a user's plays per genre and per artist, plus the rows they played."""
+
+    def __init__(self, genre: List[float], artist: Dict[int, float], heard: List[int]):
+        self.genre = genre
+        self.artist = artist
+        self.heard = heard
+
+
+def user_preferences(cur, username: str, snap: CatalogSnapshot) -> Optional[UserPreferences]:
+    """
+    Genre / artist weights from `username`'s listen history (the same
+    proportions dataAnalysis/userGenreDataCreation.py derives). None if the
+    user has no listens among catalog songs.
+    """
+    cur.execute(
+        """
+        SELECT song_id, COUNT(*)
+        FROM listen
+        WHERE listener_username = %s
+        GROUP BY song_id
+        """,
+        (username,),
+    )
+    return preferences_from_plays(dict(cur.fetchall()), snap)
+
+
+def preferences_from_plays(plays: Dict[str, int], snap: CatalogSnapshot) -> Optional[UserPreferences]:
+    """UserPreferences from {song_id: play count}; None if none are in the catalog."""
+    genre = [0.0] * len(snap.genres)
+    artist: Dict[int, float] = {}
+    heard: List[int] = []
+    genre_total = 0.0
+    total = 0.0
+    for song_id, n in plays.items():
+        i = snap.row_of.get(str(song_id))
+        if i is None:
+            continue
+        heard.append(i)
+        total += n
+        bits, k = snap.genre_bits[i], 0
+        while bits:
+            if bits & 1:
+                genre[k] += n
+                genre_total += n
+            bits >>= 1
+            k += 1
+        a = snap.artist_idx[i]
+        artist[a] = artist.get(a, 0.0) + n
+    if not total:
+        return None
+    if genre_total:
+        genre = [g / genre_total for g in genre]
+    return UserPreferences(genre, {a: p / total for a, p in artist.items()}, heard)
+
+
+def content_scores(features: SongFeatures, prefs: UserPreferences) -> List[float]:
+    """Content score of every snapshot row; rows the user already played score -1."""
+    if np is not None:
+        artist_pref = np.zeros(len(features.snap.artists), dtype=np.float32)
+        for a, w in prefs.artist.items():
+            artist_pref[a] = w
+        scores = (GENRE_WEIGHT * (features.genre @ np.asarray(prefs.genre, dtype=np.float32))
+                  + ARTIST_WEIGHT * artist_pref[features.artist])
+        scores[prefs.heard] = -1.0
+        return scores.tolist()
+    scores = []
+    for genres, a in zip(features.genre, features.artist):
+        g = sum(prefs.genre[k] for k in genres) / len(genres) if genres else 0.0
+        scores.append(GENRE_WEIGHT * g + ARTIST_WEIGHT * prefs.artist.get(a, 0.0))
+    for i in prefs.heard:
+        scores[i] = -1.0
+    return scores
+
+
+def blend(snap: CatalogSnapshot, prefs: UserPreferences, collab: Dict[str, float],
+          limit: int = 50) -> List[Tuple[str, float]]:
+    """
+    Blend collaborative scores {song_id: score} with content scores.
+    Candidates are the collaborative songs plus the best content-only songs.
+    Returns [(song_id, blended score)] best first.
+    """
+    scores = content_scores(features_for(snap), prefs)
+    top_collab = max(collab.values(), default=0.0) or 1.0
+
+    candidates = set(collab)
+    ranked = sorted(range(len(scores)), key=lambda i: (-scores[i], i))
+    for i in ranked[:CONTENT_CANDIDATES]:
+        if scores[i] > 0:
+            candidates.add(snap.song_ids[i])
+
+    out = []
+    for song_id in candidates:
+        i = snap.row_of.get(song_id)
+        content = max(scores[i], 0.0) if i is not None else 0.0
+        score = (COLLAB_WEIGHT * collab.get(song_id, 0.0) / top_collab
+                 + (1 - COLLAB_WEIGHT) * content)
+        out.append((song_id, score))
+    out.sort(key=lambda t: (-t[1], t[0]))
+    return out[:limit]
@@ -0,0 +1,238 @@
+import threading
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # counting falls back to collections.Counter
+    np = None
+
+from db_connection import get_connection
+
+# suggestion score = FOF_WEIGHT * (people you follow who follow them)
+#                  + COMMON_WEIGHT * (people you both follow)
+FOF_WEIGHT = 1.0
+COMMON_WEIGHT = 0.5
+
+SUGGESTIONS = 20
+
+# follow / unfollow events kept on top of the loaded graph before it is reloaded
+REBUILD_AFTER = 1000
+
+
+def _csr(n: int, src: List[int], dst: List[int]):
+    """(offsets, targets) with the targets of node i in targets[offsets[i]:offsets[i + 1]]."""
+    if np is not None:
+        s = np.asarray(src, dtype=np.int32)
+        d = np.asarray(dst, dtype=np.int32)
+        order = np.argsort(s, kind="stable")
+        offsets = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(s, minlength=n), out=offsets[1:])
+        return offsets, d[order]
+    counts = [0] * (n + 1)
+    for i in src:
+        counts[i + 1] += 1
+    for i in range(n):
+        counts[i + 1] += counts[i]
+    offsets = array("i", counts)
+    targets = array("i", [0]) * len(src)
+    fill = list(counts[:n])
+    for i, j in zip(src, dst):
+        targets[fill[i]] = j
+        fill[i] += 1
+    return offsets, targets
+
+
+class FollowGraph:
+    """
+    user_follow as two CSR adjacency lists over int ids: `out` (who a user
+    follows) and `inc` (who follows them), plus a small overlay of follows
+    and unfollows made since it was loaded. Usernames map to ids through
+    `id_of`; users created after the load get ids past the loaded range.
+    """
+
+    def __init__(self, usernames: List[str], edges: Iterable[Tuple[str, str]]):
+        self.usernames = list(usernames)
+        self.id_of: Dict[str, int] = {u: i for i, u in enumerate(self.usernames)}
+        src: List[int] = []
+        dst: List[int] = []
+        for follower, followed in edges:
+            a, b = self.id_of.get(follower), self.id_of.get(followed)
+            if a is not None and b is not None:
+                src.append(a)
+                dst.append(b)
+        self.base_n = len(self.usernames)
+        self.out_offsets, self.out_targets = _csr(self.base_n, src, dst)
+        self.inc_offsets, self.inc_targets = _csr(self.base_n, dst, src)
+        self.added: Set[Tuple[int, int]] = set()
+        self.removed: Set[Tuple[int, int]] = set()
+
+    def __len__(self):
+        return len(self.usernames)
+
+    @property
+    def pending(self) -> int:
+        return len(self.added) + len(self.removed)
+
+    def _id(self, username: str) -> int:
+        i = self.id_of.get(username)
+        if i is None:
+            i = self.id_of[username] = len(self.usernames)
+            self.usernames.append(username)
+        return i
+
+    @staticmethod
+    def _slice(offsets, targets, i: int, base_n: int):
+        if i >= base_n:
+            return targets[:0]
+        return targets[offsets[i]:offsets[i + 1]]
+
+    def _in_base(self, a: int, b: int) -> bool:
+        return b in self._slice(self.out_offsets, self.out_targets, a, self.base_n)
+
+    def apply(self, follower: str, followed: str, following: bool):
+        """Record a committed follow (following=True) or unfollow. Idempotent."""
+        edge = (self._id(follower), self._id(followed))
+        in_base = self._in_base(*edge)
+        if following:
+            self.removed.discard(edge)
+            if not in_base:
+                self.added.add(edge)
+        else:
+            self.added.discard(edge)
+            if in_base:
+                self.removed.add(edge)
+
+    def _neighbors(self, i: int, outgoing: bool) -> List[int]:
+        offsets, targets = (self.out_offsets, self.out_targets) if outgoing else (self.inc_offsets, self.inc_targets)
+        base = self._slice(offsets, targets, i, self.base_n)
+        base = base.tolist() if np is not None else list(base)
+        if not self.added and not self.removed:
+            return base
+        key = (lambda j: (i, j)) if outgoing else (lambda j: (j, i))
+        out = [j for j in base if key(j) not in self.removed]
+        if outgoing:
+            out.extend(b for a, b in self.added if a == i)
+        else:
+            out.extend(a for a, b in self.added if b == i)
+        return out
+
+    def following(self, username: str) -> List[str]:
+        i = self.id_of.get(username)
+        return [] if i is None else [self.usernames[j] for j in self._neighbors(i, True)]
+
+    def _count(self, groups: List[List[int]]) -> Dict[int, int]:
+        if not groups:
+            return {}
+        if np is not None:
+            flat = np.fromiter((j for g in groups for j in g), dtype=np.int32)
+            if not len(flat):
+                return {}
+            counts = np.bincount(flat, minlength=len(self.usernames))
+            nz = np.flatnonzero(counts)
+            return dict(zip(nz.tolist(), counts[nz].tolist()))
+        return Counter(j for g in groups for j in g)
+
+    def suggestions(self, username: str, limit: int = SUGGESTIONS) -> List[Tuple[str, float, int, int]]:
+        """
+        Users `username` might follow, best first:
+        [(username, score, followed by N you follow, N followed in common)].
+        """
+        me = self.id_of.get(username)
+        if me is None:
+            return []
+        mine = self._neighbors(me, True)
+        # friends of friends: whom the people I follow follow
+        fof = self._count([self._neighbors(f, True) for f in mine])
+        # common neighbours: who else follows the people I follow
+        common = self._count([self._neighbors(f, False) for f in mine])
+        skip = set(mine)
+        skip.add(me)
+        ranked = []
+        for j in set(fof) | set(common):
+            if j in skip:
+                continue
+            a, c = fof.get(j, 0), common.get(j, 0)
+            ranked.append((FOF_WEIGHT * a + COMMON_WEIGHT * c, self.usernames[j], a, c))
+        ranked.sort(key=lambda r: (-r[0], r[1]))
+        return [(u, score, a, c) for score, u, a, c in ranked[:limit]]
+
+
+def load_graph(cur) -> FollowGraph:
+    cur.execute('SELECT username FROM "USER" ORDER BY username')
+    usernames = [str(r[0]) for r in cur.fetchall()]
+    cur.execute("SELECT follower_user_id, followed_user_id FROM user_follow")
+    return FollowGraph(usernames, cur.fetchall())
+
+
+class FollowGraphIndex:
+    """
+    Owns the current FollowGraph. Loads it on a daemon thread with its own
+    connection (like CatalogIndex); callers read `graph`, which is None
+    until the first load finishes. Follow events are applied to the loaded
+    graph as an overlay and reloaded once REBUILD_AFTER have piled up.
+    """
+
+    def __init__(self):
+        self._graph: Optional[FollowGraph] = None
+        self._lock = threading.Lock()
+        self._busy = False
+        # events seen while a load is running, replayed onto the new graph
+        self._events: List[Tuple[str, str, bool]] = []
+
+    @property
+    def graph(self) -> Optional[FollowGraph]:
+        return self._graph
+
+    @property
+    def loading(self) -> bool:
+        return self._busy
+
+    def start(self):
+        """Begin a background load unless one is running or a graph is loaded."""
+        if self._graph is None:
+            self._spawn()
+
+    def note_follow(self, follower: str, followed: str, following: bool):
+        """Call after committing a follow (following=True) or unfollow."""
+        with self._lock:
+            if self._busy:
+                self._events.append((follower, followed, following))
+            graph = self._graph
+            if graph is not None:
+                graph.apply(follower, followed, following)
+        if graph is not None and graph.pending >= REBUILD_AFTER:
+            self._spawn()
+
+    def _spawn(self):
+        with self._lock:
+            if self._busy:
+                return
+            self._busy = True
+            self._events = []
+        threading.Thread(target=self._worker, name="follow-graph", daemon=True).start()
+
+    def _worker(self):
+        conn = None
+        try:
+            conn = get_connection()
+            with conn.cursor() as cur:
+                graph = load_graph(cur)
+            conn.rollback()
+            with self._lock:
+                for follower, followed, following in self._events:
+                    graph.apply(follower, followed, following)
+                self._events = []
+                self._graph = graph
+        except Exception:
+            # keep the old graph (if any); suggestions just stay unavailable
+            pass
+        finally:
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            with self._lock:
+                self._busy = False
@@ -0,0 +1,138 @@
+# Both follow() and unfollow() keep user_follow_stats (schema/015) in step:
+# the followed user's follower_count and the follower's following_count move
+# in the same statement as the user_follow row.
+
+_STAT_DELTAS = """
+    SELECT d.username, SUM(d.followers) AS followers, SUM(d.following) AS following
+    FROM {src}
+    CROSS JOIN (VALUES (%(followed)s, 1, 0), (%(follower)s, 0, 1))
+        AS d(username, followers, following)
+    GROUP BY d.username
+"""
+
+
+def follow(cur, follower: str, followed: str) -> bool:
+    """
+    Make `follower` follow `followed` (idempotent) and add the followed
+    user's plays to the follower's feed if it is built. The caller commits.
+    Returns True if a new follow row was created.
+    """
+    cur.execute(
+        f"""
+        WITH ins AS (
+            INSERT INTO user_follow (follower_user_id, followed_user_id)
+            VALUES (%(follower)s, %(followed)s)
+            ON CONFLICT (follower_user_id, followed_user_id) DO NOTHING
+            RETURNING followed_user_id
+        ),
+        feed AS (
+            INSERT INTO followed_song_counts (username, song_id, plays)
+            SELECT %(follower)s, li.song_id, COUNT(*)
+            FROM listen li
+            JOIN ins ON ins.followed_user_id = li.listener_username
+            WHERE EXISTS (SELECT 1 FROM followed_feed_state WHERE username = %(follower)s)
+            GROUP BY li.song_id
+            ON CONFLICT (username, song_id) DO UPDATE
+            SET plays = followed_song_counts.plays + EXCLUDED.plays
+        ),
+        stats AS (
+            INSERT INTO user_follow_stats (username, follower_count, following_count)
+            {_STAT_DELTAS.format(src="ins")}
+            ON CONFLICT (username) DO UPDATE
+            SET follower_count = user_follow_stats.follower_count + EXCLUDED.follower_count,
+                following_count = user_follow_stats.following_count + EXCLUDED.following_count
+        )
+        SELECT COUNT(*) FROM ins
+        """,
+        {"follower": follower, "followed": followed},
+    )
+    (added,) = cur.fetchone()
+    return bool(added)
+
+
+def unfollow(cur, follower: str, followed: str) -> bool:
+    """
+    Remove the follow and subtract the followed user's plays from the
+    follower's feed if it is built. The caller commits.
+    Returns True if a follow row was deleted.
+    """
+    cur.execute(
+        f"""
+        WITH del AS (
+            DELETE FROM user_follow
+            WHERE follower_user_id = %(follower)s AND followed_user_id = %(followed)s
+            RETURNING followed_user_id
+        ),
+        sub AS (
+            SELECT li.song_id, COUNT(*) AS plays
+            FROM listen li
+            JOIN del ON del.followed_user_id = li.listener_username
+            WHERE EXISTS (SELECT 1 FROM followed_feed_state WHERE username = %(follower)s)
+            GROUP BY li.song_id
+        ),
+        gone AS (
+            DELETE FROM followed_song_counts f
+            USING sub
+            WHERE f.username = %(follower)s AND f.song_id = sub.song_id AND f.plays <= sub.plays
+        ),
+        dec AS (
+            UPDATE followed_song_counts f
+            SET plays = f.plays - sub.plays
+            FROM sub
+            WHERE f.username = %(follower)s AND f.song_id = sub.song_id AND f.plays > sub.plays
+        ),
+        stats AS (
+            UPDATE user_follow_stats st
+            SET follower_count = GREATEST(st.follower_count - d.followers, 0),
+                following_count = GREATEST(st.following_count - d.following, 0)
+            FROM ({_STAT_DELTAS.format(src="del")}) d
+            WHERE st.username = d.username
+        )
+        SELECT COUNT(*) FROM del
+        """,
+        {"follower": follower, "followed": followed},
+    )
+    (removed,) = cur.fetchone()
+    return bool(removed)
+
+
+def ensure_followed_feed(cur, username: str) -> bool:
+    """
+    Build `username`'s followed_song_counts from listen history if it is not
+    built (first view, or invalidated by a heavily-followed listener).
+    The caller ends the transaction whatever this returns: a build takes a
+    transaction-level lock that is only released by its commit or rollback.
+    Returns True if the feed was (re)built.
+    """
+    state_sql = "SELECT 1 FROM followed_feed_state WHERE username = %s"
+    cur.execute(state_sql, (username,))
+    if cur.fetchone():
+        return False
+    # serialize builds of one user's feed (e.g. a background prefetch and a
+    # forced refresh); the second caller then sees the state row and skips
+    cur.execute("SELECT pg_advisory_xact_lock(hashtext('followed_feed:' || %s))", (username,))
+    cur.execute(state_sql, (username,))
+    if cur.fetchone():
+        return False
+    cur.execute("DELETE FROM followed_song_counts WHERE username = %s", (username,))
+    cur.execute(
+        """
+        INSERT INTO followed_song_counts (username, song_id, plays)
+        SELECT %(u)s, li.song_id, COUNT(*)
+        FROM listen li
+        WHERE li.listener_username = %(u)s
+           OR li.listener_username IN (
+                SELECT followed_user_id FROM user_follow WHERE follower_user_id = %(u)s
+           )
+        GROUP BY li.song_id
+        """,
+        {"u": username},
+    )
+    cur.execute(
+        """
+        INSERT INTO followed_feed_state (username, built_at) VALUES (%s, NOW())
+        ON CONFLICT (username) DO UPDATE SET built_at = EXCLUDED.built_at
+        """,
+        (username,),
+    )
+    return True
@@ -0,0 +1,197 @@
+from typing import Dict, Iterable, List, Tuple
+
+# Listeners with more followers than this don't fan out to their followers'
+# followed_song_counts feeds; those feeds are invalidated instead and rebuilt
+# on next view (services.follows.ensure_followed_feed).
+FANOUT_MAX_FOLLOWERS = 500
+
+# Spaced listens (a played queue) assume this length for songs without length_ms.
+DEFAULT_LENGTH_MS = 180_000
+
+# Rollups bumped by every listen insert: (CTE name, statement reading the
+# freshly inserted rows from `ins`). They run in the same statement as the
+# insert, so they commit or roll back together with it.
+_ROLLUPS: List[Tuple[str, str]] = [
+    # one listen per (listener, time), as the live listen_count queries count
+    # them; services.recommendations sums these for stored recommendations
+    ("daily", """
+        INSERT INTO song_daily_listens (day, song_id, listens)
+        SELECT date_of_view::date, song_id, COUNT(DISTINCT (listener_username, date_of_view))
+        FROM ins
+        GROUP BY 1, 2
+        ON CONFLICT (day, song_id) DO UPDATE
+        SET listens = song_daily_listens.listens + EXCLUDED.listens
+    """),
+    ("genre_month", """
+        INSERT INTO genre_month_listens (month, genre, listens)
+        SELECT date_trunc('month', ins.date_of_view)::date, sg.genre::text, COUNT(*)
+        FROM ins
+        JOIN song_genre sg ON sg.song_id = ins.song_id
+        GROUP BY 1, 2
+        ON CONFLICT (month, genre) DO UPDATE
+        SET listens = genre_month_listens.listens + EXCLUDED.listens
+    """),
+    # songs to fold into the listener's MinHash signature (schema/018);
+    # jobs.build_minhash --pending applies them off the interactive path
+    ("minhash_pending", """
+        INSERT INTO user_minhash_pending (username, song_id)
+        SELECT DISTINCT listener_username, song_id
+        FROM ins
+        ON CONFLICT (username, song_id) DO NOTHING
+    """),
+    # per-user artist totals for the user stats modal (schema/016)
+    ("user_artist", """
+        INSERT INTO user_artist_listens (username, artist_key, artist_label, listens)
+        SELECT
+            ins.listener_username,
+            CASE WHEN g.group_id IS NOT NULL THEN g.group_id::text ELSE 'song:' || s.song_id::text END,
+            CASE
+                WHEN g.group_id IS NOT NULL AND g.group_name IS NOT NULL THEN g.group_name
+                WHEN g.group_id IS NOT NULL THEN 'Unknown (group ' || g.group_id::text || ')'
+                ELSE 'Unknown Artist: ' || COALESCE(s.title, s.song_id::text)
+            END,
+            COUNT(*)
+        FROM ins
+        JOIN song s ON s.song_id = ins.song_id
+        LEFT JOIN "GROUP" g ON g.group_id = s.group_id
+        GROUP BY 1, 2, 3
+        ON CONFLICT (username, artist_key) DO UPDATE
+        SET listens = user_artist_listens.listens + EXCLUDED.listens,
+            artist_label = EXCLUDED.artist_label
+    """),
+    # forward-decayed trending scores (schema/011, trend_exp from schema/019);
+    # FOR SHARE holds off a concurrent landmark rebase until this insert commits
+    ("trend_epoch_now", """
+        SELECT landmark, decay FROM trend_epoch FOR SHARE
+    """),
+    ("trend", """
+        INSERT INTO song_trend (song_id, score)
+        SELECT ins.song_id,
+               SUM(trend_exp(te.decay * EXTRACT(EPOCH FROM ins.date_of_view::timestamptz - te.landmark)))
+        FROM ins
+        CROSS JOIN trend_epoch_now te
+        GROUP BY ins.song_id
+        ON CONFLICT (song_id) DO UPDATE
+        SET score = song_trend.score + EXCLUDED.score
+    """),
+    # built feeds that should see this listener's plays: their own, plus
+    # their followers' unless the listener is heavily followed
+    ("feed_targets", """
+        SELECT fs.username
+        FROM followed_feed_state fs
+        WHERE fs.username = %(username)s
+        UNION
+        SELECT fs.username
+        FROM user_follow uf
+        JOIN followed_feed_state fs ON fs.username = uf.follower_user_id
+        WHERE uf.followed_user_id = %(username)s
+          AND (SELECT COUNT(*) FROM user_follow
+               WHERE followed_user_id = %(username)s) <= %(fanout_max)s
+    """),
+    ("feed", """
+        INSERT INTO followed_song_counts (username, song_id, plays)
+        SELECT t.username, ins.song_id, COUNT(*)
+        FROM ins
+        CROSS JOIN feed_targets t
+        GROUP BY 1, 2
+        ON CONFLICT (username, song_id) DO UPDATE
+        SET plays = followed_song_counts.plays + EXCLUDED.plays
+    """),
+    ("feed_stale", """
+        DELETE FROM followed_feed_state fs
+        USING user_follow uf
+        WHERE uf.followed_user_id = %(username)s
+          AND fs.username = uf.follower_user_id
+          AND (SELECT COUNT(*) FROM user_follow
+               WHERE followed_user_id = %(username)s) > %(fanout_max)s
+    """),
+]
+
+
+# the songs record_listens plays: %(song_ids)s, in order
+_PLAYED_IDS = """
+        played AS (
+            SELECT p.song_id, p.ord, s.length_ms
+            FROM unnest(%(song_ids)s::text[]) WITH ORDINALITY AS p(song_id, ord)
+            LEFT JOIN song s ON s.song_id = p.song_id
+        )"""
+
+
+def record_sql(played: str = _PLAYED_IDS, extra: str = "",
+               result: str = "SELECT COUNT(*) FROM ins") -> str:
+    """
+    The record_listens statement, for callers that pick the songs or write
+    more in the same round trip. `played` defines the CTEs ending in
+    `played (song_id, ord, length_ms)`, the songs to insert in play order;
+    `extra` adds CTEs after the rollups (each preceded by a comma) and
+    `result` is the final SELECT. Takes record_params() plus the
+    parameters those fragments use.
+    """
+    rollups = ",\n".join(f"{name} AS ({sql})" for name, sql in _ROLLUPS)
+    return f"""
+        WITH {played.strip()},
+        ins AS (
+            INSERT INTO listen (song_id, listener_username, date_of_view)
+            SELECT p.song_id, %(username)s,
+                   NOW() - CASE WHEN %(spaced)s
+                                THEN SUM(COALESCE(p.length_ms, %(default_ms)s)) OVER (
+                                         ORDER BY p.ord ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING
+                                     )
+                                ELSE 0
+                           END::float8 * interval '1 millisecond'
+            FROM played p
+            RETURNING song_id, listener_username, date_of_view
+        ),
+        {rollups}{extra}
+        {result}
+    """
+
+
+def record_params(username: str, spaced: bool) -> Dict[str, object]:
+    return {
+        "username": username,
+        "spaced": spaced,
+        "default_ms": DEFAULT_LENGTH_MS,
+        "fanout_max": FANOUT_MAX_FOLLOWERS,
+    }
+
+
+def record_listens(cur, username: str, song_ids: Iterable[str], spaced: bool = False) -> int:
+    """
+    Insert one listen per song id for `username` at NOW() and update the
+    listen rollups, all in one statement (one round trip); the songs are
+    queued for the user's MinHash signature, which jobs.build_minhash
+    updates later. The caller commits.
+    With `spaced`, the songs are a queue that was just played back to back
+    and finishes at NOW(): each listen is stamped NOW() minus its own length
+    and the lengths of the songs after it, so every play keeps its own
+    date_of_view and none lies in the future (which the daily, monthly,
+    trending and feed rollups would otherwise count ahead of time).
+    Returns the number of listens written.
+    """
+    ids = list(song_ids)
+    if not ids:
+        return 0
+    cur.execute(record_sql(), {**record_params(username, spaced), "song_ids": ids})
+    (written,) = cur.fetchone()
+    return int(written or 0)
+
+
+def fetch_listen_counts(cur, song_ids: Iterable[str]) -> Dict[str, int]:
+    """
+    Return {song_id: distinct listen count} for the given songs only.
+    Songs that were never played are left out of the dict.
+    """
+    ids = list(song_ids)
+    if not ids:
+        return {}
+    cur.execute(
+        """
+        SELECT song_id, COUNT(DISTINCT (listener_username, date_of_view))
+        FROM listen
+        WHERE song_id = ANY(%s)
+        GROUP BY song_id
+        """,
+        (ids,),
+    )
+    return {str(sid): int(cnt or 0) for sid, cnt in cur.fetchall()}
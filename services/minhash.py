@@ -0,0 +1,141 @@
+import hashlib
+import random
+from typing import Dict, Iterable, List, Optional
+
+# 128 hash functions split into 64 bands of 2 rows: two users land in a
+# common bucket with probability 1 - (1 - J^2)^64, i.e. ~50% at a Jaccard
+# similarity of ~0.1 and ~90% at ~0.19.
+NUM_PERM = 128
+BANDS = 64
+ROWS = NUM_PERM // BANDS
+
+# most candidates returned per lookup (users sharing the most bands first)
+MAX_CANDIDATES = 2000
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = _PRIME - 1
+_rng = random.Random(0x5EED)
+_PERMS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+
+def _song_hash(song_id: str) -> int:
+    # stable across processes, unlike hash()
+    return int.from_bytes(hashlib.blake2b(song_id.encode(), digest_size=8).digest(), "big")
+
+
+def signature(song_ids: Iterable[str], base: Optional[List[int]] = None) -> List[int]:
+    """MinHash signature of a song set, optionally folded into an existing one."""
+    sig = list(base) if base else [_MAX_HASH] * NUM_PERM
+    for song_id in set(song_ids):
+        x = _song_hash(str(song_id))
+        for i, (a, b) in enumerate(_PERMS):
+            h = (a * x + b) % _PRIME
+            if h < sig[i]:
+                sig[i] = h
+    return sig
+
+
+def band_buckets(sig: List[int]) -> List[int]:
+    """One signed 64-bit bucket key per band."""
+    keys = []
+    for band in range(BANDS):
+        rows = sig[band * ROWS:(band + 1) * ROWS]
+        digest = hashlib.blake2b(repr(rows).encode(), digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "big", signed=True))
+    return keys
+
+
+def store_signature(cur, username: str, sig: List[int],
+                    old: Optional[List[int]] = None) -> None:
+    """Upsert `username`'s signature and rewrite only the bands that changed."""
+    new_keys = band_buckets(sig)
+    old_keys = band_buckets(old) if old else [None] * BANDS
+    bands = [b for b in range(BANDS) if new_keys[b] != old_keys[b]]
+    if not bands:
+        return
+    cur.execute(
+        """
+        INSERT INTO user_minhash (username, signature, updated_at)
+        VALUES (%s, %s, NOW())
+        ON CONFLICT (username) DO UPDATE
+        SET signature = EXCLUDED.signature, updated_at = EXCLUDED.updated_at
+        """,
+        (username, sig),
+    )
+    cur.execute(
+        "DELETE FROM user_lsh_bucket WHERE username = %s AND band = ANY(%s::smallint[])",
+        (username, bands),
+    )
+    cur.execute(
+        """
+        INSERT INTO user_lsh_bucket (band, bucket, username)
+        SELECT t.band, t.bucket, %s
+        FROM unnest(%s::smallint[], %s::bigint[]) AS t(band, bucket)
+        ON CONFLICT DO NOTHING
+        """,
+        (username, bands, [new_keys[b] for b in bands]),
+    )
+
+
+def fold_pending_signatures(cur) -> int:
+    """
+    Fold every queued (user, song) from user_minhash_pending (schema/018)
+    into that user's signature and LSH buckets, and clear the queue. Users
+    without a signature get one built from their whole listen history.
+    The caller commits. Returns the number of users updated.
+    """
+    cur.execute("DELETE FROM user_minhash_pending RETURNING username, song_id")
+    pending: Dict[str, List[str]] = {}
+    for username, song_id in cur.fetchall():
+        pending.setdefault(username, []).append(song_id)
+    if not pending:
+        return 0
+    cur.execute(
+        "SELECT username, signature FROM user_minhash WHERE username = ANY(%s) FOR UPDATE",
+        (list(pending),),
+    )
+    existing = {u: [int(v) for v in sig] for u, sig in cur.fetchall()}
+    fresh = [u for u in pending if u not in existing]
+    history: Dict[str, List[str]] = {}
+    if fresh:
+        cur.execute(
+            "SELECT DISTINCT listener_username, song_id FROM listen WHERE listener_username = ANY(%s)",
+            (fresh,),
+        )
+        for username, song_id in cur.fetchall():
+            history.setdefault(username, []).append(song_id)
+    for username, song_ids in pending.items():
+        old = existing.get(username)
+        if old is None:
+            store_signature(cur, username, signature(history.get(username, song_ids)))
+            continue
+        sig = signature(song_ids, base=old)
+        if sig != old:
+            store_signature(cur, username, sig, old)
+    return len(pending)
+
+
+def similar_user_candidates(cur, username: str,
+                            limit: int = MAX_CANDIDATES) -> Optional[List[str]]:
+    """
+    Users sharing at least one LSH bucket with `username`, most shared bands
+    first. None if `username` has no signature yet (caller should scan).
+    Candidates are approximate; verify them against listen.
+    """
+    cur.execute("SELECT 1 FROM user_minhash WHERE username = %s", (username,))
+    if cur.fetchone() is None:
+        return None
+    cur.execute(
+        """
+        SELECT other.username
+        FROM user_lsh_bucket mine
+        JOIN user_lsh_bucket other
+          ON other.band = mine.band AND other.bucket = mine.bucket
+        WHERE mine.username = %(u)s AND other.username <> %(u)s
+        GROUP BY other.username
+        ORDER BY COUNT(*) DESC, other.username
+        LIMIT %(limit)s
+        """,
+        {"u": username, "limit": limit},
+    )
+    return [r[0] for r in cur.fetchall()]
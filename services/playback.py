@@ -0,0 +1,109 @@
+from typing import Iterable, List, Optional, Tuple
+
+from services.listens import record_params, record_sql
+
+# Simulated playback: a queue of songs is "played" back to back, so its
+# listens are written in one batched insert with date_of_view spaced by
+# song length (record_listens(spaced=True)). Where a user stopped in a
+# queue is kept in playback_position (schema/014). Each play is a single
+# statement: the listens, their rollups and the position update go in one
+# round trip. The caller commits.
+
+# store %(next_position)s as %(queue_key)s's resume point, or forget it when
+# that is NULL or 0; nothing happens without a queue_key, or while `hold`
+# (SQL over the statement's CTEs) is true
+def _position_sql(hold: str = "FALSE") -> str:
+    return f""",
+        forget AS (
+            DELETE FROM playback_position
+            WHERE username = %(username)s AND queue_key = %(queue_key)s
+              AND NULLIF(%(next_position)s::int, 0) IS NULL
+              AND NOT {hold}
+        ),
+        remember AS (
+            INSERT INTO playback_position (username, queue_key, position)
+            SELECT %(username)s, %(queue_key)s, %(next_position)s::int
+            WHERE %(queue_key)s::text IS NOT NULL
+              AND NULLIF(%(next_position)s::int, 0) IS NOT NULL
+              AND NOT {hold}
+            ON CONFLICT (username, queue_key) DO UPDATE
+            SET position = EXCLUDED.position, updated_at = NOW()
+        )"""
+
+
+# the collection in play order (title, then song_id) from %(start)s on.
+# With a NULL start, a saved resume point inside the queue is returned as
+# `pending` instead of playing, so the caller can ask where to start.
+_PLAYED_COLLECTION = """
+        queue AS (
+            SELECT s.song_id, s.length_ms,
+                   ROW_NUMBER() OVER (ORDER BY COALESCE(s.title, ''), s.song_id) - 1 AS ord
+            FROM song_within_collection sc
+            JOIN song s ON s.song_id = sc.song_id
+            WHERE sc.collection_id = %(queue_key)s
+        ),
+        pending AS (
+            SELECT pp.position
+            FROM playback_position pp
+            WHERE pp.username = %(username)s AND pp.queue_key = %(queue_key)s
+              AND %(start)s::int IS NULL
+              AND pp.position < (SELECT COUNT(*) FROM queue)
+        ),
+        played AS (
+            SELECT song_id, ord, length_ms
+            FROM queue
+            WHERE ord >= COALESCE(%(start)s::int, 0)
+              AND NOT EXISTS (SELECT 1 FROM pending)
+        )"""
+
+
+def play_songs(cur, username: str, song_ids: Iterable[str],
+               queue_key: Optional[str] = None, next_position: Optional[int] = None) -> int:
+    """
+    Play `song_ids` back to back, finishing now. With `queue_key`, also store
+    `next_position` as that queue's resume point (None: the queue finished).
+    Returns the number of listens written.
+    """
+    ids = list(song_ids)
+    if not ids:
+        return 0
+    cur.execute(
+        record_sql(extra=_position_sql()),
+        {
+            **record_params(username, spaced=True),
+            "song_ids": ids,
+            "queue_key": queue_key,
+            "next_position": next_position,
+        },
+    )
+    (written,) = cur.fetchone()
+    return int(written or 0)
+
+
+def play_collection(cur, username: str, collection_id: str,
+                    start: Optional[int] = None) -> Tuple[List[str], Optional[int], int]:
+    """
+    Play a collection to the end from index `start` and forget its resume
+    point. Returns (song ids played, resume point, queue length).
+    With start None, a saved resume point inside the queue is not acted on:
+    nothing is played and it is returned, and the caller plays again with
+    the start the user picked. Otherwise the resume point is None and the
+    whole queue is played.
+    """
+    cur.execute(
+        record_sql(
+            _PLAYED_COLLECTION,
+            extra=_position_sql(hold="EXISTS (SELECT 1 FROM pending)"),
+            result="""SELECT ARRAY(SELECT song_id FROM ins ORDER BY date_of_view),
+                             (SELECT position FROM pending),
+                             (SELECT COUNT(*) FROM queue)""",
+        ),
+        {
+            **record_params(username, spaced=True),
+            "queue_key": collection_id,
+            "start": start,
+            "next_position": None,
+        },
+    )
+    played, pending, length = cur.fetchone()
+    return [str(s) for s in played], pending, int(length)
@@ -0,0 +1,134 @@
+from typing import List, Optional
+
+from services.minhash import similar_user_candidates
+
+# "Recommended For You" queries. Every one returns rows of
+# (song_id, song, artist, album, length_ms, release_date, release_year,
+#  listen_count, score), best first: listen_count is the song's total
+# listens, score only orders the rows. bench.recommender_bench times these
+# same statements against synthetic data.
+
+# rows computed offline by jobs.recommend (schema/007); songs the user has
+# played since the last run are skipped. listen_count sums the daily rollup,
+# which counts distinct (listener, date_of_view) like LIVE_SQL does
+STORED_SQL = """
+    SELECT
+        s.song_id,
+        s.title AS song,
+        COALESCE(g.group_name, '') AS artist,
+        COALESCE(string_agg(DISTINCT al.album_name, ', '), '') AS album,
+        s.length_ms,
+        COALESCE(MIN(s.release_date), MIN(al.release_date)) AS release_date,
+        EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) AS release_year,
+        COALESCE((SELECT SUM(d.listens) FROM song_daily_listens d
+                  WHERE d.song_id = s.song_id), 0) AS listen_count,
+        ur.score
+    FROM user_recommendations ur
+    JOIN song s               ON s.song_id = ur.song_id
+    LEFT JOIN "GROUP" g       ON g.group_id = s.group_id
+    LEFT JOIN song_within_album swa ON swa.song_id = s.song_id
+    LEFT JOIN album al        ON al.album_id = swa.album_id
+    WHERE ur.username = %(u)s
+      AND NOT EXISTS (
+            SELECT 1 FROM listen li
+            WHERE li.listener_username = %(u)s AND li.song_id = ur.song_id
+      )
+    GROUP BY s.song_id, s.title, s.length_ms, g.group_name, ur.score, ur.rank
+    ORDER BY ur.rank
+"""
+
+# similar users share at least 3 songs with %(u)s; %(candidates)s limits
+# them to MinHash/LSH candidates (schema/008), NULL scans every listener
+LIVE_SQL = """
+    WITH user_listens AS (
+        SELECT DISTINCT song_id
+        FROM listen
+        WHERE listener_username = %(u)s
+    ),
+    similar_users AS (
+        SELECT
+            li.listener_username,
+            COUNT(DISTINCT li.song_id) AS overlap
+        FROM listen li
+        JOIN user_listens ul ON ul.song_id = li.song_id
+        WHERE li.listener_username <> %(u)s
+          AND (%(candidates)s::text[] IS NULL
+               OR li.listener_username = ANY(%(candidates)s::text[]))
+        GROUP BY li.listener_username
+        HAVING COUNT(DISTINCT li.song_id) >= 3
+    ),
+    candidate_plays AS (
+        SELECT
+            li.song_id,
+            COUNT(*) AS score
+        FROM listen li
+        JOIN similar_users su ON su.listener_username = li.listener_username
+        WHERE li.song_id NOT IN (SELECT song_id FROM user_listens)
+        GROUP BY li.song_id
+    ),
+    recommended_songs AS (
+        SELECT
+            s.song_id,
+            s.title AS song,
+            COALESCE(g.group_name, '') AS artist,
+            COALESCE(string_agg(DISTINCT al.album_name, ', '), '') AS album,
+            s.length_ms,
+            COALESCE(MIN(s.release_date), MIN(al.release_date)) AS release_date,
+            EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) AS release_year,
+            c.score,
+            COALESCE(
+                COUNT(DISTINCT (li_all.listener_username, li_all.date_of_view)),
+                0
+            ) AS listen_count
+        FROM candidate_plays c
+        JOIN song s               ON s.song_id = c.song_id
+        LEFT JOIN "GROUP" g       ON g.group_id = s.group_id
+        LEFT JOIN song_within_album swa ON swa.song_id = s.song_id
+        LEFT JOIN album al        ON al.album_id = swa.album_id
+        LEFT JOIN listen li_all   ON li_all.song_id = s.song_id
+        GROUP BY s.song_id, s.title, s.length_ms, g.group_name, c.score
+    )
+    SELECT
+        song_id,
+        song,
+        artist,
+        album,
+        length_ms,
+        release_date,
+        release_year,
+        listen_count,
+        score
+    FROM recommended_songs
+    ORDER BY score DESC, LOWER(song) ASC
+    LIMIT 50
+"""
+
+
+def has_stored_recommendations(cur, username: str) -> bool:
+    cur.execute("SELECT 1 FROM user_recommendations WHERE username = %s LIMIT 1", (username,))
+    return cur.fetchone() is not None
+
+
+def stored_recommendations(cur, username: str) -> list:
+    cur.execute(STORED_SQL, {"u": username})
+    return cur.fetchall()
+
+
+def live_recommendations(cur, username: str, candidates: Optional[List[str]]) -> list:
+    """
+    Songs played by users similar to `username` that they haven't played,
+    by plays among those users. `candidates` restricts the similar users
+    checked (see similar_user_candidates); None checks every listener.
+    """
+    cur.execute(LIVE_SQL, {"u": username, "candidates": candidates})
+    return cur.fetchall()
+
+
+def recommended_songs(cur, username: str) -> list:
+    """
+    Stored recommendations for `username`, or the live query for users
+    without any (new users, or not computed yet).
+    """
+    if has_stored_recommendations(cur, username):
+        return stored_recommendations(cur, username)
+    return live_recommendations(cur, username, similar_user_candidates(cur, username))
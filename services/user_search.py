@@ -0,0 +1,90 @@
+from typing import List, Tuple
+
+# searchable USER columns, best first: at equal match quality a username hit
+# outranks a display name hit, which outranks an email hit (schema/017
+# indexes exactly these expressions)
+SEARCH_FIELDS = {
+    "username": "LOWER(u.username)",
+    "display_name": "LOWER(u.display_name)",
+    "email": "LOWER(u.email)",
+}
+
+# terms shorter than this only match as prefixes (trigrams need 3 characters)
+MIN_CONTAINS_LEN = 3
+
+PAGE_SIZE = 50
+
+
+def _like_escape(term: str) -> str:
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_users(cur, me: str, term: str, field: str = "all",
+                 limit: int = PAGE_SIZE) -> Tuple[List[Tuple[str, str, int, int, bool]], bool]:
+    """
+    Users whose username, display name and/or email (`field`: "all" or a
+    SEARCH_FIELDS key) match `term`, ranked exact > prefix > substring and
+    then by field. Only the best `limit` are kept; follower counts
+    (user_follow_stats) and whether `me` follows them are read for those.
+    Returns ([(username, display_name, followers, following, is_followed)],
+    whether more users matched).
+    """
+    term = term.strip().lower()
+    if not term:
+        return [], False
+    fields = list(SEARCH_FIELDS) if field == "all" else [field]
+    if any(f not in SEARCH_FIELDS for f in fields):
+        raise ValueError(f"Unknown search field: {field}")
+    like = _like_escape(term)
+    match = "%(contains)s" if len(term) >= MIN_CONTAINS_LEN else "%(prefix)s"
+
+    quality = []
+    where = []
+    rank = []
+    for name in fields:
+        col = SEARCH_FIELDS[name]
+        weight = len(SEARCH_FIELDS) - 1 - list(SEARCH_FIELDS).index(name)
+        quality.append(f"""
+                CASE WHEN {col} = %(term)s THEN 3
+                     WHEN {col} LIKE %(prefix)s THEN 2
+                     WHEN {col} LIKE %(contains)s THEN 1
+                     ELSE 0 END AS {name}_q""")
+        where.append(f"{col} LIKE {match}")
+        rank.append(f"CASE WHEN {name}_q > 0 THEN {name}_q * {len(SEARCH_FIELDS)} + {weight} ELSE 0 END")
+
+    cur.execute(
+        f"""
+        WITH hits AS (
+            SELECT u.username, u.display_name,{",".join(quality)}
+            FROM "USER" u
+            WHERE {" OR ".join(where)}
+        ),
+        page AS (
+            SELECT h.username, h.display_name, GREATEST({", ".join(rank)}) AS match_rank
+            FROM hits h
+            ORDER BY match_rank DESC, LOWER(h.username) ASC
+            LIMIT %(limit)s
+        )
+        SELECT
+            p.username,
+            COALESCE(p.display_name, ''),
+            COALESCE(st.follower_count, 0),
+            COALESCE(st.following_count, 0),
+            EXISTS (
+                SELECT 1 FROM user_follow uf
+                WHERE uf.follower_user_id = %(me)s AND uf.followed_user_id = p.username
+            )
+        FROM page p
+        LEFT JOIN user_follow_stats st ON st.username = p.username
+        ORDER BY p.match_rank DESC, LOWER(p.username) ASC
+        """,
+        {
+            "me": me,
+            "term": term,
+            "prefix": f"{like}%",
+            "contains": f"%{like}%",
+            "limit": limit + 1,
+        },
+    )
+    rows = [(str(u), str(d), int(a), int(b), bool(f)) for u, d, a, b, f in cur.fetchall()]
+    return rows[:limit], len(rows) > limit
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Optional
+
+TOP_ARTISTS = 10
+
+
+def fetch_user_stats(cur, username: str) -> Optional[Dict[str, Any]]:
+    """
+    Collections, followers, following and top artists for one user in a
+    single query, read from the collection index, user_follow_stats
+    (schema/015) and user_artist_listens (schema/016).
+    Returns None if the user does not exist.
+    """
+    cur.execute(
+        """
+        SELECT
+            (SELECT COUNT(*) FROM collection c WHERE c.creator_username = u.username),
+            COALESCE(st.follower_count, 0),
+            COALESCE(st.following_count, 0),
+            (
+                SELECT COALESCE(json_agg(json_build_array(t.artist_label, t.listens)
+                                         ORDER BY t.listens DESC, LOWER(t.artist_label)), '[]')
+                FROM (
+                    SELECT artist_label, listens
+                    FROM user_artist_listens
+                    WHERE username = u.username
+                    ORDER BY listens DESC, LOWER(artist_label) ASC
+                    LIMIT %(top)s
+                ) t
+            )
+        FROM "USER" u
+        LEFT JOIN user_follow_stats st ON st.username = u.username
+        WHERE u.username = %(u)s
+        """,
+        {"u": username, "top": TOP_ARTISTS},
+    )
+    row = cur.fetchone()
+    if row is None:
+        return None
+    collections, followers, following, top = row
+    return {
+        "collections": int(collections or 0),
+        "followers": int(followers or 0),
+        "following": int(following or 0),
+        "top_artists": [(label, int(n)) for label, n in top or []],
+    }
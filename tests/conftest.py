@@ -0,0 +1,50 @@
+import os
+import uuid
+
+import pytest
+
+from bench.scratch import create_schema, drop_schema
+
+# Tests that need Postgres run against TEST_DATABASE_URL (a libpq DSN), each
+# in a throwaway schema; without it they are skipped.
+TEST_DSN = os.getenv("TEST_DATABASE_URL")
+
+
+@pytest.fixture
+def scratch_db():
+    """
+    scratch_db(*migrations) -> connect: creates the base tables plus the
+    given schema/ files in a fresh schema; connect() opens a connection
+    whose search_path points at it. Everything is dropped afterwards.
+    """
+    if not TEST_DSN:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    import psycopg2
+
+    schema = f"test_{uuid.uuid4().hex[:12]}"
+    opened = []
+
+    def connect():
+        conn = psycopg2.connect(TEST_DSN, options=f"-c search_path={schema},public")
+        opened.append(conn)
+        return conn
+
+    def create(*migrations: str):
+        conn = connect()
+        with conn.cursor() as cur:
+            create_schema(cur, schema, migrations)
+        conn.commit()
+        return connect
+
+    yield create
+
+    for conn in opened:
+        conn.close()
+    if opened:
+        import psycopg2
+
+        conn = psycopg2.connect(TEST_DSN)
+        with conn.cursor() as cur:
+            drop_schema(cur, schema)
+        conn.commit()
+        conn.close()
@@ -0,0 +1,77 @@
+import pytest
+
+from services import cache as cache_mod
+from services.cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache_mod.time, "time", lambda: now[0])
+    return now
+
+
+def test_fresh_then_stale_then_gone(clock):
+    c = TTLCache("t", ttl=10, max_stale=60)
+    assert c.get("k") is None
+    c.put("k", [1, 2])
+    assert c.get("k") == ([1, 2], True)
+    clock[0] += 30
+    assert c.get("k") == ([1, 2], False)
+    clock[0] += 30
+    assert c.get("k") is None
+
+
+def test_mark_stale_keeps_value_servable(clock):
+    c = TTLCache("t", ttl=10, max_stale=60)
+    c.put("k", "v")
+    c.mark_stale("k")
+    assert c.get("k") == ("v", False)
+    c.put("k", "v2")
+    assert c.get("k") == ("v2", True)
+
+
+def test_note_writes_marks_stale_at_threshold(clock):
+    c = TTLCache("t", ttl=10, max_stale=60, invalidate_after=3)
+    c.put("k", "v")
+    assert not c.note_writes("k")
+    assert not c.note_writes("k")
+    assert c.get("k") == ("v", True)
+    assert c.note_writes("k")
+    assert c.get("k") == ("v", False)
+    # a fresh put resets the count
+    c.put("k", "v2")
+    assert not c.note_writes("k", 2)
+
+
+def test_sqlite_store_is_shared_between_instances(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    a = TTLCache("recs", ttl=10, max_stale=60, path=path)
+    b = TTLCache("recs", ttl=10, max_stale=60, path=path)
+    other = TTLCache("stats", ttl=10, max_stale=60, path=path)
+    a.put(("alice", "mode"), {"rows": [1]})
+    assert b.get(("alice", "mode")) == ({"rows": [1]}, True)
+    assert other.get(("alice", "mode")) is None
+
+    clock[0] += 5
+    a.mark_stale(("alice", "mode"))
+    fresh = TTLCache("recs", ttl=10, max_stale=60, path=path)
+    assert fresh.get(("alice", "mode")) == ({"rows": [1]}, False)
+
+
+def test_sqlite_store_shows_other_instances_changes(clock, tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    a = TTLCache("recs", ttl=10, max_stale=60, path=path)
+    b = TTLCache("recs", ttl=10, max_stale=60, path=path)
+    a.put("alice", "v1")
+    assert b.get("alice") == ("v1", True)  # b now holds its own copy
+
+    clock[0] += 1
+    a.mark_stale("alice")
+    assert b.get("alice") == ("v1", False)
+
+    clock[0] += 1
+    a.put("alice", "v2")
+    assert b.get("alice") == ("v2", True)
+    b.mark_stale("alice")
+    assert a.get("alice") == ("v2", False)
@@ -0,0 +1,96 @@
+from services.catalog_index import CatalogSnapshot, _TextIndex, fetch_catalog_version, match_rank
+
+# (song_id, title, artist, album, length_ms, release_year, genres)
+ROWS = [
+    ("s1", "Blue", "Low Tide", "Blue", 200000, 1994, ["rock"]),
+    ("s2", "Blue Monday", "New Order", "Power", 450000, 1983, ["electronic"]),
+    ("s3", "Into the Blue", "Moby", "Everything", None, None, []),
+    ("s4", "Yellow", "Coldplay", "Parachutes", 266000, 2000, ["rock", "pop"]),
+    ("s5", "Song", "Blue", "Blue Album", 180000, 1994, ["pop"]),
+]
+
+
+def test_text_index_contains_and_prefix():
+    index = _TextIndex(["blue", "blue monday", "into the blue", "yellow", "bl"])
+    assert index.contains("blue") == [0, 1, 2]
+    assert index.contains("e b") == [2]
+    assert index.contains("bl") == [0, 1, 2, 4]  # shorter than a trigram: scan
+    assert index.contains("purple") == []
+    assert index.prefix("blue") == [0, 1]
+    assert index.prefix("z") == []
+
+
+def test_match_rank_orders_quality_before_field():
+    assert match_rank("genre", 3) > match_rank("song", 2)
+    assert match_rank("song", 2) > match_rank("artist", 2) > match_rank("album", 2)
+
+
+def test_snapshot_columns_round_trip():
+    snap = CatalogSnapshot(7, ROWS)
+    assert len(snap) == 5
+    assert snap.row(snap.row_of["s4"]) == ("s4", "Yellow", "Coldplay", "Parachutes", 266000, "pop, rock", 2000)
+    # missing length and year come back as None
+    assert snap.row(snap.row_of["s3"])[4:] == (None, "", None)
+
+
+def test_search_by_field():
+    snap = CatalogSnapshot(1, ROWS)
+    ids = lambda rows: sorted(snap.song_ids[i] for i in rows)
+    assert ids(snap.search("BLUE", "song")) == ["s1", "s2", "s3"]
+    assert ids(snap.search("blue", "artist")) == ["s5"]
+    assert ids(snap.search("blue", "album")) == ["s1", "s5"]
+    assert ids(snap.search("ock", "genre")) == ["s1", "s4"]
+    assert len(snap.search("", "song")) == 5
+
+
+def test_search_ranked_prefers_exact_then_prefix_then_field():
+    snap = CatalogSnapshot(1, ROWS)
+    ranked = snap.search_ranked("blue")
+    order = sorted(ranked, key=lambda i: (-ranked[i][0], snap.song_ids[i]))
+    # exact title, exact artist, prefix title, substring title
+    assert [snap.song_ids[i] for i in order] == ["s1", "s5", "s2", "s3"]
+    rank, matches = ranked[snap.row_of["s1"]]
+    assert rank == match_rank("song", 3)
+    assert matches == {"song": (3, 0), "album": (3, 0)}
+    assert ranked[snap.row_of["s3"]][1]["song"] == (1, 9)
+
+
+def test_filter_rows_and_facet_counts():
+    snap = CatalogSnapshot(1, ROWS)
+    rows = list(range(len(snap)))
+    rock_90s = snap.filter_rows(rows, {"genre": {"rock"}, "decade": {"1990"}})
+    assert [snap.song_ids[i] for i in rock_90s] == ["s1"]
+    either = snap.filter_rows(rows, {"genre": {"rock", "electronic"}})
+    assert [snap.song_ids[i] for i in either] == ["s1", "s2", "s4"]
+
+    counts = snap.facet_counts(rows)
+    assert counts["genre"] == {"electronic": 1, "pop": 2, "rock": 2}
+    assert counts["decade"] == {"1990": 2, "1980": 1, "2000": 1}
+    assert counts["artist"]["Blue"] == 1
+
+
+def test_sort_puts_unknown_years_last_ascending():
+    snap = CatalogSnapshot(1, ROWS)
+    rows = list(range(len(snap)))
+    by_year = [snap.song_ids[i] for i in snap.sort(rows, "release_year", "ASC")]
+    assert by_year == ["s2", "s1", "s5", "s4", "s3"]
+    assert [snap.song_ids[i] for i in snap.sort(rows, "release_year", "DESC")][0] == "s3"
+
+
+def test_missing_version_table_keeps_the_callers_work(scratch_db):
+    conn = scratch_db()()
+    with conn.cursor() as cur:
+        cur.execute("""INSERT INTO "USER" (username, email) VALUES ('ann', 'ann@x')""")
+        assert fetch_catalog_version(cur) is None
+        cur.execute('SELECT COUNT(*) FROM "USER"')
+        assert cur.fetchone()[0] == 1
+    conn.rollback()
+
+
+def test_fetch_catalog_version(scratch_db):
+    conn = scratch_db("002_catalog_version.sql")()
+    with conn.cursor() as cur:
+        before = fetch_catalog_version(cur)
+        cur.execute("INSERT INTO song (song_id, title) VALUES ('s1', 'One')")
+        assert fetch_catalog_version(cur) == before + 1
+    conn.rollback()
@@ -0,0 +1,58 @@
+import io
+
+import pytest
+
+from services.collection_io import _CsvLines, _song_ids, format_for
+
+
+def ids(text, fmt="csv"):
+    return list(_song_ids(io.StringIO(text), fmt))
+
+
+def test_format_for():
+    assert format_for("a/b.CSV") == "csv"
+    assert format_for("x.ndjson") == "jsonl"
+    with pytest.raises(ValueError):
+        format_for("songs.txt")
+
+
+def test_csv_header_picks_song_id_column():
+    assert ids("title,song_id\nBlue,s1\nRed,\nGreen, s3 \n") == ["s1", "s3"]
+
+
+def test_csv_header_with_bom():
+    assert ids("﻿song_id,title\ns1,Blue\n") == ["s1"]
+
+
+def test_csv_without_header_reads_first_column():
+    assert ids("s1,Blue\ns2,Red\n") == ["s1", "s2"]
+    assert ids("﻿s1\ns2\n") == ["s1", "s2"]
+    assert ids("") == []
+
+
+@pytest.mark.parametrize("header", ["title,artist", "id number,title", "Song ID,title"])
+def test_csv_header_without_song_id_is_rejected(header):
+    with pytest.raises(ValueError, match="song_id"):
+        _song_ids(io.StringIO(header + "\ns1,x\n"), "csv")
+
+
+def test_jsonl():
+    assert ids('{"song_id": "s1"}\n\n{"song_id": 7}\n{"title": "x"}\n', "jsonl") == ["s1", "7"]
+    with pytest.raises(ValueError, match="Line 2"):
+        ids('{"song_id": "s1"}\n[1]\n', "jsonl")
+
+
+def test_csv_lines_reads_in_any_chunk_size():
+    source = ["s1", 'we"ird', "s3"]
+    expected = '"s1"\n"we""ird"\n"s3"\n'
+    for size in (1, 3, 7, 100):
+        reader = _CsvLines(iter(source))
+        chunks = []
+        while True:
+            chunk = reader.read(size)
+            if not chunk:
+                break
+            assert len(chunk) <= size
+            chunks.append(chunk)
+        assert "".join(chunks) == expected
+    assert _CsvLines(iter(source)).read() == expected
@@ -0,0 +1,61 @@
+import pytest
+
+from services import follow_graph
+from services.follow_graph import COMMON_WEIGHT, FOF_WEIGHT, FollowGraph
+
+USERS = ["ann", "bob", "cat", "dan", "eve"]
+EDGES = [
+    ("ann", "bob"), ("ann", "cat"),
+    ("bob", "dan"), ("cat", "dan"), ("cat", "eve"),
+    ("eve", "bob"),
+    ("ghost", "ann"),  # unknown user: ignored
+]
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def graph(request, monkeypatch):
+    if request.param == "fallback":
+        monkeypatch.setattr(follow_graph, "np", None)
+    elif follow_graph.np is None:
+        pytest.skip("numpy not installed")
+    return FollowGraph(USERS, EDGES)
+
+
+def test_loaded_adjacency(graph):
+    assert sorted(graph.following("ann")) == ["bob", "cat"]
+    assert sorted(graph.following("cat")) == ["dan", "eve"]
+    assert graph.following("nobody") == []
+
+
+def test_suggestions_rank_friends_of_friends(graph):
+    out = graph.suggestions("ann")
+    # dan: followed by bob and cat; eve: followed by cat and follows bob
+    assert [u for u, *_ in out] == ["dan", "eve"]
+    assert out[0] == ("dan", 2 * FOF_WEIGHT, 2, 0)
+    assert out[1] == ("eve", FOF_WEIGHT + COMMON_WEIGHT, 1, 1)
+    assert graph.suggestions("nobody") == []
+
+
+def test_apply_is_idempotent_and_overlays(graph):
+    graph.apply("ann", "dan", True)
+    graph.apply("ann", "dan", True)
+    assert graph.pending == 1
+    assert "dan" not in [u for u, *_ in graph.suggestions("ann")]
+
+    graph.apply("ann", "bob", False)
+    assert sorted(graph.following("ann")) == ["cat", "dan"]
+    graph.apply("ann", "bob", True)  # re-follow cancels the removal
+    graph.apply("ann", "dan", False)  # unfollow cancels the addition
+    assert graph.pending == 0
+    assert sorted(graph.following("ann")) == ["bob", "cat"]
+
+
+def test_new_users_after_load(graph):
+    graph.apply("zed", "ann", True)
+    graph.apply("zed", "cat", True)
+    assert len(graph) == len(USERS) + 1
+    suggested = dict((u, (a, c)) for u, _s, a, c in graph.suggestions("zed"))
+    assert suggested["bob"] == (1, 0)
+    assert suggested["dan"] == (1, 0)
+    # zed also follows cat, so ann sees zed as a common-neighbour suggestion
+    assert ("zed", COMMON_WEIGHT, 0, 1) in graph.suggestions("ann")
@@ -0,0 +1,42 @@
+from services.follows import ensure_followed_feed
+
+
+def _lock_free(conn, username):
+    with conn.cursor() as cur:
+        cur.execute("SELECT pg_try_advisory_xact_lock(hashtext('followed_feed:' || %s))", (username,))
+        (got,) = cur.fetchone()
+    conn.rollback()
+    return got
+
+
+def _setup(connect):
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO "USER" (username, email) VALUES ('ann', 'ann@x'), ('bob', 'bob@x');
+            INSERT INTO song (song_id, title) VALUES ('s1', 'One'), ('s2', 'Two');
+            INSERT INTO user_follow VALUES ('ann', 'bob');
+            INSERT INTO listen VALUES ('bob', 's1', NOW()), ('bob', 's1', NOW() - interval '1 day'),
+                                      ('ann', 's2', NOW());
+        """)
+    conn.commit()
+    return conn
+
+
+def test_build_then_existing_feed_leaves_lock_free(scratch_db):
+    connect = scratch_db("006_followed_song_counts.sql")
+    conn = _setup(connect)
+    other = connect()
+    with conn.cursor() as cur:
+        assert ensure_followed_feed(cur, "ann")
+        cur.execute("SELECT song_id, plays FROM followed_song_counts WHERE username = 'ann' ORDER BY song_id")
+        assert cur.fetchall() == [("s1", 2), ("s2", 1)]
+        # while the build's transaction is open, the lock is held
+        assert not _lock_free(other, "ann")
+    conn.commit()
+
+    # feed exists: no lock is taken, even though this transaction stays open
+    with conn.cursor() as cur:
+        assert not ensure_followed_feed(cur, "ann")
+        assert _lock_free(other, "ann")
+    conn.rollback()
@@ -0,0 +1,99 @@
+import math
+import threading
+import time
+
+from services.listens import record_listens
+
+MIGRATIONS = (
+    "004_top_50_chart.sql",
+    "005_genre_month_listens.sql",
+    "006_followed_song_counts.sql",
+    "008_user_minhash.sql",
+    "011_song_trend.sql",
+    "016_user_artist_listens.sql",
+    "018_user_minhash_pending.sql",
+    "019_song_trend_rebase.sql",
+)
+
+
+def _setup(connect, landmark_age: str):
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO "USER" (username, email) VALUES ('ann', 'ann@x'), ('bob', 'bob@x');
+            INSERT INTO song (song_id, title, length_ms) VALUES ('s1', 'One', 1000), ('s2', 'Two', 1000);
+        """)
+        cur.execute("UPDATE trend_epoch SET landmark = NOW() - %s::interval", (landmark_age,))
+    conn.commit()
+    return conn
+
+
+def _decayed(cur, song_id):
+    cur.execute(
+        """
+        SELECT t.score * trend_exp(-te.decay * EXTRACT(EPOCH FROM NOW() - te.landmark))
+        FROM song_trend t CROSS JOIN trend_epoch te
+        WHERE t.song_id = %s
+        """,
+        (song_id,),
+    )
+    return cur.fetchone()[0]
+
+
+def test_listens_still_record_with_a_very_old_landmark(scratch_db):
+    connect = scratch_db(*MIGRATIONS)
+    conn = _setup(connect, "300 days")
+    with conn.cursor() as cur:
+        # exp(decay * age) alone would overflow here
+        assert record_listens(cur, "ann", ["s1"]) == 1
+        assert _decayed(cur, "s1") > 0
+        cur.execute("SELECT checkpoint_song_trend()")
+        cur.execute("SELECT landmark > NOW() - interval '1 minute' FROM trend_epoch")
+        assert cur.fetchone()[0]
+        assert record_listens(cur, "bob", ["s2"]) == 1
+        assert math.isclose(_decayed(cur, "s1"), 1, rel_tol=1e-3)
+        assert math.isclose(_decayed(cur, "s2"), 1, rel_tol=1e-3)
+    conn.commit()
+
+
+def test_rebase_rescales_rows_committed_while_it_waited(scratch_db):
+    connect = scratch_db(*MIGRATIONS)
+    _setup(connect, "2 days")
+    listener = connect()
+    with listener.cursor() as cur:
+        # holds FOR SHARE on trend_epoch until commit; s2 has no song_trend row yet
+        record_listens(cur, "bob", ["s2"])
+
+    rebaser = connect()
+    errors = []
+
+    def checkpoint():
+        try:
+            with rebaser.cursor() as cur:
+                cur.execute("SELECT checkpoint_song_trend()")
+            rebaser.commit()
+        except Exception as e:  # surfaced below
+            errors.append(e)
+
+    worker = threading.Thread(target=checkpoint)
+    worker.start()
+    watcher = connect()
+    watcher.autocommit = True
+    with watcher.cursor() as cur:
+        for _ in range(100):
+            cur.execute(
+                "SELECT COUNT(*) FROM pg_stat_activity WHERE pid = %s AND wait_event_type = 'Lock'",
+                (rebaser.get_backend_pid(),),
+            )
+            if cur.fetchone()[0]:
+                break
+            time.sleep(0.05)
+        else:
+            raise AssertionError("checkpoint never waited for the listen's lock")
+    listener.commit()
+    worker.join(10)
+    assert not errors
+
+    with watcher.cursor() as cur:
+        # the listen happened just now: about one play, not 2^8 of them
+        assert math.isclose(_decayed(cur, "s2"), 1, rel_tol=0.01)
@@ -0,0 +1,54 @@
+from services.minhash import BANDS, NUM_PERM, band_buckets, signature, store_signature
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((" ".join(sql.split()), params))
+
+
+def _estimate(a, b):
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def test_signature_estimates_jaccard():
+    a = [f"s{i}" for i in range(0, 300)]
+    b = [f"s{i}" for i in range(100, 400)]  # Jaccard 200/400 = 0.5
+    est = _estimate(signature(a), signature(b))
+    assert abs(est - 0.5) < 0.15
+    assert _estimate(signature(a), signature([f"x{i}" for i in range(300)])) < 0.1
+
+
+def test_signature_folds_incrementally():
+    first, more = ["a", "b", "c"], ["c", "d"]
+    assert signature(more, base=signature(first)) == signature(first + more)
+    assert signature(["a", "a", "b"]) == signature(["b", "a"])
+
+
+def test_band_buckets_are_stable_per_band():
+    sig = signature(["a", "b", "c"])
+    keys = band_buckets(sig)
+    assert len(keys) == BANDS
+    assert keys == band_buckets(list(sig))
+    assert all(-(1 << 63) <= k < (1 << 63) for k in keys)
+
+    changed = list(sig)
+    changed[0] -= 1
+    other = band_buckets(changed)
+    assert other[0] != keys[0]
+    assert other[1:] == keys[1:]
+
+
+def test_store_signature_rewrites_only_changed_bands():
+    old = signature(["a", "b"])
+    cur = RecordingCursor()
+    store_signature(cur, "u", old, old=old)
+    assert cur.statements == []
+
+    new = list(old)
+    new[0] -= 1
+    store_signature(cur, "u", new, old=old)
+    delete = next(p for sql, p in cur.statements if sql.startswith("DELETE FROM user_lsh_bucket"))
+    assert delete == ("u", [0])
@@ -0,0 +1,91 @@
+from services.playback import play_collection, play_songs
+
+MIGRATIONS = (
+    "004_top_50_chart.sql",
+    "005_genre_month_listens.sql",
+    "006_followed_song_counts.sql",
+    "008_user_minhash.sql",
+    "011_song_trend.sql",
+    "014_playback_position.sql",
+    "016_user_artist_listens.sql",
+    "018_user_minhash_pending.sql",
+    "019_song_trend_rebase.sql",
+)
+
+
+class CountingCursor:
+    def __init__(self, cur):
+        self.cur = cur
+        self.statements = 0
+
+    def execute(self, *args):
+        self.statements += 1
+        return self.cur.execute(*args)
+
+    def fetchone(self):
+        return self.cur.fetchone()
+
+
+def _setup(connect):
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO "USER" (username, email) VALUES ('ann', 'ann@x');
+            INSERT INTO song (song_id, title, length_ms)
+            VALUES ('s1', 'A', 1000), ('s2', 'B', 2000), ('s3', 'C', 3000);
+            INSERT INTO collection (collection_id, creator_username, collection_name) VALUES ('c1', 'ann', 'Mix');
+            INSERT INTO song_within_collection VALUES ('c1', 's3'), ('c1', 's1'), ('c1', 's2');
+        """)
+    conn.commit()
+    return conn
+
+
+def _position(cur):
+    cur.execute("SELECT position FROM playback_position WHERE username = 'ann' AND queue_key = 'c1'")
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def test_play_collection_is_one_statement(scratch_db):
+    conn = _setup(scratch_db(*MIGRATIONS))
+    with conn.cursor() as cur:
+        counting = CountingCursor(cur)
+        assert play_collection(counting, "ann", "c1") == (["s1", "s2", "s3"], None, 3)
+        assert counting.statements == 1
+        cur.execute("SELECT song_id, listens FROM song_daily_listens ORDER BY song_id")
+        assert cur.fetchall() == [("s1", 1), ("s2", 1), ("s3", 1)]
+
+        # stopping after the first song leaves a resume point ...
+        counting = CountingCursor(cur)
+        assert play_songs(counting, "ann", ["s1"], queue_key="c1", next_position=1) == 1
+        assert counting.statements == 1
+        assert _position(cur) == 1
+    conn.commit()
+
+
+def test_play_collection_returns_resume_point_without_playing(scratch_db):
+    conn = _setup(scratch_db(*MIGRATIONS))
+    # each play commits, as the frames do (NOW() is fixed per transaction)
+    with conn.cursor() as cur:
+        play_songs(cur, "ann", ["s1"], queue_key="c1", next_position=1)
+    conn.commit()
+
+    with conn.cursor() as cur:
+        assert play_collection(cur, "ann", "c1") == ([], 1, 3)
+        cur.execute("SELECT COUNT(*) FROM listen")
+        assert cur.fetchone()[0] == 1
+        assert _position(cur) == 1
+    conn.rollback()
+
+    # resuming plays the rest and forgets the position
+    with conn.cursor() as cur:
+        assert play_collection(cur, "ann", "c1", start=1) == (["s2", "s3"], None, 3)
+        assert _position(cur) is None
+    conn.commit()
+
+    # a position at or past the end is ignored, and the queue played from the top
+    with conn.cursor() as cur:
+        cur.execute("INSERT INTO playback_position (username, queue_key, position) VALUES ('ann', 'c1', 5)")
+        assert play_collection(cur, "ann", "c1") == (["s1", "s2", "s3"], None, 3)
+        assert _position(cur) is None
+    conn.commit()
@@ -0,0 +1,36 @@
+import numpy as np
+import scipy.sparse as sp
+
+from jobs.recommend import item_neighbors
+
+# users x songs, 1 = listened. song0 is niche (2 listeners, both also on
+# song2); song1 shares a single listener with song0 but scores a higher cosine.
+PLAYS = sp.csr_matrix(np.array([
+    [1, 1, 1, 0],
+    [1, 0, 1, 0],
+    [0, 0, 1, 1],
+    [0, 0, 1, 1],
+    [0, 0, 1, 0],
+], dtype=np.float32))
+
+
+def neighbors_of(matrix, song):
+    row = matrix.getrow(song)
+    return sorted(zip(-row.data, row.indices))
+
+
+def test_item_neighbors_excludes_self_and_keeps_top_k():
+    nb = item_neighbors(PLAYS, k=1)
+    assert nb.shape == (4, 4)
+    assert nb.diagonal().sum() == 0
+    assert all(nb.getrow(i).nnz <= 1 for i in range(4))
+    assert neighbors_of(nb, 0)[0][1] == 1
+
+
+def test_min_co_applies_before_top_k():
+    nb = item_neighbors(PLAYS, k=1, min_co=2)
+    # song1 (one shared listener) is dropped first, so song2 survives the cut
+    assert [j for _s, j in neighbors_of(nb, 0)] == [2]
+    assert nb.getrow(1).nnz == 0
+    cos = 2 / np.sqrt(2 * 5)
+    assert np.isclose(nb[0, 2], cos)
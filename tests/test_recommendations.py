@@ -0,0 +1,42 @@
+from services.listens import record_listens
+from services.recommendations import live_recommendations, stored_recommendations
+
+MIGRATIONS = (
+    "004_top_50_chart.sql",
+    "005_genre_month_listens.sql",
+    "006_followed_song_counts.sql",
+    "007_user_recommendations.sql",
+    "008_user_minhash.sql",
+    "011_song_trend.sql",
+    "016_user_artist_listens.sql",
+    "018_user_minhash_pending.sql",
+    "019_song_trend_rebase.sql",
+)
+
+
+def test_stored_and_live_recommendations_count_listens_alike(scratch_db):
+    connect = scratch_db(*MIGRATIONS)
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("""
+            INSERT INTO "USER" (username, email)
+            VALUES ('ann', 'ann@x'), ('bob', 'bob@x'), ('cat', 'cat@x');
+            INSERT INTO song (song_id, title, length_ms)
+            VALUES ('s1', 'One', 1000), ('s2', 'Two', 1000), ('s3', 'Three', 1000), ('s4', 'Four', 1000);
+        """)
+        record_listens(cur, "ann", ["s1", "s2", "s3"])
+        record_listens(cur, "bob", ["s1", "s2", "s3", "s4"])
+        # repeat plays in one batch and across batches
+        record_listens(cur, "bob", ["s4", "s4"], spaced=True)
+        record_listens(cur, "cat", ["s4"])
+
+        live = live_recommendations(cur, "ann", None)
+        assert [r[0] for r in live] == ["s4"]
+
+        cur.execute("INSERT INTO user_recommendations (username, rank, song_id, score) VALUES ('ann', 1, 's4', 1)")
+        stored = stored_recommendations(cur, "ann")
+        assert [r[0] for r in stored] == ["s4"]
+
+        # column 7 is listen_count
+        assert stored[0][7] == live[0][7] == 4
+    conn.rollback()
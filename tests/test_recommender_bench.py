@@ -0,0 +1,40 @@
+import pytest
+
+from bench import recommender_bench
+from tests.conftest import TEST_DSN
+
+
+@pytest.fixture
+def tiny(monkeypatch):
+    monkeypatch.setitem(recommender_bench.SCALES, "tiny", {"users": 40, "songs": 200})
+    return "tiny"
+
+
+def test_python_baseline_runs_without_a_database(tiny):
+    out = recommender_bench.run_scale(tiny, seed=1, k=5, sample=10, python_baseline=True)
+    assert out["recommenders"]["overlap_scan"]["users_evaluated"] == 10
+    assert not any(name.startswith("sql_") for name in out["recommenders"])
+
+
+def test_sql_queries_are_timed_and_explained(tiny):
+    if not TEST_DSN:
+        pytest.skip("TEST_DATABASE_URL is not set")
+    import psycopg2
+
+    conn = psycopg2.connect(TEST_DSN)
+    try:
+        out = recommender_bench.run_scale(tiny, seed=1, k=5, sample=10, conn=conn,
+                                          explain_users=2, python_baseline=True)
+        with conn.cursor() as cur:
+            cur.execute("SELECT 1 FROM pg_namespace WHERE nspname = %s",
+                        (recommender_bench.SCRATCH_PREFIX + tiny,))
+            assert cur.fetchone() is None
+    finally:
+        conn.close()
+    recs = out["recommenders"]
+    for name in ("sql_live_scan", "sql_live_lsh", "sql_stored"):
+        assert recs[name]["explain"]["users"] == 2
+        assert recs[name]["explain"]["execution_ms"] >= 0
+        assert "Node Type" in recs[name]["explain"]["plan"]
+    # the SQL and its Python port recommend the same songs
+    assert recs["sql_live_scan"]["precision@5"] == recs["overlap_scan"]["precision@5"]
@@ -0,0 +1,65 @@
+import pytest
+
+from services.user_search import PAGE_SIZE, SEARCH_FIELDS, search_users
+
+
+class FakeCursor:
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.sql = None
+        self.params = None
+
+    def execute(self, sql, params=None):
+        self.sql, self.params = sql, params
+
+    def fetchall(self):
+        return self.rows
+
+
+def test_blank_term_skips_the_query():
+    cur = FakeCursor()
+    assert search_users(cur, "me", "   ") == ([], False)
+    assert cur.sql is None
+
+
+def test_unknown_field_is_rejected():
+    with pytest.raises(ValueError):
+        search_users(FakeCursor(), "me", "ann", field="phone")
+
+
+def test_like_wildcards_are_escaped():
+    cur = FakeCursor()
+    search_users(cur, "me", " 50%_Off ")
+    assert cur.params["term"] == "50%_off"
+    assert cur.params["prefix"] == "50\\%\\_off%"
+    assert cur.params["contains"] == "%50\\%\\_off%"
+    assert cur.params["limit"] == PAGE_SIZE + 1
+
+
+def test_short_terms_match_prefixes_only():
+    cur = FakeCursor()
+    search_users(cur, "me", "an", field="username")
+    assert "LOWER(u.username) LIKE %(prefix)s" in cur.sql
+    search_users(cur, "me", "ann", field="username")
+    assert "LOWER(u.username) LIKE %(contains)s" in cur.sql
+    assert "u.email" not in cur.sql
+
+
+def test_all_fields_rank_by_quality_then_field():
+    cur = FakeCursor()
+    search_users(cur, "me", "ann")
+    n = len(SEARCH_FIELDS)
+    # weights: username 2, display_name 1, email 0 (quality * n + weight)
+    assert f"username_q * {n} + 2" in cur.sql
+    assert f"display_name_q * {n} + 1" in cur.sql
+    assert f"email_q * {n} + 0" in cur.sql
+    assert "GREATEST(" in cur.sql
+
+
+def test_extra_row_reports_more():
+    rows = [(f"u{i}", "", 0, 0, False) for i in range(3)]
+    out, more = search_users(FakeCursor(rows), "me", "u", limit=2)
+    assert [r[0] for r in out] == ["u0", "u1"]
+    assert more
+    out, more = search_users(FakeCursor(rows[:2]), "me", "u", limit=2)
+    assert len(out) == 2 and not more
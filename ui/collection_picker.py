@@ -0,0 +1,87 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+from typing import List, Tuple
+
+from services.collections import add_songs_to_collections
+
+
+def _collection_choices(app) -> List[Tuple[str, str]]:
+    sql = """
+        SELECT collection_id, collection_name
+        FROM collection
+        WHERE creator_username = %s
+        ORDER BY collection_name
+    """
+    with app.cursor() as cur:
+        cur.execute(sql, (app.session.username,))
+        return cur.fetchall() or []
+
+
+class CollectionPickerDialog(tk.Toplevel):
+    """
+    Pick one or more of the user's collections and add `song_ids` to all of
+    them in one statement. Shared by the Songs and Recommendations frames.
+    """
+
+    def __init__(self, parent, app, song_ids: List[str], collections: List[Tuple[str, str]]):
+        super().__init__(parent)
+        self.app = app
+        self.song_ids = list(dict.fromkeys(song_ids))
+        self.collections = collections
+        self.title("Choose Collections")
+        self.transient(parent)
+        self.grab_set()
+
+        frame = ttk.Frame(self, padding="16 12")
+        frame.pack(fill="both", expand=True)
+
+        ttk.Label(
+            frame, text=f"Add {len(self.song_ids)} song(s) to (Ctrl/Shift-click for several):"
+        ).pack(pady=(0, 8))
+        self.listbox = tk.Listbox(frame, width=42, height=10, selectmode=tk.EXTENDED)
+        self.listbox.pack(pady=(0, 8))
+        for _cid, name in collections:
+            self.listbox.insert(tk.END, name)
+
+        ttk.Button(frame, text="OK", command=self.on_ok).pack(side="left", padx=(0, 8))
+        ttk.Button(frame, text="Cancel", command=self.destroy).pack(side="left")
+
+        self.update_idletasks()
+        x = parent.winfo_rootx() + (parent.winfo_width() - self.winfo_width()) // 2
+        y = parent.winfo_rooty() + (parent.winfo_height() - self.winfo_height()) // 2
+        self.geometry(f"+{x}+{y}")
+
+    def on_ok(self):
+        chosen = [self.collections[i] for i in self.listbox.curselection()]
+        if not chosen:
+            messagebox.showwarning("Select collection", "Please select at least one collection.", parent=self)
+            return
+        self.destroy()
+
+        try:
+            with self.app.cursor() as cur:
+                added = add_songs_to_collections(cur, [cid for cid, _ in chosen], self.song_ids)
+            self.app.conn.commit()
+        except Exception as e:
+            self.app.conn.rollback()
+            messagebox.showerror("Error", f"Could not add songs to collections:\n{e}")
+            return
+
+        lines = []
+        for cid, name in chosen:
+            n = added.get(str(cid), 0)
+            line = f"'{name}': added {n}"
+            if len(self.song_ids) - n:
+                line += f", skipped {len(self.song_ids) - n} duplicate(s)"
+            lines.append(line)
+        messagebox.showinfo("Done", "\n".join(lines))
+
+
+def add_to_collections(parent, app, song_ids: List[str]):
+    """Open the collection picker for `song_ids` and wait until it closes."""
+    collections = _collection_choices(app)
+    if not collections:
+        messagebox.showinfo("No collections", "You don't have any collections. Create one first.")
+        return
+    dialog = CollectionPickerDialog(parent, app, song_ids, collections)
+    dialog.wait_window(dialog)
@@ -1,10 +1,23 @@
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
-from typing import Optional, List, Tuple
-import secrets
-import string
+from tkinter import ttk, messagebox, simpledialog, filedialog
+from typing import Dict, List, Optional, Tuple
 
 from app import App
+from services.collection_io import export_collection, format_for, import_songs
+from services.collections import (
+    add_album,
+    add_songs,
+    create_collection,
+    create_collections,
+    remove_album,
+    remove_songs,
+)
+from services.listens import record_listens
+from services.playback import play_collection, play_songs
+from ui.similar import SimilarSongsDialog
+
+# songs fetched per "Load More" page in the collection contents view
+SONG_PAGE = 200
 
 
 class CollectionsFrame(ttk.Frame):
@@ -27,6 +40,7 @@ class CollectionsFrame(ttk.Frame):
         bar = ttk.Frame(self)
         bar.pack(fill="x", padx=10, pady=6)
         ttk.Button(bar, text="New", command=self.on_new).pack(side="left")
+        ttk.Button(bar, text="New Many", command=self.on_new_many).pack(side="left", padx=(6, 0))
         ttk.Button(bar, text="Rename", command=self.on_rename).pack(side="left", padx=(6, 0))
         ttk.Button(bar, text="Delete", command=self.on_delete).pack(side="left", padx=(6, 0))
         ttk.Separator(bar, orient="vertical").pack(side="left", fill="y", padx=8)
@@ -36,6 +50,9 @@ class CollectionsFrame(ttk.Frame):
         ttk.Button(bar, text="Remove Song", command=self.on_remove_song).pack(side="left", padx=(6, 0))
         ttk.Button(bar, text="Add Album", command=self.on_add_album).pack(side="left", padx=(10, 0))
         ttk.Button(bar, text="Remove Album", command=self.on_remove_album).pack(side="left", padx=(6, 0))
+        ttk.Separator(bar, orient="vertical").pack(side="left", fill="y", padx=8)
+        ttk.Button(bar, text="Import", command=self.on_import).pack(side="left")
+        ttk.Button(bar, text="Export", command=self.on_export).pack(side="left", padx=(6, 0))
         ttk.Button(bar, text="Refresh", command=self.refresh).pack(side="left", padx=(6, 0))
         ttk.Button(bar, text="Back", command=lambda: app.safe_show("Dashboard")).pack(side="right")
 
@@ -54,7 +71,8 @@ class CollectionsFrame(ttk.Frame):
             ("song_id", "Song ID", 120),
             ("title", "Title", 300),
             ("length", "Length", 80),
-            ("group_id", "Group ID", 120),
+            ("artist", "Artist", 180),
+            ("album", "Album", 180),
         ]
 
         # Songs tree
@@ -68,7 +86,7 @@ class CollectionsFrame(ttk.Frame):
                 anchor = "center"
             elif col_id in ("length",):
                 anchor = "e"
-            elif col_id in ("song_id", "group_id"):
+            elif col_id == "song_id":
                 anchor = "center"
             else:
                 anchor = "w"
@@ -81,6 +99,16 @@ class CollectionsFrame(ttk.Frame):
         songs_bar = ttk.Frame(songs_frame)
         songs_bar.pack(fill="x", padx=0, pady=(6, 8))
         ttk.Button(songs_bar, text="Play Selected", command=self.on_play_selected_songs).pack(side="left")
+        ttk.Button(songs_bar, text="Similar Songs", command=self.show_similar_songs).pack(side="left", padx=(6, 0))
+        self.more_btn = ttk.Button(songs_bar, text="Load More", command=self.on_load_more_songs, state="disabled")
+        self.more_btn.pack(side="right")
+
+        # Per-collection song pages: collection_id -> {"rows": [...], "done": bool}.
+        # Dropped by add/remove/delete on that collection and by Refresh.
+        self._songs_cache: Dict[str, Dict] = {}
+        self._shown_cid: Optional[str] = None
+        # song_id -> (artist, album) for songs the catalog snapshot doesn't cover
+        self._song_names: Dict[str, Tuple[str, str]] = {}
 
         # Status
         self.status = ttk.Label(self, text="")
@@ -124,18 +152,16 @@ class CollectionsFrame(ttk.Frame):
         """
         Return list of (collection_id, name, song_count, total_minutes)
         collection_id is a text id like '#ABC123'. Sorted by name ASC.
+        Counts come from the counters on collection (schema/012).
         """
         username = self.app.session.username
         sql = """
             SELECT c.collection_id,
                    c.collection_name,
-                   COALESCE(COUNT(cs.song_id), 0) AS song_count,
-                   COALESCE(SUM(s.length_ms) / 60000.0, 0) AS minutes
+                   c.song_count,
+                   c.total_length_ms / 60000.0 AS minutes
             FROM collection c
-            LEFT JOIN song_within_collection cs ON cs.collection_id = c.collection_id
-            LEFT JOIN song s ON s.song_id = cs.song_id
             WHERE c.creator_username = %s
-            GROUP BY c.collection_id, c.collection_name
             ORDER BY c.collection_name ASC
         """
         with self.app.cursor() as cur:
@@ -149,26 +175,32 @@ class CollectionsFrame(ttk.Frame):
                 continue
         return out
 
-    def _generate_collection_id(self) -> str:
-        """Generate a unique collection_id matching '^#[A-Za-z0-9]{1,19}$'."""
-        alphabet = string.ascii_letters + string.digits
-        for _ in range(20):
-            length = secrets.choice([8, 9, 10, 11, 12])
-            suffix = ''.join(secrets.choice(alphabet) for _ in range(length))
-            cid = f"#{suffix}"
-            with self.app.cursor() as cur:
-                cur.execute("SELECT 1 FROM collection WHERE collection_id = %s", (cid,))
-                if not cur.fetchone():
-                    return cid
-        raise RuntimeError("Failed to generate a unique collection_id")
+    def _refresh_selected_counts(self):
+        """Re-read the selected collection's counters and patch its row only."""
+        sel = self.tree.selection()
+        if not sel:
+            return
+        cid = (self.tree.item(sel[0], "tags") or [None])[0]
+        with self.app.cursor() as cur:
+            cur.execute(
+                "SELECT song_count, total_length_ms / 60000.0 FROM collection WHERE collection_id = %s",
+                (cid,),
+            )
+            row = cur.fetchone()
+        if row:
+            name = self.tree.item(sel[0], "values")[0]
+            self.tree.item(sel[0], values=(name, int(row[0]), f"{float(row[1]):.2f}"))
 
     def _create_collection(self, name: str):
-        cid = self._generate_collection_id()
-        sql = """
-            INSERT INTO collection (collection_id, creator_username, collection_name, creation_date)
-            VALUES (%s, %s, %s, NOW())
-        """
-        self.app.exec_and_commit(sql, (cid, self.app.session.username, name))
+        with self.app.cursor() as cur:
+            create_collection(cur, self.app.session.username, name)
+        self.app.conn.commit()
+
+    def _create_collections(self, names: List[str]) -> int:
+        with self.app.cursor() as cur:
+            created = create_collections(cur, self.app.session.username, names)
+        self.app.conn.commit()
+        return len(created)
 
     def _rename_collection(self, collection_id: str, new_name: str):
         sql = "UPDATE collection SET collection_name = %s WHERE collection_id = %s"
@@ -178,29 +210,35 @@ class CollectionsFrame(ttk.Frame):
         # delete children then parent for FK safety
         with self.app.cursor() as cur:
             cur.execute("DELETE FROM song_within_collection WHERE collection_id = %s", (collection_id,))
+            # resume points (schema/014) are keyed by collection_id without an FK
+            cur.execute("DELETE FROM playback_position WHERE queue_key = %s", (collection_id,))
             cur.execute("DELETE FROM collection WHERE collection_id = %s", (collection_id,))
         self.app.conn.commit()
 
-    def _play_collection(self, collection_id: str):
-        """Record a play event for each song in the collection for this user (uses date_of_view for consistency)."""
+    def _play_collection(self, collection_id: str, name: str) -> Optional[int]:
+        """
+        Play the collection back to back (listens spaced by song length),
+        offering to resume where the last playback of it stopped.
+        Returns the number of listens written, or None if the user cancelled.
+        """
         username = self.app.session.username
         with self.app.cursor() as cur:
-            cur.execute(
-                "SELECT cs.song_id FROM song_within_collection cs WHERE cs.collection_id = %s",
-                (collection_id,),
+            played, pos, length = play_collection(cur, username, collection_id)
+        if pos is not None:
+            # nothing was played; end the transaction (and the trend_epoch share
+            # lock the statement took) before waiting on the user
+            self.app.conn.rollback()
+            resume = messagebox.askyesnocancel(
+                "Resume", f"Resume '{name}' from song {pos + 1} of {length}?\n(No starts from the top.)"
             )
-            rows = cur.fetchall() or []
-        song_ids = [r[0] for r in rows]
-        if not song_ids:
-            return 0
-        with self.app.cursor() as cur:
-            for sid in song_ids:
-                cur.execute(
-                    "INSERT INTO listen (song_id, listener_username, date_of_view) VALUES (%s, %s, NOW())",
-                    (sid, username),
-                )
+            if resume is None:
+                return None
+            with self.app.cursor() as cur:
+                played, _, _ = play_collection(cur, username, collection_id, start=pos if resume else 0)
         self.app.conn.commit()
-        return len(song_ids)
+        if played:
+            self.app.on_listens_recorded(username, played)
+        return len(played)
 
     # ----- actions -----
     def refresh(self):
@@ -216,52 +254,156 @@ class CollectionsFrame(ttk.Frame):
             self.status.config(
                 text=f"{len(rows)} collections - {total_songs} songs - {total_minutes:.2f} minutes"
             )
-            # Clear songs view when refreshing collections
+            # Clear songs view (and its cached pages) when refreshing collections
+            self._songs_cache.clear()
+            self._shown_cid = None
             self.songs_tree.delete(*self.songs_tree.get_children())
+            self.more_btn.config(state="disabled")
         except Exception as e:
             messagebox.showerror("Collections Error", f"Could not load collections:\n{e}")
 
-    def _list_collection_songs(self, collection_id: str):
-        """Get all songs in a collection with details."""
-        sql = """
-            SELECT s.song_id, s.title, s.length_ms, s.group_id
-            FROM song s
-            JOIN song_within_collection sc ON sc.song_id = s.song_id
+    def _list_collection_songs(self, collection_id: str, after: Optional[Tuple[str, str]] = None,
+                               limit: int = SONG_PAGE):
+        """
+        One page of (song_id, title, length_ms) in a collection, ordered by
+        title then song_id. `after` is the (title, song_id) of the last row of
+        the previous page.
+        """
+        keyset = "AND (COALESCE(s.title, ''), s.song_id) > (%s, %s)" if after else ""
+        sql = f"""
+            SELECT s.song_id, s.title, s.length_ms
+            FROM song_within_collection sc
+            JOIN song s ON s.song_id = sc.song_id
             WHERE sc.collection_id = %s
-            ORDER BY s.title ASC
+              {keyset}
+            ORDER BY COALESCE(s.title, ''), s.song_id
+            LIMIT %s
         """
+        params = (collection_id,) + (tuple(after) if after else ()) + (limit,)
         with self.app.cursor() as cur:
-            cur.execute(sql, (collection_id,))
-            return cur.fetchall()
+            cur.execute(sql, params)
+            return cur.fetchall() or []
 
-    def _on_collection_select(self, event=None):
-        """When a collection is selected, show its songs."""
+    def _names_for(self, song_ids: List[str]) -> Dict[str, Tuple[str, str]]:
+        """
+        (artist, album) per song: from the local catalog snapshot when it has
+        the song, else from _song_names, fetching any misses in one query.
+        """
+        snap = self.app.catalog.snapshot
+        out: Dict[str, Tuple[str, str]] = {}
+        missing = []
+        for sid in song_ids:
+            i = snap.row_of.get(sid) if snap is not None else None
+            if i is not None:
+                out[sid] = (snap.artists[snap.artist_idx[i]], snap.albums[snap.album_idx[i]])
+            elif sid in self._song_names:
+                out[sid] = self._song_names[sid]
+            else:
+                missing.append(sid)
+        if missing:
+            with self.app.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT s.song_id,
+                           COALESCE(g.group_name, ''),
+                           COALESCE(string_agg(DISTINCT al.album_name, ', '), '')
+                    FROM song s
+                    LEFT JOIN "GROUP" g             ON g.group_id = s.group_id
+                    LEFT JOIN song_within_album swa ON swa.song_id = s.song_id
+                    LEFT JOIN album al              ON al.album_id = swa.album_id
+                    WHERE s.song_id = ANY(%s)
+                    GROUP BY s.song_id, g.group_name
+                    """,
+                    (missing,),
+                )
+                for sid, artist, album in cur.fetchall() or []:
+                    self._song_names[str(sid)] = out[str(sid)] = (artist, album)
+        return out
+
+    def _load_song_page(self, collection_id: str) -> List[Tuple]:
+        """Fetch the next page of a collection into _songs_cache; returns the new rows."""
+        entry = self._songs_cache.setdefault(collection_id, {"rows": [], "done": False})
+        if entry["done"]:
+            return []
+        after = None
+        if entry["rows"]:
+            last = entry["rows"][-1]
+            after = (last[1], last[0])
+        page = self._list_collection_songs(collection_id, after, SONG_PAGE + 1)
+        entry["done"] = len(page) <= SONG_PAGE
+        page = page[:SONG_PAGE]
+        names = self._names_for([str(r[0]) for r in page])
+        rows = []
+        for song_id, title, length_ms in page:
+            artist, album = names.get(str(song_id), ("", ""))
+            rows.append((str(song_id), title or "", length_ms, artist, album))
+        entry["rows"].extend(rows)
+        return rows
+
+    def _insert_song_rows(self, rows: List[Tuple]):
+        for song_id, title, length_ms, artist, album in rows:
+            # Format length as MM:SS
+            length = ""
+            if length_ms is not None:
+                total_sec = int(length_ms) // 1000
+                mins, secs = divmod(total_sec, 60)
+                length = f"{mins:02d}:{secs:02d}"
+            values = [
+                "▶ Play",                # _listen pseudo-button
+                song_id,
+                title,
+                length,
+                artist,
+                album,
+            ]
+            # store song_id in iid for easy retrieval
+            self.songs_tree.insert("", "end", iid=f"csong_{song_id}", values=values)
+
+    def _show_songs(self, collection_id: str):
+        """Render a collection's cached pages, loading the first page if needed."""
+        if collection_id not in self._songs_cache:
+            self._load_song_page(collection_id)
         self.songs_tree.delete(*self.songs_tree.get_children())
+        self._shown_cid = collection_id
+        entry = self._songs_cache[collection_id]
+        self._insert_song_rows(entry["rows"])
+        self.more_btn.config(state="disabled" if entry["done"] else "normal")
+
+    def _invalidate_songs(self, collection_id: str):
+        """Drop a collection's cached songs and re-show it if it is on screen."""
+        self._songs_cache.pop(collection_id, None)
+        if self._shown_cid == collection_id:
+            self._shown_cid = None
+            self._on_collection_select()
+
+    def _on_collection_select(self, event=None):
+        """When a collection is selected, show its songs (from cache when possible)."""
         sel = self._get_selected_collection()
         if not sel:
+            self.songs_tree.delete(*self.songs_tree.get_children())
+            self._shown_cid = None
+            self.more_btn.config(state="disabled")
             return
         cid, _name = sel
+        if cid == self._shown_cid:
+            return
         try:
-            songs = self._list_collection_songs(cid)
-            for song_id, title, length_ms, group_id in songs:
-                # Format length as MM:SS
-                length = ""
-                if length_ms is not None:
-                    total_sec = int(length_ms) // 1000
-                    mins, secs = divmod(total_sec, 60)
-                    length = f"{mins:02d}:{secs:02d}"
-                values = [
-                    "▶ Play",                # _listen pseudo-button
-                    song_id or "",
-                    title or "",
-                    length,
-                    group_id or "",
-                ]
-                # store song_id in iid for easy retrieval
-                self.songs_tree.insert("", "end", iid=f"csong_{song_id}", values=values)
+            self._show_songs(cid)
         except Exception as e:
+            self._songs_cache.pop(cid, None)
             messagebox.showerror("Error", f"Could not load songs for collection:\n{e}")
 
+    def on_load_more_songs(self):
+        cid = self._shown_cid
+        if cid is None:
+            return
+        try:
+            rows = self._load_song_page(cid)
+            self._insert_song_rows(rows)
+            self.more_btn.config(state="disabled" if self._songs_cache[cid]["done"] else "normal")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load more songs:\n{e}")
+
     # ----- per-song play support -----
     def _record_listen(self, song_id: str, song_title_for_popup: str = "Song"):
         """Insert a single listen row; consistent with SongsFrame schema (date_of_view)."""
@@ -270,11 +412,9 @@ class CollectionsFrame(ttk.Frame):
             return False
         try:
             with self.app.cursor() as cur:
-                cur.execute(
-                    "INSERT INTO listen (song_id, listener_username, date_of_view) VALUES (%s, %s, NOW())",
-                    (song_id, self.app.session.username),
-                )
+                record_listens(cur, self.app.session.username, [song_id])
             self.app.conn.commit()
+            self.app.on_listens_recorded(self.app.session.username, [song_id])
         except Exception as e:
             messagebox.showerror("Listen Error", f"Could not record listen:\n{e}")
             return False
@@ -308,25 +448,41 @@ class CollectionsFrame(ttk.Frame):
         if not iids:
             messagebox.showinfo("Select songs", "Please select one or more songs first.")
             return
-        played = 0
+        # play in list order; the list is the collection's play order, so the
+        # row after the last one played is where Play All can resume
+        iids = sorted(iids, key=self.songs_tree.index)
+        song_ids = []
+        for iid in iids:
+            vals = list(self.songs_tree.item(iid, "values") or [])
+            if len(vals) < 2:
+                continue
+            song_ids.append(vals[1])
+        cid = self._shown_cid
+        next_position = self.songs_tree.index(iids[-1]) + 1
+        entry = self._songs_cache.get(cid) if cid else None
+        if entry and entry["done"] and next_position >= len(entry["rows"]):
+            next_position = None
         try:
             with self.app.cursor() as cur:
-                for iid in iids:
-                    vals = list(self.songs_tree.item(iid, "values") or [])
-                    if len(vals) < 2:
-                        continue
-                    song_id = vals[1]
-                    cur.execute(
-                        "INSERT INTO listen (song_id, listener_username, date_of_view) VALUES (%s, %s, NOW())",
-                        (song_id, self.app.session.username),
-                    )
-                    played += 1
+                played = play_songs(cur, self.app.session.username, song_ids,
+                                    queue_key=cid, next_position=next_position)
             self.app.conn.commit()
+            self.app.on_listens_recorded(self.app.session.username, song_ids)
         except Exception as e:
             messagebox.showerror("Play Failed", f"Could not record plays:\n{e}")
             return
         messagebox.showinfo("Played", f"Recorded {played} play(s).")
 
+    def show_similar_songs(self):
+        iids = self.songs_tree.selection()
+        if not iids:
+            messagebox.showinfo("Select a song", "Please select a song first.")
+            return
+        vals = list(self.songs_tree.item(iids[0], "values") or [])
+        if len(vals) < 3:
+            return
+        SimilarSongsDialog(self, self.app, vals[1], vals[2])
+
     # ----- collection CRUD -----
     def on_new(self):
         name = simpledialog.askstring("New Collection", "Enter collection name:", parent=self)
@@ -338,6 +494,42 @@ class CollectionsFrame(ttk.Frame):
         except Exception as e:
             messagebox.showerror("Create Failed", f"Could not create collection:\n{e}")
 
+    def on_new_many(self):
+        """Create several collections at once, one name per line."""
+        dialog = tk.Toplevel(self)
+        dialog.title("New Collections")
+        dialog.transient(self)
+        dialog.grab_set()
+
+        frame = ttk.Frame(dialog, padding="16 12")
+        frame.pack(fill="both", expand=True)
+        ttk.Label(frame, text="One collection name per line:").pack(anchor="w", pady=(0, 8))
+        text = tk.Text(frame, width=42, height=10)
+        text.pack(pady=(0, 8))
+        text.focus_set()
+
+        def on_ok():
+            names = [n.strip() for n in text.get("1.0", tk.END).splitlines() if n.strip()]
+            if not names:
+                messagebox.showwarning("No names", "Enter at least one name.", parent=dialog)
+                return
+            dialog.destroy()
+            try:
+                created = self._create_collections(names)
+                self.refresh()
+                messagebox.showinfo("Created", f"Created {created} collection(s).")
+            except Exception as e:
+                messagebox.showerror("Create Failed", f"Could not create collections:\n{e}")
+
+        ttk.Button(frame, text="Create", command=on_ok).pack(side="left", padx=(0, 8))
+        ttk.Button(frame, text="Cancel", command=dialog.destroy).pack(side="left")
+
+        dialog.update_idletasks()
+        x = self.winfo_rootx() + (self.winfo_width() - dialog.winfo_width()) // 2
+        y = self.winfo_rooty() + (self.winfo_height() - dialog.winfo_height()) // 2
+        dialog.geometry(f"+{x}+{y}")
+        dialog.wait_window(dialog)
+
     def on_rename(self):
         sel = self._get_selected_collection()
         if not sel:
@@ -363,6 +555,7 @@ class CollectionsFrame(ttk.Frame):
             return
         try:
             self._delete_collection(cid)
+            self._songs_cache.pop(cid, None)
             self.refresh()
         except Exception as e:
             messagebox.showerror("Delete Failed", f"Could not delete collection:\n{e}")
@@ -374,7 +567,9 @@ class CollectionsFrame(ttk.Frame):
             return
         cid, name = sel
         try:
-            count = self._play_collection(cid)
+            count = self._play_collection(cid, name)
+            if count is None:
+                return
             if count:
                 messagebox.showinfo("Played", f"Recorded {count} play(s) for '{name}'.")
             else:
@@ -399,18 +594,11 @@ class CollectionsFrame(ttk.Frame):
             return
         try:
             with self.app.cursor() as cur:
-                cur.execute(
-                    """
-                    INSERT INTO song_within_collection (collection_id, song_id)
-                    VALUES (%s, %s)
-                    ON CONFLICT (collection_id, song_id) DO NOTHING
-                    """,
-                    (cid, sid),
-                )
-                added = cur.rowcount
+                added = add_songs(cur, cid, [sid])
             self.app.conn.commit()
             if added:
-                self._on_collection_select()  # refresh songs list for selected collection
+                self._refresh_selected_counts()
+                self._invalidate_songs(cid)
             else:
                 messagebox.showinfo("No change", "That song is already in this collection.")
         except Exception as e:
@@ -432,12 +620,10 @@ class CollectionsFrame(ttk.Frame):
             return
         try:
             with self.app.cursor() as cur:
-                cur.execute(
-                    "DELETE FROM song_within_collection WHERE collection_id = %s AND song_id = %s",
-                    (cid, sid),
-                )
+                remove_songs(cur, cid, [sid])
             self.app.conn.commit()
-            self._on_collection_select()  # refresh songs list
+            self._refresh_selected_counts()
+            self._invalidate_songs(cid)
         except Exception as e:
             messagebox.showerror("Remove Song Failed", f"Could not remove song:\n{e}")
 
@@ -460,42 +646,21 @@ class CollectionsFrame(ttk.Frame):
                     messagebox.showwarning("Not found", f"Album '{aid}' does not exist.")
                     return
 
-                # Pull songs from song_within_album
-                cur.execute(
-                    """
-                    SELECT swa.song_id
-                    FROM song_within_album AS swa
-                    WHERE swa.album_id = %s
-                    ORDER BY swa.track_number NULLS LAST, swa.song_id
-                    """,
-                    (aid,),
-                )
-                rows = cur.fetchall() or []
-
-                added = 0
-                for (sid,) in rows:
-                    cur.execute(
-                        """
-                        INSERT INTO song_within_collection (collection_id, song_id)
-                        VALUES (%s, %s)
-                        ON CONFLICT (collection_id, song_id) DO NOTHING
-                        """,
-                        (cid, sid),
-                    )
-                    added += (cur.rowcount or 0)
+                added, tracks = add_album(cur, cid, aid)
 
             self.app.conn.commit()
 
-            if not rows:
+            if not tracks:
                 messagebox.showinfo("Add Album", "That album has no tracks.")
             else:
-                skipped = len(rows) - added
+                skipped = tracks - added
                 msg = f"Added {added} song(s) from the album."
                 if skipped:
                     msg += f"  Skipped {skipped} duplicate(s)."
                 messagebox.showinfo("Add Album", msg)
 
-            self._on_collection_select()
+            self._refresh_selected_counts()
+            self._invalidate_songs(cid)
 
         except Exception as e:
             messagebox.showerror("Add Album Failed", f"Could not add album songs:\n{e}")
@@ -513,23 +678,68 @@ class CollectionsFrame(ttk.Frame):
 
         try:
             with self.app.cursor() as cur:
-                cur.execute(
-                    """
-                    DELETE FROM song_within_collection swc
-                    WHERE swc.collection_id = %s
-                    AND swc.song_id IN (
-                        SELECT swa.song_id
-                        FROM song_within_album AS swa
-                        WHERE swa.album_id = %s
-                    )
-                    """,
-                    (cid, aid),
-                )
-                removed = cur.rowcount or 0
+                removed = remove_album(cur, cid, aid)
 
             self.app.conn.commit()
             messagebox.showinfo("Remove Album", f"Removed {removed} song(s) from the collection.")
-            self._on_collection_select()
+            self._refresh_selected_counts()
+            self._invalidate_songs(cid)
 
         except Exception as e:
             messagebox.showerror("Remove Album Failed", f"Could not remove album songs:\n{e}")
+
+    # ----- import / export -----
+    FILE_TYPES = [("CSV", "*.csv"), ("JSON Lines", "*.jsonl"), ("All files", "*.*")]
+
+    def on_import(self):
+        sel = self._get_selected_collection()
+        if not sel:
+            messagebox.showinfo("Select a collection", "Please select a collection to import into.")
+            return
+        cid, name = sel
+        path = filedialog.askopenfilename(parent=self, title=f"Import songs into '{name}'",
+                                          filetypes=self.FILE_TYPES)
+        if not path:
+            return
+        try:
+            fmt = format_for(path)
+            with open(path, newline="", encoding="utf-8-sig") as fp, self.app.cursor() as cur:
+                added, skipped, unknown = import_songs(cur, cid, fp, fmt)
+            self.app.conn.commit()
+        except Exception as e:
+            self.app.conn.rollback()
+            messagebox.showerror("Import Failed", f"Could not import songs:\n{e}")
+            return
+        msg = f"Added {added} song(s) to '{name}'."
+        if skipped:
+            msg += f"  Skipped {skipped} already in the collection."
+        if unknown:
+            shown = ", ".join(unknown[:10]) + (" ..." if len(unknown) > 10 else "")
+            msg += f"\n\n{len(unknown)} unknown song id(s) ignored: {shown}"
+        messagebox.showinfo("Import", msg)
+        if added:
+            self._refresh_selected_counts()
+            self._invalidate_songs(cid)
+
+    def on_export(self):
+        sel = self._get_selected_collection()
+        if not sel:
+            messagebox.showinfo("Select a collection", "Please select a collection to export.")
+            return
+        cid, name = sel
+        path = filedialog.asksaveasfilename(parent=self, title=f"Export '{name}'",
+                                            defaultextension=".csv", initialfile=f"{name}.csv",
+                                            filetypes=self.FILE_TYPES)
+        if not path:
+            return
+        try:
+            fmt = format_for(path)
+            with open(path, "w", newline="", encoding="utf-8") as fp, \
+                    self.app.cursor(name="collection_export") as cur:
+                written = export_collection(cur, cid, fp, fmt)
+            self.app.conn.commit()
+        except Exception as e:
+            self.app.conn.rollback()
+            messagebox.showerror("Export Failed", f"Could not export collection:\n{e}")
+            return
+        messagebox.showinfo("Export", f"Wrote {written} song(s) to {path}.")
@@ -1,13 +1,24 @@
 import tkinter as tk
 from tkinter import ttk, messagebox
+from services.follows import follow, unfollow
+from services.user_search import search_users
+from services.user_stats import fetch_user_stats
 
 class FollowFrame(ttk.Frame):
     """ View, follow, and unfollow other users. """
     COLS = [
         ("followed_user_id", "User", 200),
+        ("display_name", "Name", 200),
         ("followers", "Followers", 100),
         ("following", "Following", 100),
     ]
+    # (combobox label, services.user_search field)
+    SEARCH_MODES = [
+        ("All fields", "all"),
+        ("Username", "username"),
+        ("Display name", "display_name"),
+        ("Email", "email"),
+    ]
 
     def __init__(self, parent, app):
         super().__init__(parent)
@@ -31,6 +42,11 @@ class FollowFrame(ttk.Frame):
         
         # Search widgets
         ttk.Label(bar, text="Search:").pack(side="left", padx=(0,6))
+        self.search_field_var = tk.StringVar(value=self.SEARCH_MODES[0][0])
+        ttk.Combobox(
+            bar, textvariable=self.search_field_var, state="readonly", width=12,
+            values=[label for label, _ in self.SEARCH_MODES],
+        ).pack(side="left", padx=(0, 6))
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(bar, textvariable=self.search_var, width=32)
         self.search_entry.pack(side="left")
@@ -52,6 +68,25 @@ class FollowFrame(ttk.Frame):
 
         self.tree.bind("<Double-1>", self._on_double_click)
 
+        # ---- Suggested users (friend-of-friend, from the in-memory follow graph)
+        suggest_box = ttk.LabelFrame(self, text="Suggested Users")
+        suggest_box.pack(fill="both", expand=False, padx=10, pady=(0, 6))
+        self.suggest_tree = ttk.Treeview(suggest_box, show="headings", height=6, selectmode="browse")
+        self.suggest_tree["columns"] = ["user", "why"]
+        self.suggest_tree.heading("user", text="User")
+        self.suggest_tree.heading("why", text="Why")
+        self.suggest_tree.column("user", width=200, anchor="w", stretch=False)
+        self.suggest_tree.column("why", width=420, anchor="w", stretch=True)
+        self.suggest_tree.pack(fill="both", expand=True, padx=4, pady=(4, 0))
+        self.suggest_tree.bind("<Double-1>", self._on_suggestion_double_click)
+        suggest_bar = ttk.Frame(suggest_box)
+        suggest_bar.pack(fill="x", padx=4, pady=4)
+        ttk.Button(suggest_bar, text="Follow Suggested", command=self.on_follow_suggested).pack(side="left")
+        self.suggest_status = ttk.Label(suggest_bar, text="")
+        self.suggest_status.pack(side="left", padx=(10, 0))
+        self._suggest_after = None
+        self._suggest_loading = False
+
         self.status = ttk.Label(self, text="")
         self.status.pack(fill="x", padx=10, pady=5)
 
@@ -71,67 +106,25 @@ class FollowFrame(ttk.Frame):
         if not username:
             messagebox.showinfo("Select User", "Enter or select a user to view stats.")
             return
-        if not self._user_exists(username):
-            messagebox.showinfo("Not Found", f"User '{username}' does not exist.")
-            return
         try:
             data = self._fetch_user_stats(username)
+            if data is None:
+                messagebox.showinfo("Not Found", f"User '{username}' does not exist.")
+                return
             self._open_stats_modal(username, data)
         except Exception as e:
             messagebox.showerror("Stats Error", f"Could not load stats for '{username}':\n{e}")
 
     def _fetch_user_stats(self, username: str):
-        sql_counts = {
-            "collections": (
-                "SELECT COUNT(*) FROM collection WHERE creator_username = %s",
-                (username,),
-            ),
-            "followers": (
-                "SELECT COUNT(*) FROM user_follow WHERE followed_user_id = %s",
-                (username,),
-            ),
-            "following": (
-                "SELECT COUNT(*) FROM user_follow WHERE follower_user_id = %s",
-                (username,),
-            ),
-        }
-
-        out = {"collections": 0, "followers": 0, "following": 0, "top_artists": []}
+        """Stats for the modal, from the short-lived per-user cache when fresh; None if no such user."""
+        cached = self.app.stats_cache.get(username)
+        if cached is not None and cached[1]:
+            return cached[0]
         with self.app.cursor() as cur:
-            for key, (q, params) in sql_counts.items():
-                cur.execute(q, params)
-                (cnt,) = cur.fetchone()
-                out[key] = int(cnt or 0)
-
-            cur.execute(
-                """
-                SELECT artist_label, listens
-                FROM (
-                    SELECT
-                        CASE
-                            WHEN g.group_id IS NOT NULL THEN g.group_id::text
-                            ELSE 'song:' || s.song_id::text
-                        END AS artist_key,
-                        CASE
-                            WHEN g.group_id IS NOT NULL AND g.group_name IS NOT NULL THEN g.group_name
-                            WHEN g.group_id IS NOT NULL AND g.group_name IS NULL THEN 'Unknown (group ' || g.group_id::text || ')'
-                            ELSE 'Unknown Artist: ' || COALESCE(s.title, s.song_id::text)
-                        END AS artist_label,
-                        COUNT(*) AS listens
-                    FROM listen li
-                    JOIN song s ON s.song_id = li.song_id
-                    LEFT JOIN "GROUP" g ON g.group_id = s.group_id
-                    WHERE li.listener_username = %s
-                    GROUP BY artist_key, artist_label
-                ) t
-                ORDER BY listens DESC, LOWER(artist_label) ASC
-                LIMIT 10
-                """,
-                (username,),
-            )
-            out["top_artists"] = cur.fetchall() or []
-
-        return out
+            data = fetch_user_stats(cur, username)
+        if data is not None:
+            self.app.stats_cache.put(username, data)
+        return data
 
     def _open_stats_modal(self, username: str, data):
         win = tk.Toplevel(self)
@@ -167,69 +160,62 @@ class FollowFrame(ttk.Frame):
         ttk.Button(btns, text="Close", command=win.destroy).pack(side="right")
 
     # ---- Data Loading ----
-    def _list_following(self, email_filter=None):
+    def _list_following(self, term=None):
+        """
+        Rows of (username, display_name, followers, following, is_followed):
+        the users I follow, or the best user search matches for `term`.
+        Returns (rows, whether more search matches exist).
+        """
         me = self.app.session.username
+        with self.app.cursor() as cur:
+            if term:
+                field = dict(self.SEARCH_MODES).get(self.search_field_var.get(), "all")
+                return search_users(cur, me, term, field)
 
-        if not email_filter:
-            sql = """
+            # counts come from user_follow_stats (schema/015)
+            cur.execute(
+                """
                 SELECT
                     uf.followed_user_id AS username,
-                    COUNT(DISTINCT f2.follower_user_id) AS followers,
-                    COUNT(DISTINCT f3.followed_user_id) AS following,
+                    COALESCE(u.display_name, '') AS display_name,
+                    COALESCE(st.follower_count, 0) AS followers,
+                    COALESCE(st.following_count, 0) AS following,
                     TRUE AS is_followed
                 FROM user_follow uf
-                LEFT JOIN user_follow f2 ON f2.followed_user_id = uf.followed_user_id
-                LEFT JOIN user_follow f3 ON f3.follower_user_id = uf.followed_user_id
+                JOIN "USER" u ON u.username = uf.followed_user_id
+                LEFT JOIN user_follow_stats st ON st.username = uf.followed_user_id
                 WHERE uf.follower_user_id = %s
-                GROUP BY uf.followed_user_id
                 ORDER BY uf.followed_user_id ASC;
-            """
-            params = [me]
-
-        # if searching by email
-        else:
-            sql = """
-                SELECT
-                    u.username,
-                    COUNT(DISTINCT f2.follower_user_id) AS followers,
-                    COUNT(DISTINCT f3.followed_user_id) AS following,
-                    CASE WHEN uf.follower_user_id IS NOT NULL THEN TRUE ELSE FALSE END AS is_followed
-                FROM "USER" u
-                LEFT JOIN user_follow uf
-                    ON uf.followed_user_id = u.username
-                    AND uf.follower_user_id = %s
-                LEFT JOIN user_follow f2 ON f2.followed_user_id = u.username
-                LEFT JOIN user_follow f3 ON f3.follower_user_id = u.username
-                WHERE u.email ILIKE %s
-                GROUP BY u.username, uf.follower_user_id
-                ORDER BY u.username ASC;
-            """
-            params = [me, f"%{email_filter}%"]
-
-        with self.app.cursor() as cur:
-            cur.execute(sql, params)
-            return cur.fetchall()
-
+                """,
+                (me,),
+            )
+            return cur.fetchall(), False
 
     def refresh(self):
         try:
             term = self.search_var.get().strip()
-            rows = self._list_following(term if term else None)
+            rows, more = self._list_following(term if term else None)
 
             self.tree.delete(*self.tree.get_children())
-            for username, followers, following, _ in rows:
-                self.tree.insert("", "end", values=(username, followers, following))
+            for username, display_name, followers, following, _ in rows:
+                self.tree.insert("", "end", values=(username, display_name, followers, following))
 
             if not term:
                 self.status.config(text=f"Following {len(rows)} user(s).")
                 self.tree_label.config(text="You are following:")
             else:
-                self.status.config(text=f"Search result: {len(rows)} user(s) found.")
+                if more:
+                    self.status.config(text=f"Search result: best {len(rows)} matches shown; refine the search for more.")
+                else:
+                    self.status.config(text=f"Search result: {len(rows)} user(s) found.")
                 self.tree_label.config(text="Search results:")
 
         except Exception as e:
             messagebox.showerror("Load Error", f"Could not load following list:\n{e}")
 
+        if self._suggest_after is None:
+            self._show_suggestions()
+
     # ---- UI Helpers ----
     def on_show(self):
         if not self.app.session.username:
@@ -242,7 +228,7 @@ class FollowFrame(ttk.Frame):
         self.tree["columns"] = [c[0] for c in self.COLS]
         for col_id, header, width in self.COLS:
             self.tree.heading(col_id, text=header)
-            anchor = "w" if col_id == "name" else "center"
+            anchor = "w" if col_id == "display_name" else "center"
             self.tree.column(col_id, width=width, anchor=anchor, stretch=False)
 
 
@@ -265,6 +251,56 @@ class FollowFrame(ttk.Frame):
         usernmae = values[0]
         self.target_var.set(usernmae)
 
+    # ---- Suggestions
+    SUGGEST_POLL_MS = 250
+
+    def _show_suggestions(self):
+        """Fill Suggested Users from the follow graph, waiting for its first load."""
+        self._suggest_after = None
+        me = self.app.session.username
+        if not me or not self.winfo_ismapped():
+            return
+        index = self.app.follow_graph
+        graph = index.graph
+        if graph is None:
+            if not index.loading:
+                if self._suggest_loading:
+                    # the load we started finished without a graph
+                    self._suggest_loading = False
+                    self.suggest_status.config(text="Suggestions unavailable (could not load follow graph).")
+                    return
+                index.start()
+                self._suggest_loading = True
+            self.suggest_status.config(text="Loading follow graph…")
+            self._suggest_after = self.after(self.SUGGEST_POLL_MS, self._show_suggestions)
+            return
+        self._suggest_loading = False
+        self.suggest_tree.delete(*self.suggest_tree.get_children())
+        rows = graph.suggestions(me)
+        for username, _score, via, common in rows:
+            why = []
+            if via:
+                why.append(f"followed by {via} you follow")
+            if common:
+                why.append(f"follows {common} of the same people as you")
+            self.suggest_tree.insert("", "end", values=(username, "; ".join(why)))
+        self.suggest_status.config(
+            text=f"{len(rows)} suggestion(s)." if rows else "No suggestions yet - follow a few people first."
+        )
+
+    def _on_suggestion_double_click(self, event):
+        selected = self.suggest_tree.selection()
+        if selected:
+            self.target_var.set(self.suggest_tree.item(selected[0], "values")[0])
+
+    def on_follow_suggested(self):
+        selected = self.suggest_tree.selection()
+        if not selected:
+            messagebox.showinfo("Select User", "Select a suggested user first.")
+            return
+        self.target_var.set(self.suggest_tree.item(selected[0], "values")[0])
+        self.on_follow()
+
     # ---- Search
 
     def apply_search(self):
@@ -290,16 +326,11 @@ class FollowFrame(ttk.Frame):
             messagebox.showinfo("Not Found", f"User '{target}' does not exist.")
             return
 
-        sql = """
-            INSERT INTO user_follow (follower_user_id, followed_user_id)
-            VALUES (%s, %s)
-            ON CONFLICT (follower_user_id, followed_user_id) DO NOTHING
-        """
         try:
             with self.app.cursor() as cur:
-                cur.execute(sql, (me, target))
-                added = cur.rowcount
+                added = follow(cur, me, target)
             self.app.conn.commit()
+            self.app.on_follows_changed(me, target, True)
 
             if added:
                 self.status.config(text=f"Now following {target}.")
@@ -318,12 +349,11 @@ class FollowFrame(ttk.Frame):
             messagebox.showinfo("Missing", "Enter a username to unfollow.")
             return
 
-        sql = "DELETE FROM user_follow WHERE follower_user_id = %s AND followed_user_id = %s"
         try:
             with self.app.cursor() as cur:
-                cur.execute(sql, (me, target))
-                removed = cur.rowcount
+                removed = unfollow(cur, me, target)
             self.app.conn.commit()
+            self.app.on_follows_changed(me, target, False)
 
             if removed:
                 self.status.config(text=f"Unfollowed {target}.")
@@ -1,7 +1,17 @@
+import queue
+import threading
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 from tkinter import ttk, messagebox
-from typing import List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 from app import App
+from db_connection import pooled_connection
+from services.content_recs import blend, user_preferences
+from services.follows import ensure_followed_feed
+from services.listens import fetch_listen_counts, record_listens
+from services.recommendations import recommended_songs
+from ui.collection_picker import add_to_collections
+from ui.similar import SimilarSongsDialog
 
 
 class RecommendationsFrame(ttk.Frame):
@@ -10,13 +20,16 @@ class RecommendationsFrame(ttk.Frame):
 
     Provides:
     – Top 50 most popular songs in the last 30 days (rolling)
+    – Trending songs (time-decayed listens)
     – Top 50 most popular songs among users followed by the current user
     – Top 5 most popular genres of the month (calendar month)
+    – Month-over-month genre listens for the last 12 months
     – Song recommendations based on:
         * your play history (e.g. genre, artist)
         * play history of similar users
 
-    All popularity / recommendation logic is driven from the `listen` table.
+    All popularity / recommendation logic is driven from the `listen` table
+    or rollups of it (see schema/ and services.listens).
     """
 
     # Table aliases (same style as SongsFrame)
@@ -46,20 +59,50 @@ class RecommendationsFrame(ttk.Frame):
         ("listens", "Listens", 120),
     ]
 
+    # Genre-trend columns
+    COLS_GENRE_TREND = [
+        ("month", "Month", 100),
+        ("genre", "Genre", 260),
+        ("listens", "Listens", 120),
+        ("change", "vs Prev Month", 120),
+    ]
+
     # visible value index helpers for song-style rows
     IDX_SONG = 1
     IDX_LISTENS = 6
 
     # modes
     MODE_TOP_30 = "top_50_30_days"
+    MODE_TRENDING = "trending_now"
     MODE_FOLLOWED = "top_50_followed"
     MODE_GENRES = "top_5_genres"
+    MODE_GENRE_TRENDS = "genre_trends"
     MODE_RECS = "personal_recs"
 
+    # modes whose rows are genres, not songs
+    GENRE_MODES = (MODE_GENRES, MODE_GENRE_TRENDS)
+
+    # chart names in chart_refresh
+    CHART_TOP_30 = "top_50_30_days"
+
+    # modes that need a logged-in user, and what to tell a guest
+    LOGIN_MODES = (MODE_FOLLOWED, MODE_RECS)
+    LOGIN_MESSAGES = {
+        MODE_FOLLOWED: "Please log in to see what people you follow are listening to.",
+        MODE_RECS: "Please log in to see your recommendations.",
+    }
+
+    # how often (ms) Tk checks on background loads
+    POLL_MS = 100
+    # threads used to prefetch modes (keep below db_connection.POOL_MAXCONN)
+    PREFETCH_WORKERS = 4
+
     MODE_LABELS = [
         ("Top 50 – Last 30 Days", MODE_TOP_30),
+        ("Trending Now", MODE_TRENDING),
         ("Top 50 – Followed Users", MODE_FOLLOWED),
         ("Top 5 Genres – This Month", MODE_GENRES),
+        ("Genre Trends – Last 12 Months", MODE_GENRE_TRENDS),
         ("Recommended For You", MODE_RECS),
     ]
 
@@ -69,6 +112,16 @@ class RecommendationsFrame(ttk.Frame):
 
         self.current_mode = self.MODE_TOP_30
         self.current_cols = self.COLS_SONG
+        self._recs_inflight: Set[str] = set()
+
+        # per-mode results: mode -> (username, data), filled by _prefetch_modes
+        self._mode_cache: Dict[str, tuple] = {}
+        self._mode_pending: Set[str] = set()
+        self._mode_queue: "queue.Queue[tuple]" = queue.Queue()
+        self._generation = 0
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.PREFETCH_WORKERS, thread_name_prefix="recs-prefetch"
+        )
 
         # ---------- Header ----------
         ttk.Label(self, text="Recommendations", font=("Arial", 16, "bold")).pack(
@@ -113,6 +166,11 @@ class RecommendationsFrame(ttk.Frame):
             text="Add to Collection",
             command=self.add_selected_to_collection,
         ).pack(side="left", padx=(8, 0))
+        ttk.Button(
+            actions,
+            text="Similar Songs",
+            command=self.show_similar_songs,
+        ).pack(side="left", padx=(8, 0))
 
         # ---------- Tree ----------
         self.tree = ttk.Treeview(
@@ -136,7 +194,7 @@ class RecommendationsFrame(ttk.Frame):
         for col_id, header, width in cols:
             if col_id == "_listen":
                 anchor = "center"
-            elif col_id in ("length", "listen_count", "listens"):
+            elif col_id in ("length", "listen_count", "listens", "change"):
                 anchor = "e"
             else:
                 anchor = "w"
@@ -151,17 +209,19 @@ class RecommendationsFrame(ttk.Frame):
         # Switch columns depending on mode
         if self.current_mode == self.MODE_GENRES:
             self._setup_columns(self.COLS_GENRE)
+        elif self.current_mode == self.MODE_GENRE_TRENDS:
+            self._setup_columns(self.COLS_GENRE_TREND)
         else:
             self._setup_columns(self.COLS_SONG)
 
-        self.refresh()
+        self._show_mode()
 
     def _on_tree_click(self, event):
         """
         If they clicked the "Listen" column for a row in a song-based mode,
         record one listen and update that row.
         """
-        if self.current_mode == self.MODE_GENRES:
+        if self.current_mode in self.GENRE_MODES:
             return  # no listening for genre summary
 
         region = self.tree.identify("region", event.x, event.y)
@@ -187,7 +247,77 @@ class RecommendationsFrame(ttk.Frame):
             return ""
 
     # ================= SQL Queries =================
-    def _query_top_50_last_30_days(self):
+    def _query_top_50_last_30_days(self, cur):
+        """
+        Top 50 most popular songs in the last 30 days, read from the
+        chart_top_50_30d table that jobs/refresh_charts rebuilds every minute
+        from per-song daily counters (schema/004).
+
+        Returns (rows, refreshed_at). If the chart was never built, falls back
+        to the live aggregate and refreshed_at is None.
+        """
+        sql = """
+            SELECT
+                c.song_id,
+                c.song,
+                c.artist,
+                c.album,
+                c.length_ms,
+                c.listen_count,
+                c.release_date,
+                c.release_year,
+                r.refreshed_at
+            FROM chart_refresh r
+            LEFT JOIN chart_top_50_30d c ON TRUE
+            WHERE r.chart = %s
+            ORDER BY c.rank
+        """
+        cur.execute(sql, (self.CHART_TOP_30,))
+        rows = cur.fetchall()
+        if not rows:
+            return self._query_top_50_last_30_days_live(cur), None
+        refreshed_at = rows[0][-1]
+        return [r[:-1] for r in rows if r[0] is not None], refreshed_at
+
+    def _query_trending_now(self, cur):
+        """
+        Top 50 songs by time-decayed plays (half-life 6 hours), read from the
+        song_trend index (schema/011). listen_count is the decayed play count.
+        """
+        sql = """
+            WITH top AS (
+                SELECT song_id, score
+                FROM song_trend
+                ORDER BY score DESC
+                LIMIT 50
+            )
+            SELECT
+                s.song_id,
+                s.title AS song,
+                COALESCE(g.group_name, '') AS artist,
+                COALESCE(string_agg(DISTINCT al.album_name, ', '), '') AS album,
+                s.length_ms,
+                ROUND((top.score * trend_exp(-te.decay * EXTRACT(EPOCH FROM NOW() - te.landmark)))::numeric)
+                    AS listen_count,
+                COALESCE(MIN(s.release_date), MIN(al.release_date)) AS release_date,
+                EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) AS release_year
+            FROM top
+            CROSS JOIN trend_epoch te
+            JOIN song s
+                 ON s.song_id = top.song_id
+            LEFT JOIN "GROUP" g
+                 ON g.group_id = s.group_id
+            LEFT JOIN song_within_album swa
+                 ON swa.song_id = s.song_id
+            LEFT JOIN album al
+                 ON al.album_id = swa.album_id
+            GROUP BY s.song_id, s.title, s.length_ms, g.group_name, top.score, te.decay, te.landmark
+            ORDER BY top.score DESC, LOWER(s.title) ASC
+        """
+        cur.execute(sql)
+        return cur.fetchall()
+
+    def _query_top_50_last_30_days_live(self, cur):
         """
         Top 50 most popular songs in the last 30 days (rolling),
         fully driven by the listen table.
@@ -216,228 +346,398 @@ class RecommendationsFrame(ttk.Frame):
                      LOWER(COALESCE(g.group_name, '')) ASC
             LIMIT 50
         """
-        with self.app.cursor() as cur:
-            cur.execute(sql)
-            return cur.fetchall()
+        cur.execute(sql)
+        return cur.fetchall()
 
-    def _query_top_50_followed_users(self, username: str):
+    def _query_top_50_followed_users(self, cur, username: str):
         """
         Top 50 most popular songs among:
         – users followed by the current user
         – and the current user themselves.
 
-        Driven from listen + user_follow, using DISTINCT counts
-        like SongsFrame.
+        Read from the user's followed_song_counts feed (schema/006), which
+        listens and follows keep current; the feed is built here on first
+        view or after it was invalidated. Only rows at or above the 50th
+        play count are touched, so title/artist tie-breaks stay exact.
         """
-        sql = f"""
+        sql = """
+            WITH cutoff AS (
+                SELECT plays
+                FROM followed_song_counts
+                WHERE username = %(u)s AND plays > 0
+                ORDER BY plays DESC
+                OFFSET 49 LIMIT 1
+            ),
+            top AS (
+                SELECT song_id, plays
+                FROM followed_song_counts
+                WHERE username = %(u)s
+                  AND plays >= COALESCE((SELECT plays FROM cutoff), 1)
+            )
             SELECT
                 s.song_id,
                 s.title AS song,
                 COALESCE(g.group_name, '') AS artist,
                 COALESCE(string_agg(DISTINCT al.album_name, ', '), '') AS album,
                 s.length_ms,
-                COALESCE(COUNT(DISTINCT (li.listener_username, li.date_of_view)), 0) AS listen_count,
+                top.plays AS listen_count,
                 COALESCE(MIN(s.release_date), MIN(al.release_date)) AS release_date,
                 EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) AS release_year
-            FROM listen li
+            FROM top
             JOIN song s
-                 ON s.song_id = li.song_id
+                 ON s.song_id = top.song_id
             LEFT JOIN "GROUP" g
                  ON g.group_id = s.group_id
             LEFT JOIN song_within_album swa
                  ON swa.song_id = s.song_id
             LEFT JOIN album al
                  ON al.album_id = swa.album_id
-            WHERE
-                -- listens by the current user
-                li.listener_username = %s
-                OR
-                -- listens by users the current user follows
-                li.listener_username IN (
-                    SELECT followed_user_id
-                    FROM user_follow
-                    WHERE follower_user_id = %s
-                )
-            GROUP BY s.song_id, s.title, s.length_ms, g.group_name
+            GROUP BY s.song_id, s.title, s.length_ms, g.group_name, top.plays
             ORDER BY listen_count DESC,
                      LOWER(s.title) ASC,
                      LOWER(COALESCE(g.group_name, '')) ASC
             LIMIT 50
         """
-        with self.app.cursor() as cur:
-            cur.execute(sql, (username, username))
-            return cur.fetchall()
-
-    def _query_top_5_genres_this_month(self):
+        # commit either way: a build (or a wait on someone else's) holds
+        # the feed lock until the transaction ends
+        ensure_followed_feed(cur, username)
+        cur.connection.commit()
+        cur.execute(sql, {"u": username})
+        return cur.fetchall()
+
+    def _query_top_5_genres_this_month(self, cur):
         """
         Top 5 most popular genres of the current calendar month.
-        Driven from listen + song_genre.
+        A primary-key lookup on the genre_month_listens rollup (schema/005).
         """
-        sql = f"""
-            SELECT
-                sg.genre,
-                COUNT(*) AS listens_this_month
-            FROM {self.TBL_LISTEN}
-            JOIN {self.TBL_SONG_GENRE}
-                 ON sg.song_id = li.song_id
-            WHERE li.date_of_view >= date_trunc('month', CURRENT_DATE)
-              AND li.date_of_view <  date_trunc('month', CURRENT_DATE) + INTERVAL '1 month'
-            GROUP BY sg.genre
-            ORDER BY listens_this_month DESC, sg.genre ASC
+        sql = """
+            SELECT genre, listens AS listens_this_month
+            FROM genre_month_listens
+            WHERE month = date_trunc('month', CURRENT_DATE)::date
+            ORDER BY listens DESC, genre ASC
             LIMIT 5
         """
-        with self.app.cursor() as cur:
-            cur.execute(sql)
-            return cur.fetchall()
+        cur.execute(sql)
+        return cur.fetchall()
 
-    def _query_recommended_songs(self, username: str):
+    def _query_genre_trends(self, cur, months: int = 12):
         """
-        Recommend songs based on:
-        – user's play history in `listen`
-        – play history of similar users in `listen`
-
-        Similar users: share at least 3 songs with the current user.
+        Listens per genre for each of the last `months` calendar months
+        (including this one) with the change against the previous month.
+        Months where a genre had no listens count as 0.
 
-        Returns rows:
-        (song_id, song, artist, album, length_ms, release_date, release_year, listen_count, score)
-
-        where:
-        – listen_count = global distinct listens for the song
-        – score        = recommendation strength (used for ordering only)
+        Returns rows: (month 'YYYY-MM', genre, listens, change)
         """
-        sql = f"""
-            WITH user_listens AS (
-                SELECT DISTINCT song_id
-                FROM listen
-                WHERE listener_username = %s
+        sql = """
+            WITH months AS (
+                SELECT generate_series(
+                    date_trunc('month', CURRENT_DATE) - make_interval(months => %(months)s),
+                    date_trunc('month', CURRENT_DATE),
+                    INTERVAL '1 month'
+                )::date AS month
             ),
-            similar_users AS (
-                SELECT
-                    li.listener_username,
-                    COUNT(DISTINCT li.song_id) AS overlap
-                FROM listen li
-                JOIN user_listens ul ON ul.song_id = li.song_id
-                WHERE li.listener_username <> %s
-                GROUP BY li.listener_username
-                HAVING COUNT(DISTINCT li.song_id) >= 3
+            grid AS (
+                SELECT m.month, gs.genre, COALESCE(gml.listens, 0) AS listens
+                FROM months m
+                CROSS JOIN (
+                    SELECT DISTINCT genre
+                    FROM genre_month_listens
+                    WHERE month >= (SELECT MIN(month) FROM months)
+                ) gs
+                LEFT JOIN genre_month_listens gml
+                       ON gml.month = m.month AND gml.genre = gs.genre
             ),
-            candidate_plays AS (
+            trend AS (
                 SELECT
-                    li.song_id,
-                    COUNT(*) AS score
-                FROM listen li
-                JOIN similar_users su ON su.listener_username = li.listener_username
-                WHERE li.song_id NOT IN (SELECT song_id FROM user_listens)
-                GROUP BY li.song_id
-            ),
-            recommended_songs AS (
-                SELECT
-                    s.song_id,
-                    s.title AS song,
-                    COALESCE(g.group_name, '') AS artist,
-                    COALESCE(string_agg(DISTINCT al.album_name, ', '), '') AS album,
-                    s.length_ms,
-                    COALESCE(MIN(s.release_date), MIN(al.release_date)) AS release_date,
-                    EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) AS release_year,
-                    c.score,
-                    COALESCE(
-                        COUNT(DISTINCT (li_all.listener_username, li_all.date_of_view)),
-                        0
-                    ) AS listen_count
-                FROM candidate_plays c
-                JOIN song s               ON s.song_id = c.song_id
-                LEFT JOIN "GROUP" g       ON g.group_id = s.group_id
-                LEFT JOIN song_within_album swa ON swa.song_id = s.song_id
-                LEFT JOIN album al        ON al.album_id = swa.album_id
-                LEFT JOIN listen li_all   ON li_all.song_id = s.song_id
-                GROUP BY s.song_id, s.title, s.length_ms, g.group_name, c.score
+                    month,
+                    genre,
+                    listens,
+                    listens - LAG(listens) OVER (PARTITION BY genre ORDER BY month) AS change
+                FROM grid
             )
-            SELECT
-                song_id,
-                song,
-                artist,
-                album,
-                length_ms,
-                release_date,
-                release_year,
-                listen_count,
-                score
-            FROM recommended_songs
-            ORDER BY score DESC, LOWER(song) ASC
-            LIMIT 50
+            SELECT to_char(month, 'YYYY-MM'), genre, listens, change
+            FROM trend
+            WHERE month > (SELECT MIN(month) FROM months)
+              AND (listens > 0 OR change <> 0)
+            ORDER BY month DESC, listens DESC, genre ASC
+        """
+        cur.execute(sql, {"months": months})
+        return cur.fetchall()
+
+    def _blend_content_recs(self, cur, username: str, rows):
         """
-        with self.app.cursor() as cur:
-            cur.execute(sql, (username, username))
-            return cur.fetchall()
+        Re-rank collaborative recommendation rows together with content-based
+        candidates (genre / artist preferences, services.content_recs), so
+        users without similar listeners still get songs. Needs the local
+        catalog; without it the collaborative rows are returned unchanged.
+        """
+        snap = self.app.catalog.snapshot
+        if snap is None:
+            return rows
+        by_id = {str(r[0]): r for r in rows}
+        prefs = user_preferences(cur, username, snap)
+        if prefs is None:
+            return rows
+        blended = blend(snap, prefs, {sid: float(r[8] or 0) for sid, r in by_id.items()})
+        counts = fetch_listen_counts(cur, [sid for sid, _ in blended if sid not in by_id])
+
+        out = []
+        for song_id, score in blended:
+            row = by_id.get(song_id)
+            if row is not None:
+                out.append(tuple(row[:8]) + (score,))
+                continue
+            sid, song, artist, album, length_ms, _genre, release_year = snap.row(snap.row_of[song_id])
+            out.append((sid, song, artist, album, length_ms, None, release_year,
+                        counts.get(sid, 0), score))
+        return out
+
+    def _compute_recommendations(self, cur, username: str):
+        """Collaborative rows blended with content-based ones (see above)."""
+        rows = recommended_songs(cur, username)
+        return self._blend_content_recs(cur, username, rows)
+
+    # ================= Recommendation cache =================
+    def _load_recommendations(self, username: str):
+        """
+        Paint cached recommendations immediately (stale-while-revalidate) and
+        recompute in the background when there are none or they are stale.
+        """
+        cached = self.app.rec_cache.get(username)
+        if cached is None:
+            self.tree.delete(*self.tree.get_children())
+            self.info_lbl.config(text="Loading recommendations…")
+            self._revalidate_recommendations(username, cold=True)
+            return
+        rows, fresh = cached
+        self._show_recommendations(rows, cold=False)
+        if not fresh:
+            self.info_lbl.config(text="Recommended songs for you  •  updating…")
+            self._revalidate_recommendations(username, cold=False)
+
+    def _revalidate_recommendations(self, username: str, cold: bool):
+        """Recompute on a worker thread with a pooled connection; Tk polls for the result."""
+        if username in self._recs_inflight:
+            return
+        self._recs_inflight.add(username)
+        result = {}
+
+        def work():
+            try:
+                with pooled_connection() as conn:
+                    with conn.cursor() as cur:
+                        result["rows"] = self._compute_recommendations(cur, username)
+            except Exception as e:
+                result["error"] = e
+            finally:
+                result["done"] = True
+
+        threading.Thread(target=work, name="recommendations", daemon=True).start()
+        self.after(self.POLL_MS, self._poll_recommendations, username, result, cold)
+
+    def _poll_recommendations(self, username: str, result: dict, cold: bool):
+        if not result.get("done"):
+            self.after(self.POLL_MS, self._poll_recommendations, username, result, cold)
+            return
+        self._recs_inflight.discard(username)
+        showing = (self.current_mode == self.MODE_RECS
+                   and self.app.session.username == username)
+        if "error" in result:
+            if showing:
+                if cold:
+                    self.info_lbl.config(text="Could not load recommendations.")
+                    messagebox.showerror(
+                        "Recommendations Error",
+                        f"Could not load data for this view:\n{result['error']}",
+                    )
+                else:
+                    self.info_lbl.config(text="Recommended songs for you  •  update failed")
+            return
+        self.app.rec_cache.put(username, result["rows"])
+        if showing:
+            self._show_recommendations(result["rows"], cold=cold)
+
+    def _show_recommendations(self, rows, cold: bool):
+        if not rows:
+            self.tree.delete(*self.tree.get_children())
+            self.info_lbl.config(
+                text="No recommendations yet – listen to more songs first."
+            )
+            if cold:
+                messagebox.showinfo(
+                    "No recommendations yet",
+                    "We don't have enough listening history to recommend songs.\n"
+                    "Try listening to more music or following some users!",
+                )
+            return
+        self._populate_recommendation_rows(rows)
+        self.info_lbl.config(text="Recommended songs for you")
 
     # ================= Data load =================
+    def on_show(self):
+        """Load every mode in the background so switching views is instant."""
+        self._prefetch_modes()
+        self._show_mode()
+
+    def shutdown(self):
+        """Drop queued prefetches; called by App.on_close."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
     def refresh(self):
+        """Reload the current view from the database."""
+        self._show_mode(force=True)
+
+    def _load_mode(self, cur, mode: str, username: Optional[str]):
+        """Run the query behind `mode`; the result is what _render_mode expects."""
+        if mode == self.MODE_TOP_30:
+            return self._query_top_50_last_30_days(cur)
+        if mode == self.MODE_TRENDING:
+            return self._query_trending_now(cur)
+        if mode == self.MODE_FOLLOWED:
+            return self._query_top_50_followed_users(cur, username)
+        if mode == self.MODE_GENRES:
+            return self._query_top_5_genres_this_month(cur)
+        if mode == self.MODE_GENRE_TRENDS:
+            return self._query_genre_trends(cur)
+        raise KeyError(mode)
+
+    def _render_mode(self, mode: str, data):
+        if mode == self.MODE_TOP_30:
+            rows, refreshed_at = data
+            self._populate_song_rows(rows)
+            updated = ""
+            if refreshed_at is not None:
+                updated = f"  •  updated {refreshed_at.astimezone():%Y-%m-%d %H:%M}"
+            if rows:
+                self.info_lbl.config(text=f"Top 50 songs (last 30 days){updated}")
+            else:
+                self.info_lbl.config(text=f"No listening activity in the last 30 days.{updated}")
+        elif mode == self.MODE_TRENDING:
+            self._populate_song_rows(data)
+            if data:
+                self.info_lbl.config(text="Trending now (listens decayed by half every 6 hours)")
+            else:
+                self.info_lbl.config(text="Nothing trending right now.")
+        elif mode == self.MODE_FOLLOWED:
+            if not data:
+                self.tree.delete(*self.tree.get_children())
+                self.info_lbl.config(
+                    text="No listening activity from people you follow."
+                )
+                messagebox.showinfo(
+                    "No followed activity",
+                    "You either don't follow anyone yet, or the users you follow "
+                    "haven't listened to any songs.",
+                )
+                return
+            self._populate_song_rows(data)
+            self.info_lbl.config(text="Top 50 songs among followed users")
+        elif mode == self.MODE_GENRES:
+            self._populate_genre_rows(data)
+            if data:
+                self.info_lbl.config(text="Top 5 genres this month")
+            else:
+                self.info_lbl.config(text="No listening activity this month yet.")
+        elif mode == self.MODE_GENRE_TRENDS:
+            self._populate_genre_trend_rows(data)
+            if data:
+                self.info_lbl.config(text="Genre listens per month (last 12 months)")
+            else:
+                self.info_lbl.config(text="No genre listening history yet.")
+
+    def _show_mode(self, force: bool = False):
+        """
+        Render the current mode: from the prefetch cache when possible, wait
+        for an in-flight prefetch, or query on the Tk thread (`force`, or
+        nothing loaded yet).
+        """
+        mode = self.current_mode
+        username = self.app.session.username
+        if mode in self.LOGIN_MODES and not username:
+            messagebox.showwarning("Not logged in", self.LOGIN_MESSAGES[mode])
+            self.tree.delete(*self.tree.get_children())
+            self.info_lbl.config(text="Login required")
+            return
+        if mode == self.MODE_RECS:
+            self._load_recommendations(username)
+            return
+        if not force:
+            cached = self._mode_cache.get(mode)
+            if cached is not None and cached[0] == username:
+                self._render_mode(mode, cached[1])
+                return
+            if mode in self._mode_pending:
+                self.tree.delete(*self.tree.get_children())
+                self.info_lbl.config(text="Loading…")
+                return
         try:
-            if self.current_mode == self.MODE_TOP_30:
-                rows = self._query_top_50_last_30_days()
-                self._populate_song_rows(rows)
-                if rows:
-                    self.info_lbl.config(text="Top 50 songs (last 30 days)")
-                else:
-                    self.info_lbl.config(text="No listening activity in the last 30 days.")
-            elif self.current_mode == self.MODE_FOLLOWED:
-                if not self.app.session.username:
-                    messagebox.showwarning(
-                        "Not logged in",
-                        "Please log in to see what people you follow are listening to.",
-                    )
-                    self.tree.delete(*self.tree.get_children())
-                    self.info_lbl.config(text="Login required")
-                    return
-                rows = self._query_top_50_followed_users(self.app.session.username)
-                if not rows:
-                    self.tree.delete(*self.tree.get_children())
-                    self.info_lbl.config(
-                        text="No listening activity from people you follow."
-                    )
-                    messagebox.showinfo(
-                        "No followed activity",
-                        "You either don't follow anyone yet, or the users you follow "
-                        "haven't listened to any songs.",
-                    )
-                    return
-                self._populate_song_rows(rows)
-                self.info_lbl.config(text="Top 50 songs among followed users")
-            elif self.current_mode == self.MODE_GENRES:
-                rows = self._query_top_5_genres_this_month()
-                self._populate_genre_rows(rows)
-                if rows:
-                    self.info_lbl.config(text="Top 5 genres this month")
-                else:
-                    self.info_lbl.config(text="No listening activity this month yet.")
-            elif self.current_mode == self.MODE_RECS:
-                if not self.app.session.username:
-                    messagebox.showwarning(
-                        "Not logged in",
-                        "Please log in to see your recommendations.",
-                    )
-                    self.tree.delete(*self.tree.get_children())
-                    self.info_lbl.config(text="Login required")
-                    return
-                rows = self._query_recommended_songs(self.app.session.username)
-                if not rows:
-                    self.tree.delete(*self.tree.get_children())
-                    self.info_lbl.config(
-                        text="No recommendations yet – listen to more songs first."
-                    )
-                    messagebox.showinfo(
-                        "No recommendations yet",
-                        "We don't have enough listening history to recommend songs.\n"
-                        "Try listening to more music or following some users!",
-                    )
-                    return
-                self._populate_recommendation_rows(rows)
-                self.info_lbl.config(text="Recommended songs for you")
+            with self.app.cursor() as cur:
+                data = self._load_mode(cur, mode, username)
         except Exception as e:
             messagebox.showerror(
                 "Recommendations Error",
                 f"Could not load data for this view:\n{e}",
             )
+            return
+        self._mode_cache[mode] = (username, data)
+        self._render_mode(mode, data)
+
+    def _prefetch_modes(self):
+        """
+        Query every mode at once on pooled connections. Results land in
+        _mode_queue and are drained on the Tk thread by _poll_modes.
+        """
+        username = self.app.session.username
+        self._generation += 1
+        generation = self._generation
+        self._mode_cache.clear()
+        self._mode_pending = set()
+
+        for _label, mode in self.MODE_LABELS:
+            if mode == self.MODE_RECS or (mode in self.LOGIN_MODES and not username):
+                continue
+            self._mode_pending.add(mode)
+            self._executor.submit(self._prefetch_one, generation, mode, username)
+
+        if username and self.app.rec_cache.get(username) is None:
+            self._revalidate_recommendations(username, cold=False)
+        self.after(self.POLL_MS, self._poll_modes, generation)
+
+    def _prefetch_one(self, generation: int, mode: str, username: Optional[str]):
+        # worker thread: never touch Tk here
+        try:
+            with pooled_connection() as conn:
+                with conn.cursor() as cur:
+                    data = self._load_mode(cur, mode, username)
+            self._mode_queue.put((generation, mode, username, data, None))
+        except Exception as e:
+            self._mode_queue.put((generation, mode, username, None, e))
+
+    def _poll_modes(self, generation: int):
+        if generation != self._generation:
+            return
+        while True:
+            try:
+                gen, mode, username, data, error = self._mode_queue.get_nowait()
+            except queue.Empty:
+                break
+            if gen != self._generation:
+                continue
+            self._mode_pending.discard(mode)
+            if error is None:
+                self._mode_cache[mode] = (username, data)
+            if mode != self.current_mode or username != self.app.session.username:
+                continue
+            if error is None:
+                self._render_mode(mode, data)
+            else:
+                self.info_lbl.config(text="Could not load this view.")
+                messagebox.showerror(
+                    "Recommendations Error",
+                    f"Could not load data for this view:\n{error}",
+                )
+        if self._mode_pending:
+            self.after(self.POLL_MS, self._poll_modes, generation)
 
     def _populate_song_rows(self, rows):
         """
@@ -519,6 +819,23 @@ class RecommendationsFrame(ttk.Frame):
             ]
             self.tree.insert("", "end", iid=f"genre_{genre}", values=values)
 
+    def _populate_genre_trend_rows(self, rows):
+        """
+        rows: (month, genre, listens, change)
+        """
+        if self.current_cols is not self.COLS_GENRE_TREND:
+            self._setup_columns(self.COLS_GENRE_TREND)
+
+        self.tree.delete(*self.tree.get_children())
+        for month, genre, listens, change in rows:
+            values = [
+                month,
+                str(genre),
+                int(listens or 0),
+                f"{int(change):+d}" if change is not None else "",
+            ]
+            self.tree.insert("", "end", iid=f"gtrend_{month}_{genre}", values=values)
+
     # ================= Listen handling =================
     def _record_listen_and_patch(self, song_id: str, iid: str):
         """
@@ -541,46 +858,44 @@ class RecommendationsFrame(ttk.Frame):
 
         try:
             with self.app.cursor() as cur:
-                # 1) insert one listen row
-                cur.execute(
-                    """
-                    INSERT INTO listen (song_id, listener_username, date_of_view)
-                    VALUES (%s, %s, NOW())
-                    """,
-                    (song_id, self.app.session.username),
-                )
+                # 1) insert one listen row (+ rollups)
+                record_listens(cur, self.app.session.username, [song_id])
 
                 # 2) get the updated count for this song,
                 #    matching the logic of the current view
                 if self.current_mode == self.MODE_TOP_30:
-                    # same filter as _query_top_50_last_30_days
+                    # same daily counters as chart_top_50_30d
                     cur.execute(
                         """
-                        SELECT COALESCE(COUNT(DISTINCT (listener_username, date_of_view)), 0)
-                        FROM listen
+                        SELECT COALESCE(SUM(listens), 0)
+                        FROM song_daily_listens
                         WHERE song_id = %s
-                          AND date_of_view >= NOW() - INTERVAL '30 days'
+                          AND day > CURRENT_DATE - 30
+                        """,
+                        (song_id,),
+                    )
+                elif self.current_mode == self.MODE_TRENDING:
+                    # same decayed score as _query_trending_now
+                    cur.execute(
+                        """
+                        SELECT COALESCE(ROUND((
+                            SELECT t.score * trend_exp(-te.decay * EXTRACT(EPOCH FROM NOW() - te.landmark))
+                            FROM song_trend t CROSS JOIN trend_epoch te
+                            WHERE t.song_id = %s
+                        )::numeric), 0)
                         """,
                         (song_id,),
                     )
                 elif self.current_mode == self.MODE_FOLLOWED:
-                    # same filter as _query_top_50_followed_users:
-                    # listeners = you OR users you follow
+                    # same feed as _query_top_50_followed_users; the
+                    # listen above was already fanned out into it
                     cur.execute(
                         """
-                        SELECT COALESCE(COUNT(DISTINCT (li.listener_username, li.date_of_view)), 0)
-                        FROM listen li
-                        WHERE li.song_id = %s
-                          AND (
-                                li.listener_username = %s
-                                OR li.listener_username IN (
-                                    SELECT followed_user_id
-                                    FROM user_follow
-                                    WHERE follower_user_id = %s
-                                )
-                              )
+                        SELECT COALESCE(SUM(plays), 0)
+                        FROM followed_song_counts
+                        WHERE username = %s AND song_id = %s
                         """,
-                        (song_id, self.app.session.username, self.app.session.username),
+                        (self.app.session.username, song_id),
                     )
                 else:
                     # For recommendations or any other song-based view that doesn't
@@ -597,6 +912,9 @@ class RecommendationsFrame(ttk.Frame):
                 (new_count,) = cur.fetchone()
 
             self.app.conn.commit()
+            self.app.on_listens_recorded(self.app.session.username, [song_id])
+            # every prefetched view may count this listen; reload them on demand
+            self._mode_cache.clear()
         except Exception as e:
             messagebox.showerror("Listen Error", f"Could not record listen:\n{e}")
             return
@@ -620,19 +938,8 @@ class RecommendationsFrame(ttk.Frame):
                 ids.append(iid[5:])
         return ids
 
-    def _get_collection_choices(self) -> List[Tuple[str, str]]:
-        sql = """
-            SELECT collection_id, collection_name
-            FROM collection
-            WHERE creator_username = %s
-            ORDER BY collection_name
-        """
-        with self.app.cursor() as cur:
-            cur.execute(sql, (self.app.session.username,))
-            return cur.fetchall() or []
-
     def add_selected_to_collection(self):
-        if self.current_mode == self.MODE_GENRES:
+        if self.current_mode in self.GENRE_MODES:
             messagebox.showinfo(
                 "Genres only",
                 "You can only add songs (not genres) to collections.\n"
@@ -649,69 +956,4 @@ class RecommendationsFrame(ttk.Frame):
             messagebox.showinfo("Select songs", "Please select one or more songs first.")
             return
 
-        collections = self._get_collection_choices()
-        if not collections:
-            messagebox.showinfo(
-                "No collections", "You don't have any collections. Create one first."
-            )
-            return
-
-        dialog = tk.Toplevel(self)
-        dialog.title("Choose Collection")
-        dialog.transient(self)
-        dialog.grab_set()
-
-        frame = ttk.Frame(dialog, padding="16 12")
-        frame.pack(fill="both", expand=True)
-
-        ttk.Label(frame, text="Choose a collection:").pack(pady=(0, 8))
-        listbox = tk.Listbox(frame, width=42, height=10)
-        listbox.pack(pady=(0, 8))
-
-        idx_to_coll = {}
-        for i, (cid, name) in enumerate(collections):
-            idx_to_coll[i] = (cid, name)
-            listbox.insert(tk.END, name)
-
-        def on_ok():
-            sel = listbox.curselection()
-            if not sel:
-                messagebox.showwarning(
-                    "Select collection", "Please select a collection.", parent=dialog
-                )
-                return
-            cid, cname = idx_to_coll[sel[0]]
-            dialog.destroy()
-
-            try:
-                added = 0
-                with self.app.cursor() as cur:
-                    for sid in song_ids:
-                        cur.execute(
-                            """
-                            INSERT INTO song_within_collection (collection_id, song_id)
-                            VALUES (%s, %s)
-                            ON CONFLICT (collection_id, song_id) DO NOTHING
-                            """,
-                            (cid, sid),
-                        )
-                        added += cur.rowcount
-                self.app.conn.commit()
-                skipped = len(song_ids) - added
-                msg = f"Added {added} song(s) to '{cname}'."
-                if skipped:
-                    msg += f"  Skipped {skipped} duplicate(s)."
-                messagebox.showinfo("Done", msg)
-            except Exception as e:
-                messagebox.showerror(
-                    "Error", f"Could not add songs to collection:\n{e}"
-                )
-
-        ttk.Button(frame, text="OK", command=on_ok).pack(side="left", padx=(0, 8))
-        ttk.Button(frame, text="Cancel", command=dialog.destroy).pack(side="left")
-
-        dialog.update_idletasks()
-        x = self.winfo_rootx() + (self.winfo_width() - dialog.winfo_width()) // 2
-        y = self.winfo_rooty() + (self.winfo_height() - dialog.winfo_height()) // 2
-        dialog.geometry(f"+{x}+{y}")
-        dialog.wait_window(dialog)
+        add_to_collections(self, self.app, song_ids)
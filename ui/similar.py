@@ -0,0 +1,79 @@
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+
+class SimilarSongsDialog(tk.Toplevel):
+    """
+    "People who played this also played" for one song, read from
+    song_colisten (schema/010, built by jobs.colisten). Double-click a row
+    to move on to that song's similar songs.
+    """
+
+    COLS = [
+        ("song", "Song", 260),
+        ("artist", "Artist", 200),
+        ("co_listeners", "Listeners in Common", 140),
+    ]
+
+    def __init__(self, parent, app, song_id: str, title: str):
+        super().__init__(parent)
+        self.app = app
+        self.title("Similar Songs")
+        self.transient(parent)
+
+        frame = ttk.Frame(self, padding="16 12")
+        frame.pack(fill="both", expand=True)
+
+        self.header = ttk.Label(frame, text="", font=("Arial", 12, "bold"))
+        self.header.pack(anchor="w", pady=(0, 8))
+
+        self.tree = ttk.Treeview(frame, show="headings", height=12, selectmode="browse")
+        self.tree["columns"] = [c[0] for c in self.COLS]
+        for col_id, header, width in self.COLS:
+            self.tree.heading(col_id, text=header)
+            self.tree.column(col_id, width=width, anchor="e" if col_id == "co_listeners" else "w")
+        self.tree.pack(fill="both", expand=True)
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+        ttk.Button(frame, text="Close", command=self.destroy).pack(anchor="e", pady=(8, 0))
+
+        self.show_song(song_id, title)
+
+        self.update_idletasks()
+        x = parent.winfo_rootx() + (parent.winfo_width() - self.winfo_width()) // 2
+        y = parent.winfo_rooty() + (parent.winfo_height() - self.winfo_height()) // 2
+        self.geometry(f"+{x}+{y}")
+
+    def _query_similar(self, song_id: str):
+        sql = """
+            SELECT c.similar_song_id, s.title, COALESCE(g.group_name, ''), c.co_listeners
+            FROM song_colisten c
+            JOIN song s         ON s.song_id = c.similar_song_id
+            LEFT JOIN "GROUP" g ON g.group_id = s.group_id
+            WHERE c.song_id = %s
+            ORDER BY c.rank
+        """
+        with self.app.cursor() as cur:
+            cur.execute(sql, (song_id,))
+            return cur.fetchall()
+
+    def show_song(self, song_id: str, title: str):
+        try:
+            rows = self._query_similar(song_id)
+        except Exception as e:
+            messagebox.showerror("Similar Songs", f"Could not load similar songs:\n{e}", parent=self)
+            return
+        self.tree.delete(*self.tree.get_children())
+        if not rows:
+            self.header.config(text=f"No similar songs for '{title}' yet.")
+            return
+        self.header.config(text=f"People who played '{title}' also played:")
+        for similar_id, song, artist, co_listeners in rows:
+            self.tree.insert("", "end", iid=f"song_{similar_id}",
+                             values=[song or "", artist or "", int(co_listeners)])
+
+    def _on_double_click(self, event):
+        iid = self.tree.identify_row(event.y)
+        if not iid:
+            return
+        self.show_song(iid[5:], self.tree.item(iid, "values")[0])
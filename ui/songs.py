@@ -1,7 +1,12 @@
 import tkinter as tk
+from collections import OrderedDict
 from tkinter import ttk, messagebox
-from typing import List, Tuple, Optional
+from typing import Dict, List, Set, Tuple, Optional
 from app import App
+from services.catalog_index import MATCH_QUALITY, fetch_catalog_version, match_rank
+from services.listens import fetch_listen_counts, record_listens
+from ui.collection_picker import add_to_collections
+from ui.similar import SimilarSongsDialog
 
 
 class SongsFrame(ttk.Frame):
@@ -9,6 +14,12 @@ class SongsFrame(ttk.Frame):
     Song search + results viewer with 'Listen' action per row.
     - Click 'Listen' inserts one row into listen and updates only that row's count.
     - Shows a simple popup after Play.
+    - Once the local catalog index has loaded, search/sort/paging run in-process
+      and only listen counts for the visible page are fetched from the server.
+    - "all" search mode ranks matches across song/artist/album/genre and shows
+      which field matched in the last column.
+    - Facet lists (genre / decade / artist) show counts for the current results
+      and add filters when clicked.
     """
 
     # SQL expressions used in SELECT/ORDER/GROUP BY.
@@ -42,6 +53,7 @@ class SongsFrame(ttk.Frame):
         ("length", "Length", 80),
         ("release_year", "Year", 80),
         ("listen_count", "Listens", 90),
+        ("match", "Matched", 220),
     ]
 
     # visible value index helpers (avoid dynamic lookups)
@@ -55,6 +67,9 @@ class SongsFrame(ttk.Frame):
         "genre": "sg.genre::text",
     }
 
+    # pseudo-field: ranked search over every SEARCH_FIELDS column at once
+    ALL_FIELDS = "all"
+
     SORTABLE = {
         "song": SQL_COLS["song"],
         "artist": SQL_COLS["artist"],
@@ -62,6 +77,15 @@ class SongsFrame(ttk.Frame):
         "release_year": SQL_COLS["release_year"],
     }
 
+    # Facet panels: (facet key, header)
+    FACETS = [
+        ("genre", "Genre"),
+        ("decade", "Decade"),
+        ("artist", "Artist"),
+    ]
+    FACET_ARTIST_LIMIT = 25
+    FACET_CACHE_SIZE = 32
+
     def __init__(self, parent, app: App):
         super().__init__(parent)
         self.app = app
@@ -74,6 +98,18 @@ class SongsFrame(ttk.Frame):
         self.sort_key = "song"
         self.sort_dir = "ASC"
 
+        # Facet filters: facet key -> selected values (OR within, AND across facets)
+        self.facet_filters: Dict[str, Set[str]] = {key: set() for key, _ in self.FACETS}
+        self._facet_values: Dict[str, List[str]] = {key: [] for key, _ in self.FACETS}
+        self._facet_cache: "OrderedDict[tuple, Dict[str, Dict[str, int]]]" = OrderedDict()
+        # catalog version keying server-side facet counts; read once per on_show
+        self._server_version: Optional[int] = None
+        self._server_version_checked = False
+
+        # Local-catalog result caches: (key, rows) for the search and the filtered search
+        self._local_search: Tuple[Optional[tuple], List[int], dict] = (None, [], {})
+        self._local_filtered: Tuple[Optional[tuple], List[int]] = (None, [])
+
         # ---------- Header ----------
         ttk.Label(self, text="Songs", font=("Arial", 16, "bold")).pack(pady=(10, 6))
 
@@ -92,7 +128,7 @@ class SongsFrame(ttk.Frame):
         self.field_combo = ttk.Combobox(
             bar,
             textvariable=self.field_var,
-            values=list(self.SEARCH_FIELDS.keys()),
+            values=[self.ALL_FIELDS, *self.SEARCH_FIELDS.keys()],
             width=12,
             state="readonly",
         )
@@ -112,11 +148,27 @@ class SongsFrame(ttk.Frame):
         actions = ttk.Frame(self)
         actions.pack(fill="x", padx=10, pady=2)
         ttk.Button(actions, text="Add to Collection", command=self.add_selected_to_collection).pack(side="left", padx=(8, 0))
+        ttk.Button(actions, text="Similar Songs", command=self.show_similar_songs).pack(side="left", padx=(8, 0))
         ttk.Button(actions, text="Back", command=lambda: app.safe_show("Dashboard")).pack(side="right")
 
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+
+        # ---------- Facets ----------
+        facets = ttk.Frame(body)
+        facets.pack(side="left", fill="y", padx=(0, 8))
+        self.facet_lists: Dict[str, tk.Listbox] = {}
+        for key, header in self.FACETS:
+            ttk.Label(facets, text=header, font=("Arial", 10, "bold")).pack(anchor="w")
+            lb = tk.Listbox(facets, width=26, height=7, exportselection=False)
+            lb.pack(fill="x", pady=(0, 6))
+            lb.bind("<<ListboxSelect>>", lambda e, k=key: self._on_facet_click(k))
+            self.facet_lists[key] = lb
+        ttk.Button(facets, text="Clear Filters", command=self.clear_filters).pack(anchor="w")
+
         # ---------- Tree ----------
-        self.tree = ttk.Treeview(self, show="headings", height=18, selectmode="extended")
-        self.tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        self.tree = ttk.Treeview(body, show="headings", height=18, selectmode="extended")
+        self.tree.pack(side="left", fill="both", expand=True)
         self._setup_columns()
 
         # Clicking the first column ("Listen") acts as a button
@@ -124,6 +176,11 @@ class SongsFrame(ttk.Frame):
 
         self.refresh()
 
+    def on_show(self):
+        # cheap background version check; picks up catalog edits made elsewhere
+        self.app.catalog.maybe_refresh()
+        self._server_version_checked = False
+
     # ================= UI Helpers =================
     def _setup_columns(self):
         self.tree["columns"] = [c[0] for c in self.COLS]
@@ -182,6 +239,22 @@ class SongsFrame(ttk.Frame):
         except Exception:
             return ""
 
+    @staticmethod
+    def _fmt_match(matches: Dict[str, Tuple[int, int]], texts: Dict[str, str], term_len: int) -> str:
+        """Best matching field with the hit bracketed, e.g. 'artist (prefix): [Beat]les +1'."""
+        if not matches:
+            return ""
+        field = max(matches, key=lambda f: match_rank(f, matches[f][0]))
+        quality, pos = matches[field]
+        text = texts.get(field) or ""
+        snippet = f"{text[:pos]}[{text[pos:pos + term_len]}]{text[pos + term_len:]}"
+        extra = f" +{len(matches) - 1}" if len(matches) > 1 else ""
+        return f"{field} ({MATCH_QUALITY[quality]}): {snippet}{extra}"
+
+    @staticmethod
+    def _like_escape(term: str) -> str:
+        return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
     # ================= Search state =================
     def apply_search(self):
         self.offset = 0
@@ -192,27 +265,97 @@ class SongsFrame(ttk.Frame):
         self.offset = 0
         self.refresh()
 
+    def clear_filters(self):
+        for values in self.facet_filters.values():
+            values.clear()
+        self.offset = 0
+        self.refresh()
+
+    def _on_facet_click(self, key: str):
+        sel = self.facet_lists[key].curselection()
+        if not sel:
+            return
+        value = self._facet_values[key][sel[0]]
+        chosen = self.facet_filters[key]
+        if value in chosen:
+            chosen.discard(value)
+        else:
+            chosen.add(value)
+        self.offset = 0
+        self.refresh()
+
+    def _frozen_filters(self) -> tuple:
+        return tuple(frozenset(self.facet_filters[key]) for key, _ in self.FACETS)
+
+    @staticmethod
+    def _snapshot_key(snap) -> Optional[tuple]:
+        # None = server-side results; a reloaded snapshot gets a new key
+        return (snap.version, snap.loaded_at) if snap is not None else None
+
     # ================= SQL build =================
-    def _build_base_from(self) -> str:
+    def _build_base_from(self, with_listens: bool = True) -> str:
         # Keep the listen join for page loads where we show counts
+        listen_join = f"LEFT JOIN {self.TBL_LISTEN}     ON li.song_id = s.song_id" if with_listens else ""
         return f"""
         FROM {self.TBL_SONG}
         LEFT JOIN {self.TBL_GROUP}      ON g.group_id = s.group_id
         LEFT JOIN {self.TBL_SONG_ALBUM} ON swa.song_id = s.song_id
         LEFT JOIN {self.TBL_ALBUM}      ON al.album_id = swa.album_id
         LEFT JOIN {self.TBL_SONG_GENRE} ON sg.song_id = s.song_id
-        LEFT JOIN {self.TBL_LISTEN}     ON li.song_id = s.song_id
+        {listen_join}
         """
 
-    def _build_where(self) -> Tuple[str, list]:
+    def _facet_conditions(self, sid: str) -> Tuple[List[str], dict]:
+        """Facet filters as song-level predicates on `sid` (a song_id column)."""
+        conds: List[str] = []
+        params: dict = {}
+        if self.facet_filters["genre"]:
+            conds.append(
+                f"EXISTS (SELECT 1 FROM song_genre fg "
+                f"WHERE fg.song_id = {sid} AND fg.genre::text = ANY(%(facet_genre)s))"
+            )
+            params["facet_genre"] = sorted(self.facet_filters["genre"])
+        if self.facet_filters["decade"]:
+            conds.append(f"""(
+                SELECT FLOOR(EXTRACT(YEAR FROM COALESCE(MIN(fs.release_date), MIN(fa.release_date))) / 10) * 10
+                FROM song fs
+                LEFT JOIN song_within_album fw ON fw.song_id = fs.song_id
+                LEFT JOIN album fa ON fa.album_id = fw.album_id
+                WHERE fs.song_id = {sid}
+            ) = ANY(%(facet_decade)s)""")
+            params["facet_decade"] = sorted(int(d) for d in self.facet_filters["decade"])
+        if self.facet_filters["artist"]:
+            conds.append(
+                f'EXISTS (SELECT 1 FROM song fs JOIN "GROUP" fgr ON fgr.group_id = fs.group_id '
+                f"WHERE fs.song_id = {sid} AND fgr.group_name = ANY(%(facet_artist)s))"
+            )
+            params["facet_artist"] = sorted(self.facet_filters["artist"])
+        return conds, params
+
+    def _build_where(self) -> Tuple[str, dict]:
+        conds, params = self._facet_conditions("s.song_id")
+        term = self.search_var.get().strip()
+        if term:
+            field_key = self.field_var.get()
+            field_expr = self.SEARCH_FIELDS.get(field_key, "s.title")
+            conds.insert(0, f"{field_expr} ILIKE %(term)s")
+            params["term"] = f"%{term}%"
+        if not conds:
+            return "", params
+        return "WHERE " + " AND ".join(conds), params
+
+    def _candidates_sql(self) -> Tuple[str, dict]:
+        """SELECT of the song_ids matching the current search + facet filters."""
         term = self.search_var.get().strip()
-        if not term:
-            return "", []
-        field_key = self.field_var.get()
-        field_expr = self.SEARCH_FIELDS.get(field_key, "s.title")
-        return f"WHERE {field_expr} ILIKE %s", [f"%{term}%"]
+        if self.field_var.get() == self.ALL_FIELDS and term:
+            conds, params = self._facet_conditions("ss.song_id")
+            conds.insert(0, "ss.document LIKE %(contains)s")
+            params["contains"] = f"%{self._like_escape(term.lower())}%"
+            return "SELECT ss.song_id FROM song_search ss WHERE " + " AND ".join(conds), params
+        where_sql, params = self._build_where()
+        return f"SELECT DISTINCT s.song_id {self._build_base_from(with_listens=False)} {where_sql}", params
 
-    def _order_sql(self) -> str:
+    def _order_sql(self, lead: str = "") -> str:
         key = self.sort_key if self.sort_key in ("song", "artist", "genre", "release_year") else "song"
         direction = "ASC" if self.sort_dir == "ASC" else "DESC"
         if key in ("song", "artist", "genre"):
@@ -220,12 +363,12 @@ class SongsFrame(ttk.Frame):
         else:
             primary = f"{key} {direction}"
         secondary = "LOWER(song) ASC, LOWER(artist) ASC"
-        return f"ORDER BY {primary}, {secondary}"
+        return f"ORDER BY {lead}{primary}, {secondary}"
 
     # ================= Queries =================
     def _count_matches(self) -> int:
         where_sql, params = self._build_where()
-        sql = f"SELECT COUNT(DISTINCT s.song_id) {self._build_base_from()} {where_sql}"
+        sql = f"SELECT COUNT(DISTINCT s.song_id) {self._build_base_from(with_listens=False)} {where_sql}"
         with self.app.cursor() as cur:
             cur.execute(sql, params)
             (count,) = cur.fetchone()
@@ -253,31 +396,311 @@ class SongsFrame(ttk.Frame):
                 GROUP BY s.song_id, s.title, s.length_ms, g.group_name
             ) AS sub
             {order_sql}
-            LIMIT %s OFFSET %s
+            LIMIT %(limit)s OFFSET %(offset)s
         """
         with self.app.cursor() as cur:
-            cur.execute(sql, (*params, self.limit, self.offset))
+            cur.execute(sql, {**params, "limit": self.limit, "offset": self.offset})
             return cur.fetchall()
 
+    def _query_rows_ranked(self):
+        """
+        "All fields" search in one query against song_search (schema/003).
+
+        Matches are ranked exact > prefix > substring, then song > artist >
+        album > genre; the heading sort only breaks ties. Listen counts are
+        computed for the returned page only.
+
+        Returns (rows, total); each row is the _query_rows tuple followed by a
+        {field: (quality, position)} dict for highlighting.
+        """
+        term = self.search_var.get().strip().lower()
+        like = self._like_escape(term)
+        order_sql = self._order_sql(lead="match_rank DESC, ")
+        facet_conds, facet_params = self._facet_conditions("ss.song_id")
+        facet_sql = "".join(f" AND {c}" for c in facet_conds)
+
+        def field_sql(name: str, col: str) -> str:
+            return f"""
+                CASE WHEN {col} = %(term)s THEN 3
+                     WHEN {col} LIKE %(prefix)s THEN 2
+                     WHEN {col} LIKE %(contains)s THEN 1
+                     ELSE 0 END AS {name}_q,
+                strpos({col}, %(term)s) AS {name}_pos"""
+
+        sql = f"""
+            WITH hits AS (
+                SELECT
+                    ss.song_id,
+                    {field_sql("song", "ss.title_lc")},
+                    {field_sql("artist", "ss.artist_lc")},
+                    {field_sql("album", "ss.album_lc")},
+                    {field_sql("genre", "ss.genre_lc")}
+                FROM song_search ss
+                WHERE ss.document LIKE %(contains)s{facet_sql}
+            ),
+            ranked AS (
+                SELECT
+                    h.*,
+                    GREATEST(
+                        CASE WHEN song_q > 0 THEN song_q * 4 + 3 ELSE 0 END,
+                        CASE WHEN artist_q > 0 THEN artist_q * 4 + 2 ELSE 0 END,
+                        CASE WHEN album_q > 0 THEN album_q * 4 + 1 ELSE 0 END,
+                        CASE WHEN genre_q > 0 THEN genre_q * 4 ELSE 0 END
+                    ) AS match_rank,
+                    COUNT(*) OVER () AS total
+                FROM hits h
+                WHERE song_q + artist_q + album_q + genre_q > 0
+            ),
+            page AS (
+                SELECT *
+                FROM (
+                    SELECT
+                        r.*,
+                        s.title AS song,
+                        COALESCE(g.group_name, '') AS artist,
+                        COALESCE(string_agg(DISTINCT al.album_name, ', '), '') AS album,
+                        s.length_ms,
+                        COALESCE(string_agg(DISTINCT sg.genre, ', '), '') AS genre,
+                        COALESCE(MIN(s.release_date), MIN(al.release_date)) AS release_date,
+                        EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) AS release_year
+                    FROM ranked r
+                    JOIN {self.TBL_SONG}                 ON s.song_id = r.song_id
+                    LEFT JOIN {self.TBL_GROUP}      ON g.group_id = s.group_id
+                    LEFT JOIN {self.TBL_SONG_ALBUM} ON swa.song_id = s.song_id
+                    LEFT JOIN {self.TBL_ALBUM}      ON al.album_id = swa.album_id
+                    LEFT JOIN {self.TBL_SONG_GENRE} ON sg.song_id = s.song_id
+                    GROUP BY r.song_id, r.song_q, r.song_pos, r.artist_q, r.artist_pos,
+                             r.album_q, r.album_pos, r.genre_q, r.genre_pos,
+                             r.match_rank, r.total, s.title, s.length_ms, g.group_name
+                ) AS sub
+                {order_sql}
+                LIMIT %(limit)s OFFSET %(offset)s
+            )
+            SELECT
+                p.song_id, p.song, p.artist, p.album, p.length_ms,
+                (
+                    SELECT {self.SQL_COLS["listen_count"]}
+                    FROM {self.TBL_LISTEN}
+                    WHERE li.song_id = p.song_id
+                ) AS listen_count,
+                p.genre, p.release_date, p.release_year, p.total,
+                p.song_q, p.song_pos, p.artist_q, p.artist_pos,
+                p.album_q, p.album_pos, p.genre_q, p.genre_pos
+            FROM page p
+            {order_sql}
+        """
+        params = {
+            **facet_params,
+            "term": term,
+            "prefix": f"{like}%",
+            "contains": f"%{like}%",
+            "limit": self.limit,
+            "offset": self.offset,
+        }
+        with self.app.cursor() as cur:
+            cur.execute(sql, params)
+            fetched = cur.fetchall()
+
+        rows = []
+        total = 0
+        for row in fetched:
+            total = int(row[9])
+            flags = row[10:]
+            matches = {}
+            for k, field in enumerate(("song", "artist", "album", "genre")):
+                quality, pos = flags[2 * k], flags[2 * k + 1]
+                if quality:
+                    matches[field] = (int(quality), int(pos) - 1)
+            rows.append((*row[:9], matches))
+        return rows, total
+
+    # ================= Local catalog =================
+    def _local_rows(self, snap) -> Tuple[List[int], dict]:
+        """
+        Snapshot rows for the current search + facet filters (unsorted), plus
+        the ranked-match info for "all" searches.
+
+        The search result is cached until the term/field/snapshot changes. When a
+        filter is added on a facet that was not filtered yet, the previous
+        filtered rows are narrowed instead of filtering the whole search again.
+        """
+        term = self.search_var.get().strip()
+        field = self.field_var.get()
+        search_key = (self._snapshot_key(snap), term.lower(), field)
+        cached_key, rows, ranked = self._local_search
+        if cached_key != search_key:
+            ranked = {}
+            if field == self.ALL_FIELDS and term:
+                ranked = snap.search_ranked(term)
+                rows = sorted(ranked)
+            else:
+                rows = snap.search(term, field)
+            self._local_search = (search_key, rows, ranked)
+            self._local_filtered = (None, [])
+
+        filters = self._frozen_filters()
+        prev_key, prev_rows = self._local_filtered
+        if prev_key is not None and prev_key[0] == search_key:
+            if prev_key[1] == filters:
+                return prev_rows, ranked
+            if all(not old or old == new for old, new in zip(prev_key[1], filters)):
+                rows = prev_rows
+        filtered = snap.filter_rows(rows, self.facet_filters)
+        self._local_filtered = ((search_key, filters), filtered)
+        return filtered, ranked
+
+    def _query_rows_local(self, snap):
+        """
+        Same rows/total as _query_rows + _count_matches, computed from the local
+        catalog snapshot. Only the page's listen counts hit the server.
+        """
+        rows, ranked = self._local_rows(snap)
+        key = self.sort_key if self.sort_key in self.SORTABLE else "song"
+        rows = snap.sort(rows, key, self.sort_dir)
+        if ranked:
+            # stable: heading sort stays as the tie-breaker
+            rows.sort(key=lambda i: ranked[i][0], reverse=True)
+        page = rows[self.offset:self.offset + self.limit]
+
+        with self.app.cursor() as cur:
+            counts = fetch_listen_counts(cur, (snap.song_ids[i] for i in page))
+
+        out = []
+        for i in page:
+            song_id, song, artist, album, length_ms, genre, release_year = snap.row(i)
+            out.append(
+                (song_id, song, artist, album, length_ms, counts.get(song_id, 0), genre, None, release_year,
+                 ranked[i][1] if ranked else {})
+            )
+        return out, len(rows)
+
+    # ================= Facets =================
+    def _query_facets(self) -> Dict[str, Dict[str, int]]:
+        """Facet counts for the current search + filters in one grouped query."""
+        cand_sql, params = self._candidates_sql()
+        sql = f"""
+            WITH cand AS ({cand_sql}),
+            songs AS (
+                SELECT
+                    c.song_id,
+                    COALESCE(g.group_name, '') AS artist,
+                    (FLOOR(EXTRACT(YEAR FROM COALESCE(MIN(s.release_date), MIN(al.release_date))) / 10) * 10)::int
+                        AS decade
+                FROM cand c
+                JOIN {self.TBL_SONG}                 ON s.song_id = c.song_id
+                LEFT JOIN {self.TBL_GROUP}      ON g.group_id = s.group_id
+                LEFT JOIN {self.TBL_SONG_ALBUM} ON swa.song_id = s.song_id
+                LEFT JOIN {self.TBL_ALBUM}      ON al.album_id = swa.album_id
+                GROUP BY c.song_id, g.group_name
+            )
+            SELECT
+                CASE
+                    WHEN GROUPING(sg.genre) = 0 THEN 'genre'
+                    WHEN GROUPING(so.decade) = 0 THEN 'decade'
+                    ELSE 'artist'
+                END AS facet,
+                CASE
+                    WHEN GROUPING(sg.genre) = 0 THEN sg.genre::text
+                    WHEN GROUPING(so.decade) = 0 THEN so.decade::text
+                    ELSE so.artist
+                END AS value,
+                COUNT(DISTINCT so.song_id) AS songs
+            FROM songs so
+            LEFT JOIN {self.TBL_SONG_GENRE} ON sg.song_id = so.song_id
+            GROUP BY GROUPING SETS ((sg.genre), (so.decade), (so.artist))
+        """
+        out: Dict[str, Dict[str, int]] = {key: {} for key, _ in self.FACETS}
+        with self.app.cursor() as cur:
+            cur.execute(sql, params)
+            for facet, value, songs in cur.fetchall():
+                if value:
+                    out[facet][str(value)] = int(songs)
+        return out
+
+    def _refresh_facets(self, snap):
+        """Fill the facet lists, reusing cached counts for a search/filter combo seen before."""
+        key = (
+            self._snapshot_key(snap),
+            self.search_var.get().strip().lower(),
+            self.field_var.get(),
+            self._frozen_filters(),
+        )
+
+        if snap is None:
+            # server-side counts: key them on the catalog version, read at
+            # most once per on_show, so edits made elsewhere show up the next
+            # time the page is opened (no version table: don't cache)
+            if not self._server_version_checked:
+                with self.app.cursor() as cur:
+                    self._server_version = fetch_catalog_version(cur)
+                self._server_version_checked = True
+            version = self._server_version
+            key = ("server", version) + key[1:] if version is not None else None
+
+        counts = self._facet_cache.get(key) if key is not None else None
+        if counts is None:
+            if snap is not None:
+                rows, _ranked = self._local_rows(snap)
+                counts = snap.facet_counts(rows)
+            else:
+                counts = self._query_facets()
+            if key is not None:
+                self._facet_cache[key] = counts
+                while len(self._facet_cache) > self.FACET_CACHE_SIZE:
+                    self._facet_cache.popitem(last=False)
+        else:
+            self._facet_cache.move_to_end(key)
+
+        for facet, _header in self.FACETS:
+            facet_counts = counts.get(facet, {})
+            if facet == "decade":
+                ordered = sorted(facet_counts, key=int)
+            else:
+                ordered = sorted(facet_counts, key=lambda v: (-facet_counts[v], v.lower()))
+            if facet == "artist":
+                ordered = ordered[:self.FACET_ARTIST_LIMIT]
+            chosen = self.facet_filters[facet]
+            # active filters stay listed (first) so they can be toggled off
+            values = sorted(chosen) + [v for v in ordered if v not in chosen]
+
+            lb = self.facet_lists[facet]
+            lb.delete(0, tk.END)
+            for v in values:
+                label = f"{v}s" if facet == "decade" else v
+                mark = "✓ " if v in chosen else ""
+                lb.insert(tk.END, f"{mark}{label} ({facet_counts.get(v, 0)})")
+            self._facet_values[facet] = values
+
     # ================= Data load =================
     def refresh(self):
         try:
-            rows = self._query_rows()
-            total = self._count_matches()
+            snap = self.app.catalog.snapshot
+            ranked_search = self.field_var.get() == self.ALL_FIELDS and self.search_var.get().strip()
+            if snap is not None:
+                rows, total = self._query_rows_local(snap)
+            elif ranked_search:
+                rows, total = self._query_rows_ranked()
+            else:
+                rows = self._query_rows()
+                total = self._count_matches()
 
             self.tree.delete(*self.tree.get_children())
-
-            for (
-                song_id,
-                song,
-                artist,
-                album,
-                length_ms,
-                listen_count,
-                genre,
-                _release_date,
-                release_year,
-            ) in rows:
+            term_len = len(self.search_var.get().strip())
+
+            for row in rows:
+                (
+                    song_id,
+                    song,
+                    artist,
+                    album,
+                    length_ms,
+                    listen_count,
+                    genre,
+                    _release_date,
+                    release_year,
+                ) = row[:9]
+                matches = row[9] if len(row) > 9 else {}
+                texts = {"song": song, "artist": artist, "album": album, "genre": genre}
                 values = [
                     "▶ Play",                             # _listen pseudo-button
                     song or "",
@@ -287,6 +710,7 @@ class SongsFrame(ttk.Frame):
                     self._fmt_len(length_ms),
                     str(int(release_year)) if release_year else "",
                     int(listen_count or 0),
+                    self._fmt_match(matches, texts, term_len),
                 ]
                 self.tree.insert("", "end", iid=f"song_{song_id}", values=values)
 
@@ -294,6 +718,7 @@ class SongsFrame(ttk.Frame):
             pages = max(1, (total + self.limit - 1) // self.limit)
             self.page_lbl.config(text=f"Page {page}/{pages}  •  {total} match(es)")
             self._render_heading_arrows()
+            self._refresh_facets(snap)
         except Exception as e:
             messagebox.showerror("Songs Error", f"Could not load songs:\n{e}")
 
@@ -322,11 +747,8 @@ class SongsFrame(ttk.Frame):
 
         try:
             with self.app.cursor() as cur:
-                # 1) insert one listen row
-                cur.execute(
-                    "INSERT INTO listen (song_id, listener_username, date_of_view) VALUES (%s, %s, NOW())",
-                    (song_id, self.app.session.username),
-                )
+                # 1) insert one listen row (+ rollups)
+                record_listens(cur, self.app.session.username, [song_id])
                 # 2) get the updated count just for this song
                 cur.execute(
                     "SELECT COALESCE(COUNT(DISTINCT (listener_username, date_of_view)), 0) "
@@ -335,6 +757,7 @@ class SongsFrame(ttk.Frame):
                 )
                 (new_count,) = cur.fetchone()
             self.app.conn.commit()
+            self.app.on_listens_recorded(self.app.session.username, [song_id])
         except Exception as e:
             messagebox.showerror("Listen Error", f"Could not record listen:\n{e}")
             return
@@ -350,6 +773,14 @@ class SongsFrame(ttk.Frame):
         # 4) popup feedback (simple blocking dialog)
         messagebox.showinfo("Playing", f"▶ {song_title}")
 
+    def show_similar_songs(self):
+        song_ids = self._get_selected_song_ids()
+        if not song_ids:
+            messagebox.showinfo("Select a song", "Please select a song first.")
+            return
+        title = self.tree.item(f"song_{song_ids[0]}", "values")[self.IDX_SONG]
+        SimilarSongsDialog(self, self.app, song_ids[0], title)
+
     # ================= Collections (unchanged) =================
     def _get_selected_song_ids(self) -> List[str]:
         ids: List[str] = []
@@ -358,17 +789,6 @@ class SongsFrame(ttk.Frame):
                 ids.append(iid[5:])
         return ids
 
-    def _get_collection_choices(self) -> List[Tuple[str, str]]:
-        sql = """
-            SELECT collection_id, collection_name
-            FROM collection
-            WHERE creator_username = %s
-            ORDER BY collection_name
-        """
-        with self.app.cursor() as cur:
-            cur.execute(sql, (self.app.session.username,))
-            return cur.fetchall() or []
-
     def add_selected_to_collection(self):
         if not self.app.session.username:
             messagebox.showwarning("Not logged in", "Please log in first.")
@@ -379,63 +799,4 @@ class SongsFrame(ttk.Frame):
             messagebox.showinfo("Select songs", "Please select one or more songs first.")
             return
 
-        collections = self._get_collection_choices()
-        if not collections:
-            messagebox.showinfo("No collections", "You don't have any collections. Create one first.")
-            return
-
-        dialog = tk.Toplevel(self)
-        dialog.title("Choose Collection")
-        dialog.transient(self)
-        dialog.grab_set()
-
-        frame = ttk.Frame(dialog, padding="16 12")
-        frame.pack(fill="both", expand=True)
-
-        ttk.Label(frame, text="Choose a collection:").pack(pady=(0, 8))
-        listbox = tk.Listbox(frame, width=42, height=10)
-        listbox.pack(pady=(0, 8))
-
-        idx_to_coll = {}
-        for i, (cid, name) in enumerate(collections):
-            idx_to_coll[i] = (cid, name)
-            listbox.insert(tk.END, name)
-
-        def on_ok():
-            sel = listbox.curselection()
-            if not sel:
-                messagebox.showwarning("Select collection", "Please select a collection.", parent=dialog)
-                return
-            cid, cname = idx_to_coll[sel[0]]
-            dialog.destroy()
-
-            try:
-                added = 0
-                with self.app.cursor() as cur:
-                    for sid in song_ids:
-                        cur.execute(
-                            """
-                            INSERT INTO song_within_collection (collection_id, song_id)
-                            VALUES (%s, %s)
-                            ON CONFLICT (collection_id, song_id) DO NOTHING
-                            """,
-                            (cid, sid),
-                        )
-                        added += cur.rowcount
-                self.app.conn.commit()
-                skipped = len(song_ids) - added
-                msg = f"Added {added} song(s) to '{cname}'."
-                if skipped:
-                    msg += f"  Skipped {skipped} duplicate(s)."
-                messagebox.showinfo("Done", msg)
-            except Exception as e:
-                messagebox.showerror("Error", f"Could not add songs to collection:\n{e}")
-
-        ttk.Button(frame, text="OK", command=on_ok).pack(side="left", padx=(0, 8))
-        ttk.Button(frame, text="Cancel", command=dialog.destroy).pack(side="left")
-
-        dialog.update_idletasks()
-        x = self.winfo_rootx() + (self.winfo_width() - dialog.winfo_width()) // 2
-        y = self.winfo_rooty() + (self.winfo_height() - dialog.winfo_height()) // 2
-        dialog.geometry(f"+{x}+{y}")
-        dialog.wait_window(dialog)
+        add_to_collections(self, self.app, song_ids)